@@ -1,17 +1,25 @@
 """API Key authentication module for browser extension."""
 
+import asyncio
 import hashlib
+import logging
 import secrets
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Annotated, Optional
 
 from fastapi import Header, HTTPException, Depends
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session
+from app.config import get_settings
+from app.database import session_scope
+from app import write_queue
 from app.models import ApiKey
 
+logger = logging.getLogger("arvai-kernel.auth")
+
 
 # ---------------------------------------------------------------------------
 # Key Generation & Hashing
@@ -33,18 +41,118 @@ def get_key_prefix(key: str) -> str:
     return key[:12] if len(key) >= 12 else key
 
 
+# ---------------------------------------------------------------------------
+# Verification cache & deferred last_used_at writes
+# ---------------------------------------------------------------------------
+
+class _KeyCache:
+    """Bounded TTL cache of verified API keys, keyed on the key hash."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[float, ApiKey]] = OrderedDict()
+        # Advanced by every invalidation; a lookup that started before one
+        # may have read a key that is no longer valid, and must not cache it
+        self.generation = 0
+
+    def get(self, key_hash: str) -> Optional[ApiKey]:
+        entry = self._entries.get(key_hash)
+        if entry is None:
+            return None
+        expires_at, api_key = entry
+        if expires_at < time.monotonic():
+            del self._entries[key_hash]
+            return None
+        self._entries.move_to_end(key_hash)
+        return api_key
+
+    def put(self, key_hash: str, api_key: ApiKey) -> None:
+        auth_settings = get_settings().auth
+        if auth_settings.key_cache_size <= 0:
+            return
+        self._entries[key_hash] = (time.monotonic() + auth_settings.key_cache_ttl, api_key)
+        self._entries.move_to_end(key_hash)
+        while len(self._entries) > auth_settings.key_cache_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key_id: int) -> None:
+        self.generation += 1
+        for key_hash, (_, api_key) in list(self._entries.items()):
+            if api_key.id == key_id:
+                del self._entries[key_hash]
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+
+_key_cache = _KeyCache()
+
+# key id -> most recent use, written back in batches by `flush_last_used`
+_pending_last_used: dict[int, datetime] = {}
+
+
+def invalidate_api_key(key_id: int) -> None:
+    """Drop a key from the verification cache (call on revoke/delete)."""
+    _key_cache.invalidate(key_id)
+    _pending_last_used.pop(key_id, None)
+
+
+def invalidate_all_api_keys() -> None:
+    """Empty the verification cache (keys were changed by another process)."""
+    _key_cache.clear()
+
+
+async def flush_last_used() -> None:
+    """Write all pending `last_used_at` values in a single transaction."""
+    if not _pending_last_used:
+        return
+    pending = [{"key_id": k, "used_at": v} for k, v in _pending_last_used.items()]
+    _pending_last_used.clear()
+    table = ApiKey.__table__  # type: ignore[attr-defined]
+
+    async def apply(session: AsyncSession) -> None:
+        # One executemany statement; unlike the ORM's bulk UPDATE by primary
+        # key it skips keys deleted meanwhile (e.g. by another worker process)
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("key_id"))
+            .values(last_used_at=bindparam("used_at")),
+            pending,
+        )
+        await write_queue.commit(session)
+
+    async with session_scope() as session:
+        await write_queue.execute(session, apply)
+
+
+async def run_last_used_flusher() -> None:
+    """Background task: periodically flush `last_used_at` until cancelled."""
+    interval = get_settings().auth.last_used_flush_interval
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_last_used()
+        except Exception:
+            logger.exception("Failed to flush API key last_used_at")
+
+
 # ---------------------------------------------------------------------------
 # API Key Verification Dependency
 # ---------------------------------------------------------------------------
 
 async def verify_api_key(
-    session: Annotated[AsyncSession, Depends(get_session)],
     x_arvai_api_key: Annotated[Optional[str], Header()] = None,
 ) -> ApiKey:
     """
     FastAPI dependency to verify API key from request header.
     
     Expects header: X-Arvai-API-Key: arvai_xxx
+
+    Verified keys are cached for `auth.key_cache_ttl` seconds, and the
+    `last_used_at` bump is deferred to `flush_last_used`, so a cached
+    request performs no database access at all. A cache miss looks the key
+    up on its own reader session, returned to the pool before the route
+    runs, so long-lived responses (the event stream) never pin a reader.
     """
     if not x_arvai_api_key:
         raise HTTPException(
@@ -59,24 +167,34 @@ async def verify_api_key(
         )
     
     key_hash = hash_api_key(x_arvai_api_key)
-    
-    stmt = select(ApiKey).where(
-        ApiKey.key_hash == key_hash,
-        ApiKey.is_active == True,
-    )
-    result = await session.execute(stmt)
-    api_key = result.scalar_one_or_none()
-    
+
+    api_key = _key_cache.get(key_hash)
     if api_key is None:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid or revoked API key.",
+        generation = _key_cache.generation
+        stmt = select(ApiKey).where(
+            ApiKey.key_hash == key_hash,
+            ApiKey.is_active == True,
         )
-    
-    # Update last_used_at
-    api_key.last_used_at = datetime.now(timezone.utc)
-    await session.commit()
-    
+        async with session_scope(readonly=True) as session:
+            result = await session.execute(stmt)
+            api_key = result.scalar_one_or_none()
+            if api_key is not None:
+                # Detach so the cached instance never lazy-loads through a closed session
+                session.expunge(api_key)
+
+        if api_key is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid or revoked API key.",
+            )
+
+        # Keys were invalidated during the lookup: serve this request, cache nothing
+        if _key_cache.generation == generation:
+            _key_cache.put(key_hash, api_key)
+
+    # Record last_used_at; written back in batches
+    _pending_last_used[api_key.id] = datetime.now(timezone.utc)  # type: ignore
+
     return api_key
 
 
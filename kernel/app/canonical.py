@@ -0,0 +1,135 @@
+"""URL canonicalization.
+
+Bookmarks keep the URL they were saved with, plus a `canonical_url` used to
+recognise the same page behind cosmetic differences: `http` vs `https`,
+`www.`, a trailing slash, tracking parameters, parameter order or a
+`#fragment`. Saving, `get_by_url` and `/check` all match on the canonical
+form. The rules come from the `canonical_url` config section; when they
+change, existing rows are re-normalised on the next startup.
+"""
+
+import json
+import logging
+import re
+import zlib
+from fnmatch import translate
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import CanonicalUrlConfig, get_settings
+from app.pagination import COUNTS_TABLE
+
+logger = logging.getLogger("arvai-kernel.canonical")
+
+_BACKFILL_CHUNK = 2000
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@lru_cache(maxsize=8)
+def _param_filter(patterns: tuple[str, ...]) -> re.Pattern:
+    """One regex for all `strip_params` glob patterns (matched case-insensitively)."""
+    return re.compile("|".join(translate(p.lower()) for p in patterns) or "(?!)")
+
+
+def canonicalize(url: str, cfg: CanonicalUrlConfig | None = None) -> str:
+    """
+    Canonical form of `url`; URLs that are not http(s) are returned unchanged.
+
+    >>> canonicalize("http://WWW.Example.com:80/a/?utm_source=x&b=2&a=1#top")
+    'https://example.com/a?a=1&b=2'
+    """
+    cfg = cfg or get_settings().canonical_url
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.rstrip(".")
+    if cfg.strip_www and host.startswith("www."):
+        host = host[4:]
+    if port is not None and port != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    if cfg.ignore_scheme:
+        scheme = "https"
+
+    path = parts.path or "/"
+    if cfg.strip_trailing_slash and len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query = parts.query
+    if query:
+        drop = _param_filter(tuple(cfg.strip_params))
+        params = [
+            (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+            if not drop.fullmatch(k.lower())
+        ]
+        if cfg.sort_query:
+            params.sort()
+        query = urlencode(params)
+
+    # Hash-bang and "#/route" fragments address content in single-page apps
+    fragment = parts.fragment
+    if cfg.strip_fragment and not fragment.startswith(("!", "/")):
+        fragment = ""
+    return urlunsplit((scheme, host, path, query, fragment))
+
+
+def rules_fingerprint(cfg: CanonicalUrlConfig | None = None) -> int:
+    """Stable 31-bit digest of the normalizer settings."""
+    cfg = cfg or get_settings().canonical_url
+    payload = json.dumps(cfg.model_dump(), sort_keys=True).encode()
+    return zlib.crc32(payload) & 0x7FFFFFFF
+
+
+# ---------------------------------------------------------------------------
+# Backfill (called from app.migrations)
+# ---------------------------------------------------------------------------
+
+async def sync_rules(conn: AsyncConnection) -> None:
+    """
+    (Re)fill `canonical_url` when the configured rules have changed.
+
+    Rows are re-normalised whenever the rules differ from the ones the
+    stored values were computed with (tracked in `bookmark_counts` as
+    'canonical_rules'), which includes the first run after the upgrade.
+    Runs on every start, after all schema migrations.
+    """
+    fingerprint = rules_fingerprint()
+    stored = (await conn.execute(sa.text(
+        f"SELECT value FROM {COUNTS_TABLE} WHERE name = 'canonical_rules'"
+    ))).scalar()
+    if stored == fingerprint:
+        return
+
+    cfg = get_settings().canonical_url
+    updated, last_id = 0, 0
+    while True:
+        rows = (await conn.execute(sa.text(
+            "SELECT id, url, canonical_url FROM bookmarks WHERE id > :last ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": _BACKFILL_CHUNK})).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        changed = [
+            {"id": r.id, "canonical": c}
+            for r in rows
+            if (c := canonicalize(r.url, cfg)) != r.canonical_url
+        ]
+        if changed:
+            await conn.execute(
+                sa.text("UPDATE bookmarks SET canonical_url = :canonical WHERE id = :id"),
+                changed,
+            )
+            updated += len(changed)
+    await conn.execute(sa.text(
+        f"INSERT OR REPLACE INTO {COUNTS_TABLE} (name, value) VALUES ('canonical_rules', :v)"
+    ), {"v": fingerprint})
+    if updated:
+        logger.info("Canonical URLs recomputed for %d bookmarks", updated)
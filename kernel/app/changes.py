@@ -0,0 +1,29 @@
+"""Bookmark change log for incremental client sync.
+
+Every insert, update and delete of a bookmark takes the next value of a
+global revision counter (kept in `bookmark_counts` under 'revision'). Live
+rows store their latest revision in `bookmarks.revision`; deleted rows leave
+a tombstone in `bookmark_tombstones`. Both are maintained by triggers, so
+every write path (ORM, upserts, bulk imports) is covered, and a client can
+fetch "everything after revision N" from two index range scans. The
+triggers are created by schema migrations (see app.migrations).
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.pagination import COUNTS_TABLE
+
+TOMBSTONES_TABLE = "bookmark_tombstones"
+
+# API keys keep a revision of their own, bumped when a key is created,
+# renamed, revoked or deleted (but not when `last_used_at` is written back),
+# so a process caching verified keys can tell when its copies are stale.
+API_KEY_REVISION = "api_key_revision"
+
+
+async def current_revision(executor: AsyncSession | AsyncConnection) -> int:
+    """The most recent revision handed out."""
+    return (await executor.execute(sa.text(
+        f"SELECT value FROM {COUNTS_TABLE} WHERE name = 'revision'"
+    ))).scalar() or 0
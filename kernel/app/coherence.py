@@ -0,0 +1,185 @@
+"""Cross-process cache coherence.
+
+The database is never written by the server process alone: with
+`server.workers` above 1 uvicorn runs several processes against it, and the
+CLI `import` and `rebuild-index` commands write to it while a server runs.
+Each server process keeps its own in-memory caches, which stay coherent
+through two counters that live in the database and move in the same
+transaction as the data they describe (both maintained by triggers, see
+`app.changes`):
+
+* the bookmark revision, advanced by every bookmark insert, update and delete;
+* the API key revision, advanced when a key is created, changed or deleted.
+
+Each server process keeps one extra query-only connection and runs
+`PRAGMA data_version` on it before every request, and every
+`server.coherence_interval` seconds while idle. The pragma reads the WAL
+index in shared memory and only changes after another connection commits,
+so the usual cost is a few microseconds; only then are the counters read.
+When the bookmark revision moves:
+
+* `http_cache.data_version` follows it, which retires cached responses and
+  gives every worker the same ETags;
+* the URL membership index adds rows newer than it (`UrlIndex.advance`);
+* event subscribers get a `resync` event, telling SSE clients to catch up
+  through `GET /api/bookmarks/changes` (and waking the semantic index).
+
+When the API key revision moves, the verification cache is emptied. The
+process's own commits are noticed the same way (its write paths also update
+the caches directly, so they are current sooner).
+
+State that is not a cache is shared differently: import job progress goes
+through the `import_jobs` table (`app.importer`), and each worker keeps its
+own semantic index files (`private_directory`).
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from app.auth import invalidate_all_api_keys
+from app.changes import API_KEY_REVISION
+from app.config import get_settings
+from app.events import hub
+from app.http_cache import data_version
+from app.membership import url_index
+from app.pagination import COUNTS_TABLE
+
+logger = logging.getLogger("arvai-kernel.coherence")
+
+
+class Watcher:
+    """Follows other connections' commits through a dedicated connection."""
+
+    def __init__(self, path: str, interval: float) -> None:
+        self._interval = interval
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout={get_settings().database.busy_timeout}")
+        self._conn.execute("PRAGMA query_only=ON")
+        self._data_version: Optional[int] = None
+        self._revision: Optional[int] = None
+        self._api_key_revision: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def check(self) -> None:
+        """Apply whatever was committed since the last call."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        counters = dict(self._conn.execute(
+            f"SELECT name, value FROM {COUNTS_TABLE} WHERE name IN ('revision', ?)",
+            (API_KEY_REVISION,),
+        ).fetchall())
+
+        revision = counters.get("revision", 0)
+        if revision != self._revision:
+            if self._revision is not None:
+                hub.publish("resync", {})
+            self._revision = revision
+            data_version.follow(revision)
+            url_index.advance(revision)
+
+        api_key_revision = counters.get(API_KEY_REVISION, 0)
+        if api_key_revision != self._api_key_revision:
+            if self._api_key_revision is not None:
+                invalidate_all_api_keys()
+            self._api_key_revision = api_key_revision
+
+    def start(self) -> None:
+        self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._conn.close()
+
+    async def _run(self) -> None:
+        """Notice commits while no requests arrive (e.g. for SSE subscribers)."""
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                self.check()
+            except sqlite3.Error as e:
+                logger.warning("Coherence check failed: %s", e)
+
+
+_watcher: Optional[Watcher] = None
+
+
+def start() -> None:
+    """Start following other processes' commits (called from lifespan)."""
+    global _watcher
+    settings = get_settings()
+    _watcher = Watcher(settings.database.path, settings.server.coherence_interval)
+    _watcher.start()
+
+
+async def stop() -> None:
+    global _watcher
+    watcher, _watcher = _watcher, None
+    if watcher is not None:
+        await watcher.stop()
+
+
+class CoherenceMiddleware:
+    """Brings the caches up to date before each request is handled."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and _watcher is not None:
+            try:
+                _watcher.check()
+            except sqlite3.Error as e:
+                logger.warning("Coherence check failed: %s", e)
+        await self.app(scope, receive, send)
+
+
+# ---------------------------------------------------------------------------
+# Per-worker directories
+# ---------------------------------------------------------------------------
+
+_held_locks: list[int] = []
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def private_directory(base: Path) -> Path:
+    """
+    `base` itself or a `worker-N` directory inside it that no other running
+    worker holds, for files a process writes in place (the semantic index).
+
+    The claim is a lock held until the process exits, so a restarted worker
+    takes over a free directory and its files rather than starting over.
+    """
+    slot = 0
+    while True:
+        directory = base if slot == 0 else base / f"worker-{slot}"
+        directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(directory / ".lock", os.O_RDWR | os.O_CREAT)
+        if _try_lock(fd):
+            _held_locks.append(fd)
+            return directory
+        os.close(fd)
+        slot += 1
@@ -6,8 +6,8 @@ Reads config.yaml at startup and injects values into environment variables.
 import os
 from pathlib import Path
 from functools import lru_cache
+from typing import Literal
 
-import yaml
 from pydantic import BaseModel
 
 
@@ -20,10 +20,100 @@ class ServerConfig(BaseModel):
     port: int = 8731
     debug: bool = False
     cors_origins: list[str] = ["http://localhost:5173"]
+    workers: int = 1                  # uvicorn worker processes (see app.coherence)
+    coherence_interval: float = 0.1   # seconds between idle checks for other processes' commits
+    public_url: str = ""              # origin clients reach the kernel at; default http://host:port
 
 
 class DatabaseConfig(BaseModel):
     path: str = "./data/arvai.db"
+    # SQLite performance profile, applied to every connection
+    journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    mmap_size: int = 256 * 1024 * 1024   # bytes; 0 disables memory-mapped I/O
+    cache_size: int = -64_000            # negative = KiB, positive = pages
+    busy_timeout: int = 5000             # milliseconds
+    temp_store: Literal["default", "file", "memory"] = "memory"
+    reader_pool_size: int = 4            # read-only connections for GET routes
+
+
+class AuthConfig(BaseModel):
+    key_cache_ttl: float = 60.0          # seconds a verified key stays cached
+    key_cache_size: int = 256            # max cached keys
+    last_used_flush_interval: float = 30.0  # seconds between last_used_at flushes
+
+
+class WriteQueueConfig(BaseModel):
+    enabled: bool = False   # group-commit bookmark mutations via a single writer task
+    window_ms: float = 2.0  # how long to gather writes into one transaction
+    max_batch: int = 64     # max operations per transaction
+
+
+class CacheConfig(BaseModel):
+    response_cache_size: int = 256  # rendered GET responses kept per data version; 0 disables
+
+
+class EventsConfig(BaseModel):
+    queue_size: int = 256             # per-subscriber backlog before a resync is sent
+    heartbeat_interval: float = 15.0  # seconds between SSE keep-alive comments
+
+
+class EnrichmentConfig(BaseModel):
+    enabled: bool = False             # fetch newly saved pages for title/description/text
+    concurrency: int = 8              # pages fetched at once
+    per_host_concurrency: int = 2     # simultaneous requests to one host
+    per_host_interval: float = 1.0    # min seconds between requests to one host
+    timeout: float = 10.0             # seconds per request
+    max_bytes: int = 1024 * 1024      # HTML read per page
+    queue_size: int = 10_000          # pending URLs before new ones are dropped
+    parse_workers: int = 2            # worker processes for HTML extraction
+    batch_size: int = 50              # results per write-back transaction
+    flush_interval: float = 2.0       # max seconds a result waits for write-back
+    user_agent: str = "ArvaiKernel/0.1 (+bookmark metadata)"
+
+
+class FaviconsConfig(BaseModel):
+    sweep_interval: float = 3600.0  # seconds between removals of unreferenced icons; 0 disables
+
+
+class SemanticConfig(BaseModel):
+    enabled: bool = True        # maintain the embedding index for /api/bookmarks/semantic
+    embedder: str = "hashing"   # "hashing" or "package.module:factory" for a custom embedder
+    dim: int = 256              # vector size of the hashing embedder
+    batch_size: int = 512       # bookmarks embedded per batch
+    text_chars: int = 2000      # leading characters of fetched page text to embed
+
+
+class CanonicalUrlConfig(BaseModel):
+    ignore_scheme: bool = True          # treat http and https as the same page
+    strip_www: bool = True              # drop a leading "www." from the host
+    strip_trailing_slash: bool = True   # "/a/" == "/a"
+    strip_fragment: bool = True         # drop "#..." (except "#!" and "#/" app routes)
+    sort_query: bool = True             # parameter order does not matter
+    strip_params: list[str] = [         # query parameters to drop; glob patterns
+        "utm_*", "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+        "igshid", "yclid", "_hsenc", "_hsmi", "ref_src", "spm",
+    ]
+
+
+class DuplicatesConfig(BaseModel):
+    threshold: float = 0.8   # estimated Jaccard similarity for a near-duplicate
+    num_perm: int = 64       # MinHash permutations per signature
+    bands: int = 16          # LSH bands (num_perm must be a multiple)
+    text_chars: int = 1000   # leading characters of fetched page text compared
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True            # serve GET /metrics (request, SQL and event-loop metrics)
+    loop_lag_interval: float = 0.5  # seconds between event-loop lag samples; 0 disables
+
+
+class DiagnosticsConfig(BaseModel):
+    slow_query_ms: float = 100.0        # statements slower than this go to the slow-query log; 0 disables
+    slow_query_log_size: int = 200      # slow statements kept for GET /api/debug/slow-queries
+    profile_requests: bool = False      # profile every request (with server.debug, X-Arvai-Profile opts in)
+    profile_interval_ms: float = 1.0    # profiler sampling interval
+    profile_history: int = 20           # request profiles kept for GET /api/debug/profiles
 
 
 class AppConfig(BaseModel):
@@ -34,6 +124,17 @@ class AppConfig(BaseModel):
 class Settings(BaseModel):
     server: ServerConfig = ServerConfig()
     database: DatabaseConfig = DatabaseConfig()
+    auth: AuthConfig = AuthConfig()
+    write_queue: WriteQueueConfig = WriteQueueConfig()
+    cache: CacheConfig = CacheConfig()
+    events: EventsConfig = EventsConfig()
+    enrichment: EnrichmentConfig = EnrichmentConfig()
+    favicons: FaviconsConfig = FaviconsConfig()
+    semantic: SemanticConfig = SemanticConfig()
+    canonical_url: CanonicalUrlConfig = CanonicalUrlConfig()
+    duplicates: DuplicatesConfig = DuplicatesConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    diagnostics: DiagnosticsConfig = DiagnosticsConfig()
     app: AppConfig = AppConfig()
 
 
@@ -86,6 +187,8 @@ def get_settings() -> Settings:
     cfg_path = _find_config_file()
 
     if cfg_path is not None:
+        import yaml  # only needed when there is a file to read
+
         with open(cfg_path, encoding="utf-8") as f:
             raw = yaml.safe_load(f) or {}
         settings = Settings.model_validate(raw)
@@ -1,15 +1,28 @@
 """CRUD operations package.
 
 Usage:
-    from app.crud import bookmarks, api_keys
+    from app.crud import bookmarks, api_keys, tags, favicons
 
     # Bookmark operations
     bookmark = await bookmarks.create(session, url="...", title="...")
+    written = await bookmarks.upsert_many(session, [{"url": "...", "title": "..."}, ...])
     bookmark = await bookmarks.get_by_id(session, 1)
+    record = await bookmarks.get_record(session, 1, fields=("id", "title"))
+    records = await bookmarks.get_records(session, [(1, 0.92), (7, 0.81)])
     bookmark = await bookmarks.get_by_url(session, "https://...")
-    items, total = await bookmarks.list_all(session, query="...", tag="...")
+    saved = await bookmarks.check_urls(session, ["https://...", ...])
+    items, total, next_cursor = await bookmarks.list_all(session, query="...", tags=["..."])
+    changes, has_more = await bookmarks.list_changes(session, since=0, limit=500)
+    groups, scanned = await bookmarks.find_duplicates(session, threshold=0.8)
     bookmark = await bookmarks.update(session, 1, title="...")
     deleted = await bookmarks.delete(session, 1)
+    outcome = await bookmarks.bulk_update(session, tags=["old"], add_tags=["new"])
+
+    # Tag operations
+    tag_counts = await tags.list_all(session)
+
+    # Favicon store maintenance
+    removed_hashes = await favicons.remove_unreferenced(session)
 
     # API Key operations
     key = await api_keys.create(session, name="...")
@@ -18,16 +31,26 @@ Usage:
     deleted = await api_keys.delete(session, 1)
 """
 
-from app.crud import bookmarks, api_keys
+from app.crud import bookmarks, api_keys, tags, favicons
 
 # Re-export for backward compatibility with existing routers
 # Bookmark operations
 create_bookmark = bookmarks.create
+upsert_bookmarks = bookmarks.upsert_many
 get_bookmark_by_id = bookmarks.get_by_id
+get_bookmark_record = bookmarks.get_record
+get_bookmark_records = bookmarks.get_records
 get_bookmark_by_url = bookmarks.get_by_url
+check_bookmark_urls = bookmarks.check_urls
 list_bookmarks = bookmarks.list_all
+list_bookmark_changes = bookmarks.list_changes
+find_duplicate_bookmarks = bookmarks.find_duplicates
 update_bookmark = bookmarks.update
 delete_bookmark = bookmarks.delete
+bulk_update_bookmarks = bookmarks.bulk_update
+
+# Tag operations
+list_tags = tags.list_all
 
 # API Key operations
 create_api_key = api_keys.create
@@ -39,13 +62,23 @@ __all__ = [
     # Modules
     "bookmarks",
     "api_keys",
+    "tags",
+    "favicons",
     # Backward-compatible functions
     "create_bookmark",
+    "upsert_bookmarks",
     "get_bookmark_by_id",
+    "get_bookmark_record",
+    "get_bookmark_records",
     "get_bookmark_by_url",
+    "check_bookmark_urls",
     "list_bookmarks",
+    "list_bookmark_changes",
+    "find_duplicate_bookmarks",
     "update_bookmark",
     "delete_bookmark",
+    "bulk_update_bookmarks",
+    "list_tags",
     "create_api_key",
     "list_api_keys",
     "revoke_api_key",
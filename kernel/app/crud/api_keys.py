@@ -5,7 +5,7 @@ from sqlmodel import select
 
 from app.models import ApiKey
 from app.schemas import ApiKeyOut, ApiKeyCreated
-from app.auth import generate_api_key, hash_api_key, get_key_prefix
+from app.auth import generate_api_key, hash_api_key, get_key_prefix, invalidate_api_key
 
 
 def _to_response(api_key: ApiKey) -> ApiKeyOut:
@@ -64,6 +64,7 @@ async def revoke(session: AsyncSession, key_id: int) -> bool:
 
     api_key.is_active = False
     await session.commit()
+    invalidate_api_key(key_id)
     return True
 
 
@@ -78,4 +79,5 @@ async def delete(session: AsyncSession, key_id: int) -> bool:
 
     await session.delete(api_key)
     await session.commit()
+    invalidate_api_key(key_id)
     return True
@@ -1,14 +1,25 @@
 """Bookmark CRUD operations."""
 
+import asyncio
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 from typing import Optional
 
+import sqlalchemy as sa
+from sqlalchemy import Row, bindparam, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, func, col, or_
+from sqlmodel import select, func, col, and_, or_, tuple_, literal
 
-from app.models import Bookmark
-from app.schemas import BookmarkOut
+from app import (
+    canonical, changes, events, favicons, pagination, search, serialization, tagging,
+    write_queue,
+)
+from app.config import get_settings
+from app.http_cache import data_version
+from app.membership import url_index
+from app.models import Bookmark, BookmarkTombstone, PageMetadata
+from app.schemas import BookmarkBulkOut, BookmarkChangeOut, BookmarkOut, DuplicateGroupOut
 
 
 def _extract_domain(url: str) -> str:
@@ -21,18 +32,130 @@ def _extract_domain(url: str) -> str:
 
 def _to_response(bookmark: Bookmark) -> BookmarkOut:
     """Convert a Bookmark model to API response schema."""
-    return BookmarkOut(
-        id=bookmark.id,  # type: ignore
-        url=bookmark.url,
-        title=bookmark.title,
-        description=bookmark.description,
-        favicon=bookmark.favicon,
-        domain=bookmark.domain,
-        tags=bookmark.tag_list,
-        source=bookmark.source,
-        created_at=bookmark.created_at,
-        updated_at=bookmark.updated_at,
+    return _row_to_response(bookmark)  # type: ignore[arg-type]
+
+
+def _row_to_response(row: Row) -> BookmarkOut:
+    """
+    Convert a `bookmarks` table row (or ORM object) to API response schema.
+
+    Values come straight from the database, so the model is constructed
+    without validation; responses are serialized by pydantic-core in one pass.
+    """
+    return BookmarkOut.model_construct(
+        id=row.id,
+        url=row.url,
+        title=row.title,
+        description=row.description,
+        favicon=favicons.public_url(row.favicon),
+        domain=row.domain,
+        tags=tagging.split_stored(row.tags),
+        source=row.source,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+_TABLE = Bookmark.__table__  # type: ignore[attr-defined]
+
+# Fields an upsert only overwrites when the incoming value is non-empty
+_KEEP_IF_EMPTY = ("title", "description", "favicon", "tags")
+
+# Rows per executemany batch; SQLAlchemy renders each batch as multi-row VALUES
+UPSERT_CHUNK = 1000
+
+
+def _upsert_statement():
+    """
+    `INSERT ... ON CONFLICT(url) DO UPDATE` to execute with row parameters.
+
+    Mirrors the create rule: text fields are only replaced when the incoming
+    value is non-empty; domain, source and updated_at always follow the write.
+    Built on the Core table so executemany skips ORM bulk bookkeeping.
+    """
+    stmt = sqlite_insert(_TABLE)
+    excluded = stmt.excluded
+    set_ = {
+        field: case((excluded[field] != "", excluded[field]), else_=col(getattr(Bookmark, field)))
+        for field in _KEEP_IF_EMPTY
+    }
+    set_.update(
+        domain=excluded.domain,
+        source=excluded.source,
+        updated_at=excluded.updated_at,
+    )
+    return stmt.on_conflict_do_update(index_elements=[col(Bookmark.url)], set_=set_)
+
+
+async def _saved_urls(session: AsyncSession, canonical_urls: set[str]) -> dict[str, str]:
+    """{canonical_url: stored url} for pages already saved (the oldest row wins)."""
+    stmt = (
+        select(_TABLE.c.canonical_url, _TABLE.c.url)
+        .where(_TABLE.c.canonical_url.in_(canonical_urls))
+        .order_by(_TABLE.c.id.desc())
     )
+    return dict((await session.execute(stmt)).all())
+
+
+async def upsert_many(session: AsyncSession, rows: list[dict]) -> int:
+    """
+    Insert or update many bookmarks with chunked multi-row upserts.
+
+    Each row takes the keyword arguments of `create`, plus an optional
+    `created_at`. Like `create`, a URL whose canonical form is already saved
+    (or appears earlier in `rows`) updates that bookmark. Commits once at
+    the end; returns the number of rows written.
+    """
+    await write_queue.lock(session)
+    written = 0
+    canonical_urls: set[str] = set()
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        now = datetime.now(timezone.utc)
+        canon = [canonical.canonicalize(row["url"]) for row in chunk]
+        saved = await _saved_urls(session, set(canon))
+        values = []
+        tag_names: dict[str, list[str]] = {}
+        for row, canonical_url in zip(chunk, canon):
+            url = saved.setdefault(canonical_url, row["url"])
+            names = tagging.normalize(row.get("tags") or [])
+            if names:
+                tag_names[url] = names
+            values.append({
+                "url": url,
+                "canonical_url": canonical_url,
+                "title": row.get("title") or "",
+                "description": row.get("description") or "",
+                "favicon": row.get("favicon") or "",
+                "domain": _extract_domain(url),
+                "tags": ",".join(names),
+                "source": row.get("source") or "import",
+                "created_at": row.get("created_at") or now,
+                "updated_at": now,
+            })
+
+        await favicons.intern_many(session, values)
+        result = await session.execute(
+            _upsert_statement().returning(col(Bookmark.id), col(Bookmark.url)),
+            values,
+        )
+        ids = {url: bookmark_id for bookmark_id, url in result.all()}
+        await tagging.sync_many(
+            session, {ids[url]: names for url, names in tag_names.items()}
+        )
+        written += len(chunk)
+        canonical_urls.update(canon)
+
+    await write_queue.commit(session)
+
+    def index_urls() -> None:
+        for canonical_url in canonical_urls:
+            url_index.add(canonical_url)
+
+    write_queue.after_commit(session, index_urls)
+    write_queue.after_commit(session, data_version.bump)
+    write_queue.after_commit(session, lambda: events.hub.publish("bulk", {"count": written}))
+    return written
 
 
 async def create(
@@ -47,104 +170,246 @@ async def create(
 ) -> BookmarkOut:
     """
     Create a new bookmark or update if URL already exists (upsert).
-    """
-    domain = _extract_domain(url)
-    tags_str = ",".join(tags or [])
 
-    # Check if bookmark exists
-    stmt = select(Bookmark).where(Bookmark.url == url)
-    result = await session.execute(stmt)
-    existing = result.scalar_one_or_none()
-
-    if existing:
-        # Update existing: only update non-empty fields
-        if title:
-            existing.title = title
-        if description:
-            existing.description = description
-        if favicon:
-            existing.favicon = favicon
-        if tags_str:
-            existing.tags = tags_str
-        existing.domain = domain
-        existing.source = source
-        existing.updated_at = datetime.now(timezone.utc)
-        await session.commit()
-        await session.refresh(existing)
-        return _to_response(existing)
-    else:
-        # Create new
-        bookmark = Bookmark(
-            url=url,
-            title=title,
-            description=description,
-            favicon=favicon,
-            domain=domain,
-            tags=tags_str,
-            source=source,
-        )
-        session.add(bookmark)
-        await session.commit()
-        await session.refresh(bookmark)
-        return _to_response(bookmark)
+    A single `INSERT ... ON CONFLICT(url) DO UPDATE ... RETURNING` statement,
+    so concurrent saves of the same URL cannot race into the UNIQUE
+    constraint. A variant of a saved page (same canonical URL) updates that
+    bookmark, which keeps its original URL; the variant is looked up under
+    the write lock, so concurrent saves of two variants cannot both insert.
+    Existing fields are only overwritten by non-empty values.
+    """
+    tag_names = tagging.normalize(tags or [])
+    canonical_url = canonical.canonicalize(url)
+    # The URL index cannot answer here: it learns of rows only after their
+    # commit, including rows of the same group-commit batch
+    await write_queue.lock(session)
+    url = (await _saved_urls(session, {canonical_url})).get(canonical_url, url)
+    favicon = await favicons.intern(session, favicon)
+    now = datetime.now(timezone.utc)
+    values = {
+        "url": url,
+        "canonical_url": canonical_url,
+        "title": title,
+        "description": description,
+        "favicon": favicon,
+        "domain": _extract_domain(url),
+        "tags": ",".join(tag_names),
+        "source": source,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+    result = await session.execute(
+        _upsert_statement().returning(*_TABLE.columns),
+        values,
+    )
+    row = result.one()
+    if tag_names:
+        await tagging.sync_bookmark_tags(session, row.id, tag_names)
+    await write_queue.commit(session)
+    bookmark = _row_to_response(row)
+    # An upsert that hit an existing row keeps the original created_at
+    event = "created" if row.created_at == row.updated_at else "updated"
+    write_queue.after_commit(session, lambda: url_index.add(canonical_url))
+    write_queue.after_commit(session, data_version.bump)
+    write_queue.after_commit(
+        session, lambda: events.hub.publish(event, bookmark.model_dump(mode="json"))
+    )
+    return bookmark
 
 
 async def get_by_id(session: AsyncSession, bookmark_id: int) -> Optional[BookmarkOut]:
     """Get a bookmark by its ID."""
-    stmt = select(Bookmark).where(Bookmark.id == bookmark_id)
-    result = await session.execute(stmt)
-    bookmark = result.scalar_one_or_none()
-    return _to_response(bookmark) if bookmark else None
+    stmt = select(*_TABLE.columns).where(_TABLE.c.id == bookmark_id)
+    row = (await session.execute(stmt)).first()
+    return _row_to_response(row) if row else None
+
+
+async def get_record(
+    session: AsyncSession,
+    bookmark_id: int,
+    fields: Optional[tuple[str, ...]] = None,
+) -> Optional[serialization.BookmarkRecord]:
+    """Get a bookmark by ID as a response record, reading only `fields` if given."""
+    stmt = select(*_columns(fields)).where(_TABLE.c.id == bookmark_id)
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return None
+    if fields:
+        return serialization.sparse_record(row, fields)
+    return serialization.bookmark_record(row)
+
+
+async def get_records(
+    session: AsyncSession,
+    scored: list[tuple[int, float]],
+    fields: Optional[tuple[str, ...]] = None,
+) -> list[serialization.BookmarkRecord]:
+    """
+    Records for ranked (id, score) pairs, in the given order.
+
+    Ids that no longer exist are skipped; every record carries its score,
+    also when `fields` selects only some columns.
+    """
+    if not scored:
+        return []
+    stmt = select(*_columns(fields, "id")).where(_TABLE.c.id.in_([i for i, _ in scored]))
+    rows = {row.id: row for row in (await session.execute(stmt)).all()}
+    records = []
+    for bookmark_id, score in scored:
+        row = rows.get(bookmark_id)
+        if row is None:
+            continue
+        if fields:
+            record = serialization.sparse_record(row, fields)
+            record["score"] = round(score, 4)
+        else:
+            record = serialization.bookmark_record(row, score=round(score, 4))
+        records.append(record)
+    return records
 
 
 async def get_by_url(session: AsyncSession, url: str) -> Optional[BookmarkOut]:
-    """Get a bookmark by its URL."""
-    stmt = select(Bookmark).where(Bookmark.url == url)
-    result = await session.execute(stmt)
-    bookmark = result.scalar_one_or_none()
-    return _to_response(bookmark) if bookmark else None
+    """
+    Get the bookmark for a URL or any variant of it (same canonical URL),
+    preferring an exact match. Unknown URLs are answered from the URL index.
+    """
+    canonical_url = canonical.canonicalize(url)
+    if not url_index.might_contain(canonical_url):
+        return None
+    stmt = (
+        select(*_TABLE.columns)
+        .where(_TABLE.c.canonical_url == canonical_url)
+        .order_by((_TABLE.c.url == url).desc(), _TABLE.c.id)
+        .limit(1)
+    )
+    row = (await session.execute(stmt)).first()
+    return _row_to_response(row) if row else None
+
+
+async def check_urls(
+    session: AsyncSession, urls: list[str]
+) -> dict[str, tuple[int, datetime]]:
+    """
+    Look up many URLs at once. Returns {url: (id, created_at)} for saved ones,
+    matching variants by canonical URL like `get_by_url`.
+
+    URLs rejected by the URL index never reach the database; the rest are
+    resolved with a single `IN` query.
+    """
+    canon = {u: canonical.canonicalize(u) for u in urls}
+    candidates = list({c for c in canon.values() if url_index.might_contain(c)})
+    if not candidates:
+        return {}
+    stmt = (
+        select(_TABLE.c.canonical_url, _TABLE.c.id, _TABLE.c.created_at)
+        .where(_TABLE.c.canonical_url.in_(candidates))
+        .order_by(_TABLE.c.id.desc())
+    )
+    found = {c: (bookmark_id, created_at) for c, bookmark_id, created_at in (await session.execute(stmt)).all()}
+    return {u: found[c] for u, c in canon.items() if c in found}
+
+
+def _columns(fields: Optional[tuple[str, ...]], *extra: str) -> list:
+    """Table columns backing a `fields` selection (all columns when None)."""
+    if fields is None:
+        return list(_TABLE.columns)
+    wanted = set(fields).union(extra)
+    return [_TABLE.c[f] for f in serialization.FIELDS if f in wanted]
+
+
+def _like_condition(term: str):
+    """Case-insensitive substring match over the searchable text columns."""
+    like_pattern = f"%{term}%"
+    return or_(
+        col(Bookmark.title).ilike(like_pattern),
+        col(Bookmark.url).ilike(like_pattern),
+        col(Bookmark.description).ilike(like_pattern),
+        col(Bookmark.domain).ilike(like_pattern),
+    )
+
+
+def _filter_conditions(
+    query: Optional[str],
+    tags: Optional[list[str]],
+    tag_mode: tagging.TagMode,
+    domain: Optional[str],
+) -> tuple[list, bool]:
+    """
+    WHERE conditions for the listing filters, and whether they match through
+    the FTS5 index (the caller then joins `search.fts_table`).
+    """
+    conditions = []
+    uses_fts = False
+
+    if query:
+        fts_terms, short_terms = search.split_terms(query)
+        if fts_terms:
+            conditions.append(search.match_condition(search.build_match_expression(fts_terms)))
+            conditions.extend(_like_condition(t) for t in short_terms)
+            uses_fts = True
+        else:
+            conditions.append(_like_condition(query.strip()))
+
+    tag_names = tagging.normalize(tags or [])
+    if tag_names:
+        conditions.append(tagging.filter_condition(tag_names, tag_mode))
+
+    if domain:
+        conditions.append(_TABLE.c.domain == domain.strip().lower())
+
+    return conditions, uses_fts
 
 
 async def list_all(
     session: AsyncSession,
     *,
     query: Optional[str] = None,
-    tag: Optional[str] = None,
+    tags: Optional[list[str]] = None,
+    tag_mode: tagging.TagMode = "all",
+    domain: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[BookmarkOut], int]:
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    highlight: bool = False,
+    fields: Optional[tuple[str, ...]] = None,
+) -> tuple[list[serialization.BookmarkRecord], Optional[int], Optional[str]]:
     """
-    List bookmarks with optional keyword/tag filter.
-    Returns (items, total_count).
+    List bookmarks with optional keyword/tag/domain filter.
+    Returns (items, total_count, next_cursor); items are plain response
+    records, ready for `serialization.dump_page`.
+
+    `tags` are resolved through the tag index; `tag_mode` selects whether a
+    bookmark must carry all of them ("all") or at least one ("any"). `domain`
+    matches the host name exactly.
+
+    Keyword queries go through the FTS5 index and are ordered by BM25 rank;
+    terms too short for the index are applied as LIKE filters. With
+    `highlight`, each item carries a snippet of the best-matching text.
+
+    Recency-ordered listings page by keyset on `(created_at, id)`: pass the
+    returned `next_cursor` back as `cursor` (`offset` is then ignored). The
+    total is skipped when `with_total` is False, and read from the maintained
+    counter for unfiltered listings.
+
+    `fields` (see `serialization.parse_fields`) limits both the SELECT list and
+    the returned records, so unrequested columns are never read.
+
+    Raises `pagination.InvalidCursor` for a malformed cursor or a cursor
+    combined with a relevance-ranked query.
     """
-    # Build base query
-    stmt = select(Bookmark)
+    # Build base query over plain columns: rows skip ORM identity-map bookkeeping.
+    # The keyset cursor always needs (created_at, id).
+    stmt = select(*_columns(fields, "id", "created_at"))
     count_stmt = select(func.count(Bookmark.id))
 
     # Apply filters
-    conditions = []
-
-    if query:
-        like_pattern = f"%{query}%"
-        conditions.append(
-            or_(
-                col(Bookmark.title).ilike(like_pattern),
-                col(Bookmark.url).ilike(like_pattern),
-                col(Bookmark.description).ilike(like_pattern),
-                col(Bookmark.domain).ilike(like_pattern),
-            )
-        )
-
-    if tag:
-        # Match tag in comma-separated list
-        conditions.append(
-            or_(
-                col(Bookmark.tags).ilike(f"{tag},%"),      # starts with
-                col(Bookmark.tags).ilike(f"%,{tag},%"),    # in middle
-                col(Bookmark.tags).ilike(f"%,{tag}"),      # ends with
-                col(Bookmark.tags) == tag,                  # exact match (single tag)
-            )
-        )
+    conditions, ranked = _filter_conditions(query, tags, tag_mode, domain)
+    if ranked:
+        join_on = search.fts_table.c.rowid == Bookmark.id
+        stmt = stmt.join(search.fts_table, join_on)
+        count_stmt = count_stmt.join(search.fts_table, join_on)
 
     if conditions:
         for cond in conditions:
@@ -152,16 +417,135 @@ async def list_all(
             count_stmt = count_stmt.where(cond)
 
     # Get total count
-    count_result = await session.execute(count_stmt)
-    total = count_result.scalar() or 0
+    total: Optional[int] = None
+    if with_total:
+        if conditions:
+            count_result = await session.execute(count_stmt)
+            total = count_result.scalar() or 0
+        else:
+            total = await pagination.get_total(session)
 
     # Apply ordering and pagination
-    stmt = stmt.order_by(Bookmark.created_at.desc()).offset(offset).limit(limit)
+    if ranked:
+        if cursor is not None:
+            raise pagination.InvalidCursor("cursor paging is not supported for ranked search")
+        stmt = stmt.order_by(search.rank_expression(), Bookmark.created_at.desc())
+        stmt = stmt.offset(offset).limit(limit)
+    else:
+        stmt = stmt.order_by(Bookmark.created_at.desc(), col(Bookmark.id).desc())
+        if cursor is not None:
+            created_at, last_id = pagination.decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Bookmark.created_at, Bookmark.id)
+                < tuple_(
+                    literal(created_at, Bookmark.created_at.type),  # type: ignore
+                    literal(last_id),
+                )
+            )
+        else:
+            stmt = stmt.offset(offset)
+        # One extra row tells whether another page exists
+        stmt = stmt.limit(limit + 1)
+
+    if ranked and highlight:
+        stmt = stmt.add_columns(search.snippet_expression().label("snippet"))
+        result = await session.execute(stmt)
+        items = []
+        for row in result.all():
+            snippet = search.render_snippet(row.snippet)
+            if fields:
+                item = serialization.sparse_record(row, fields)
+                item["snippet"] = snippet
+            else:
+                item = serialization.bookmark_record(row, snippet)
+            items.append(item)
+        return items, total, None
 
     result = await session.execute(stmt)
-    bookmarks = result.scalars().all()
+    rows = list(result.all())
 
-    return [_to_response(b) for b in bookmarks], total
+    next_cursor = None
+    if not ranked and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = pagination.encode_cursor(last.created_at, last.id)
+
+    if fields:
+        items = [serialization.sparse_record(r, fields) for r in rows]
+    else:
+        items = [serialization.bookmark_record(r) for r in rows]
+    return items, total, next_cursor
+
+
+async def list_changes(
+    session: AsyncSession, *, since: int = 0, limit: int = 500
+) -> tuple[list[BookmarkChangeOut], bool]:
+    """
+    Changes after revision `since`, oldest first. Returns (changes, has_more).
+
+    A bookmark changed several times appears once, at its latest revision;
+    deleted bookmarks appear as tombstones. Both sides are range scans on a
+    revision index, merged in memory.
+    """
+    live_stmt = (
+        select(*_TABLE.columns)
+        .where(_TABLE.c.revision > since)
+        .order_by(_TABLE.c.revision)
+        .limit(limit + 1)
+    )
+    dead_stmt = (
+        select(BookmarkTombstone.bookmark_id, BookmarkTombstone.revision)
+        .where(BookmarkTombstone.revision > since)
+        .order_by(col(BookmarkTombstone.revision))
+        .limit(limit + 1)
+    )
+    live = (await session.execute(live_stmt)).all()
+    dead = (await session.execute(dead_stmt)).all()
+
+    changes = [
+        BookmarkChangeOut(revision=r.revision, id=r.id, deleted=False, bookmark=_row_to_response(r))
+        for r in live
+    ] + [
+        BookmarkChangeOut(revision=revision, id=bookmark_id, deleted=True)
+        for bookmark_id, revision in dead
+    ]
+    changes.sort(key=lambda c: c.revision)
+    return changes[:limit], len(changes) > limit
+
+
+async def find_duplicates(
+    session: AsyncSession, *, threshold: Optional[float] = None, limit: int = 50
+) -> tuple[list[DuplicateGroupOut], int]:
+    """
+    Groups of bookmarks for the same page. Returns (groups, bookmarks scanned).
+
+    Compares title, description and the start of fetched page text; see
+    `app.duplicates`. The matching runs in a worker thread.
+    """
+    from app import duplicates  # NumPy-backed; loaded on first use, not at startup
+
+    cfg = get_settings().duplicates
+    meta = PageMetadata.__table__  # type: ignore[attr-defined]
+    stmt = (
+        select(_TABLE.c.id, _TABLE.c.canonical_url, _TABLE.c.title, _TABLE.c.description, meta.c.text)
+        .select_from(_TABLE.outerjoin(meta, meta.c.bookmark_id == _TABLE.c.id))
+        .order_by(_TABLE.c.id)
+    )
+    rows = [
+        (r.id, r.canonical_url, f"{r.title}\n{r.description}\n{(r.text or '')[:cfg.text_chars]}")
+        for r in (await session.execute(stmt)).all()
+    ]
+    groups = (await asyncio.to_thread(duplicates.find_duplicates, rows, cfg, threshold))[:limit]
+
+    wanted = {i for _, ids, _ in groups for i in ids}
+    found = await session.execute(select(*_TABLE.columns).where(_TABLE.c.id.in_(wanted)))
+    by_id = {row.id: _row_to_response(row) for row in found.all()}
+    return [
+        DuplicateGroupOut(
+            kind=kind, similarity=round(similarity, 4), bookmarks=[by_id[i] for i in ids if i in by_id]
+        )
+        for kind, ids, similarity in groups
+    ], len(rows)
 
 
 async def update(
@@ -186,15 +570,87 @@ async def update(
     if description is not None:
         bookmark.description = description
     if favicon is not None:
-        bookmark.favicon = favicon
+        bookmark.favicon = await favicons.intern(session, favicon)
     if tags is not None:
-        bookmark.tags = ",".join(tags)
+        tag_names = tagging.normalize(tags)
+        bookmark.tags = ",".join(tag_names)
+        await tagging.sync_bookmark_tags(session, bookmark_id, tag_names)
 
     bookmark.updated_at = datetime.now(timezone.utc)
 
-    await session.commit()
+    await write_queue.commit(session)
     await session.refresh(bookmark)
-    return _to_response(bookmark)
+    response = _to_response(bookmark)
+    write_queue.after_commit(session, data_version.bump)
+    write_queue.after_commit(
+        session, lambda: events.hub.publish("updated", response.model_dump(mode="json"))
+    )
+    return response
+
+
+async def apply_metadata(session: AsyncSession, results: list[dict]) -> int:
+    """
+    Store fetched page metadata and fill in empty bookmark titles/descriptions.
+
+    Each result carries the `PageMetadata` columns. Text the user or client
+    provided is never overwritten. New page content advances the bookmark's
+    revision (see `app.changes`), so those bookmarks are announced as
+    updated too. Returns the number of bookmarks filled in.
+    """
+    if not results:
+        return 0
+    revision = await changes.current_revision(session)
+    stmt = sqlite_insert(PageMetadata.__table__)  # type: ignore[arg-type]
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["bookmark_id"],
+            set_={c: stmt.excluded[c] for c in results[0] if c != "bookmark_id"},
+        ),
+        results,
+    )
+
+    # One set-based UPDATE ... FROM page_metadata fills every row that
+    # has an empty title/description and fetched text to put there
+    meta = PageMetadata.__table__
+    ids = [r["bookmark_id"] for r in results if r["title"] or r["description"]]
+    filled = 0
+    if ids:
+        result = await session.execute(
+            _TABLE.update()
+            .where(
+                _TABLE.c.id == meta.c.bookmark_id,
+                meta.c.bookmark_id.in_(ids),
+                or_(
+                    and_(_TABLE.c.title == "", meta.c.title != ""),
+                    and_(_TABLE.c.description == "", meta.c.description != ""),
+                ),
+            )
+            .values(
+                title=case((_TABLE.c.title == "", meta.c.title), else_=_TABLE.c.title),
+                description=case(
+                    (_TABLE.c.description == "", meta.c.description),
+                    else_=_TABLE.c.description,
+                ),
+            )
+        )
+        filled = result.rowcount
+
+    changed = [_row_to_response(row) for row in await session.execute(
+        select(*_TABLE.columns).where(
+            _TABLE.c.id.in_([r["bookmark_id"] for r in results]),
+            _TABLE.c.revision > revision,
+        )
+    )]
+    await write_queue.commit(session)
+    if changed:
+        write_queue.after_commit(session, data_version.bump)
+
+        def publish() -> None:
+            for bookmark in changed:
+                events.hub.publish("updated", bookmark.model_dump(mode="json"))
+
+        write_queue.after_commit(session, publish)
+    return filled
 
 
 async def delete(session: AsyncSession, bookmark_id: int) -> bool:
@@ -206,6 +662,166 @@ async def delete(session: AsyncSession, bookmark_id: int) -> bool:
     if not bookmark:
         return False
 
+    canonical_url = bookmark.canonical_url
     await session.delete(bookmark)
-    await session.commit()
+    await write_queue.commit(session)
+    # Other rows may share the canonical URL (saved before it was introduced)
+    still_saved = (await session.execute(
+        select(_TABLE.c.id).where(_TABLE.c.canonical_url == canonical_url).limit(1)
+    )).first()
+    if still_saved is None:
+        write_queue.after_commit(session, lambda: url_index.discard(canonical_url))
+    write_queue.after_commit(session, data_version.bump)
+    write_queue.after_commit(
+        session, lambda: events.hub.publish("deleted", {"id": bookmark_id, "url": bookmark.url})
+    )
     return True
+
+
+# Selected ids of a bulk change, kept on the writer connection for its duration
+_SELECTION = sa.table("bulk_selection", sa.column("id", sa.Integer))
+_BULK_CHUNK = 5000
+
+
+async def bulk_update(
+    session: AsyncSession,
+    *,
+    ids: Optional[list[int]] = None,
+    query: Optional[str] = None,
+    tags: Optional[list[str]] = None,
+    tag_mode: tagging.TagMode = "all",
+    domain: Optional[str] = None,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    favicon: Optional[str] = None,
+    set_tags: Optional[list[str]] = None,
+    add_tags: Optional[list[str]] = None,
+    remove_tags: Optional[list[str]] = None,
+    delete: bool = False,
+) -> BookmarkBulkOut:
+    """
+    Change or delete every bookmark matching `ids` and the `list_all` filters.
+
+    The selection is materialized into a temp table first, so later steps
+    neither re-run the search nor see it shift (removing the tag a selection
+    was made by). Field updates and deletes are single set-based statements.
+    Tag edits rewrite each row's tag string chunk by chunk with one
+    executemany per chunk, plus `tagging.sync_many`. Everything happens in
+    the caller's transaction. `updated` counts rows the revision triggers
+    saw change, so no-op edits are not counted.
+    """
+    await session.execute(sa.text(f"DROP TABLE IF EXISTS temp.{_SELECTION.name}"))
+    await session.execute(sa.text(f"CREATE TEMP TABLE {_SELECTION.name} (id INTEGER PRIMARY KEY)"))
+
+    conditions, uses_fts = _filter_conditions(query, tags, tag_mode, domain)
+    matching = select(_TABLE.c.id)
+    if uses_fts:
+        matching = matching.join(search.fts_table, search.fts_table.c.rowid == _TABLE.c.id)
+    for cond in conditions:
+        matching = matching.where(cond)
+    if ids is None:
+        await session.execute(sa.insert(_SELECTION).from_select(["id"], matching))
+    else:
+        # Too many for bound parameters: load the ids, then drop non-matches
+        if ids:
+            await session.execute(
+                sa.insert(_SELECTION).prefix_with("OR IGNORE"), [{"id": i} for i in ids]
+            )
+        await session.execute(sa.delete(_SELECTION).where(_SELECTION.c.id.not_in(matching)))
+    selected = select(_SELECTION.c.id)
+    matched = (await session.execute(select(func.count()).select_from(_SELECTION))).scalar() or 0
+
+    revision = await changes.current_revision(session)
+    deleted = 0
+    unsaved: list[str] = []
+    if delete and matched:
+        # Canonical URLs no bookmark outside the selection shares
+        other = _TABLE.alias("other")
+        unsaved = list((await session.execute(
+            select(_TABLE.c.canonical_url).distinct()
+            .where(_TABLE.c.id.in_(selected))
+            .where(~sa.exists().where(
+                other.c.canonical_url == _TABLE.c.canonical_url,
+                other.c.id.not_in(selected),
+            ))
+        )).scalars())
+        deleted = (await session.execute(_TABLE.delete().where(_TABLE.c.id.in_(selected)))).rowcount
+    elif matched:
+        now = datetime.now(timezone.utc)
+        values: dict = {}
+        if title is not None:
+            values["title"] = title
+        if description is not None:
+            values["description"] = description
+        if favicon is not None:
+            values["favicon"] = await favicons.intern(session, favicon)
+        if values:
+            await session.execute(
+                _TABLE.update()
+                .where(_TABLE.c.id.in_(selected))
+                .where(or_(*(_TABLE.c[name].is_distinct_from(v) for name, v in values.items())))
+                .values(**values, updated_at=now)
+            )
+        if set_tags is not None or add_tags or remove_tags:
+            await _bulk_retag(session, set_tags, add_tags or [], remove_tags or [], now)
+
+    updated = 0
+    if not delete and matched:
+        updated = (await session.execute(
+            select(func.count()).select_from(_TABLE)
+            .where(_TABLE.c.id.in_(selected), _TABLE.c.revision > revision)
+        )).scalar() or 0
+    await session.execute(sa.text(f"DROP TABLE temp.{_SELECTION.name}"))
+    await write_queue.commit(session)
+
+    changed = deleted or updated
+    if changed:
+        def after() -> None:
+            for canonical_url in unsaved:
+                url_index.discard(canonical_url)
+            data_version.bump()
+            events.hub.publish("bulk", {"count": changed})
+
+        write_queue.after_commit(session, after)
+    return BookmarkBulkOut(matched=matched, updated=updated, deleted=deleted)
+
+
+async def _bulk_retag(
+    session: AsyncSession,
+    set_tags: Optional[list[str]],
+    add_tags: list[str],
+    remove_tags: list[str],
+    now: datetime,
+) -> None:
+    """Apply tag edits to the selected bookmarks, `_BULK_CHUNK` rows at a time."""
+    replacement = tagging.normalize(set_tags) if set_tags is not None else None
+    added = tagging.normalize(add_tags)
+    removed = {tagging.fold(name) for name in tagging.normalize(remove_tags)}
+    rewrite = (
+        _TABLE.update()
+        .where(_TABLE.c.id == bindparam("b_id"))
+        .values(tags=bindparam("b_tags"), updated_at=now)
+    )
+    last_id = 0
+    while True:
+        rows = (await session.execute(
+            select(_TABLE.c.id, _TABLE.c.tags)
+            .join(_SELECTION, _SELECTION.c.id == _TABLE.c.id)
+            .where(_SELECTION.c.id > last_id)
+            .order_by(_SELECTION.c.id)
+            .limit(_BULK_CHUNK)
+        )).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        links: dict[int, list[str]] = {}
+        for bookmark_id, stored in rows:
+            names = tagging.split_stored(stored) if replacement is None else replacement
+            names = [n for n in tagging.normalize([*names, *added]) if tagging.fold(n) not in removed]
+            if ",".join(names) != stored:
+                links[bookmark_id] = names
+        if links:
+            await session.execute(
+                rewrite, [{"b_id": i, "b_tags": ",".join(ns)} for i, ns in links.items()]
+            )
+            await tagging.sync_many(session, links)
@@ -0,0 +1,60 @@
+"""Favicon store maintenance: removing icons no bookmark refers to."""
+
+import asyncio
+import logging
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import changes, favicons, write_queue
+from app.config import get_settings
+from app.database import session_scope
+
+logger = logging.getLogger("arvai-kernel.favicons")
+
+
+async def remove_unreferenced(session: AsyncSession) -> list[str]:
+    """Delete `favicons` rows and blobs no bookmark refers to; returns their hashes."""
+    await write_queue.lock(session)
+    prefix = favicons.ROUTE_PREFIX
+    result = await session.execute(
+        sa.text(
+            "DELETE FROM favicons WHERE hash NOT IN ("
+            "  SELECT substr(favicon, :start) FROM bookmarks"
+            "  WHERE substr(favicon, 1, :length) = :prefix"
+            ") RETURNING hash"
+        ),
+        {"start": len(prefix) + 1, "length": len(prefix), "prefix": prefix},
+    )
+    hashes = list(result.scalars())
+    # Still under the write lock: no save can refer to these blobs meanwhile
+    await asyncio.to_thread(favicons.remove_blobs, hashes)
+    await write_queue.commit(session)
+    return hashes
+
+
+async def sweep() -> int:
+    """Run `remove_unreferenced` in its own write; returns the number removed."""
+    async with session_scope() as session:
+        removed = await write_queue.execute(session, remove_unreferenced)
+    if removed:
+        logger.info("Removed %d unreferenced favicons", len(removed))
+    return len(removed)
+
+
+async def run_sweeper() -> None:
+    """Background task: sweep when bookmarks have changed, until cancelled."""
+    interval = get_settings().favicons.sweep_interval
+    if interval <= 0:
+        return
+    swept_revision = None
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_scope(readonly=True) as session:
+                revision = await changes.current_revision(session)
+            if revision != swept_revision:
+                await sweep()
+                swept_revision = revision
+        except Exception:
+            logger.exception("Favicon sweep failed")
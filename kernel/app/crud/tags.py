@@ -0,0 +1,24 @@
+"""Tag CRUD operations."""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, func
+
+from app.models import BookmarkTag, Tag
+from app.schemas import TagOut
+
+
+async def list_all(session: AsyncSession) -> list[TagOut]:
+    """
+    List tags in use with their bookmark counts, most used first.
+
+    Counts are aggregated from the `bookmark_tags` index, not from bookmark rows.
+    """
+    count = func.count(BookmarkTag.bookmark_id)
+    stmt = (
+        select(Tag.name, count)
+        .join(BookmarkTag, BookmarkTag.tag_id == Tag.id)
+        .group_by(Tag.id)
+        .order_by(count.desc(), Tag.name)
+    )
+    result = await session.execute(stmt)
+    return [TagOut(name=name, count=n) for name, n in result.all()]
@@ -1,35 +1,91 @@
 """Async SQLite database engine and session management via SQLModel."""
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import sqlalchemy as sa
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel
 
 from app.config import get_settings
+from app import diagnostics, metrics, migrations, search
+from app.pagination import COUNTS_TABLE
 
 # ---------------------------------------------------------------------------
-# Engine (module-level singleton, created lazily)
+# Engines (module-level singletons, created lazily)
+#
+# One writer connection serializes all writes; a small pool of query-only
+# connections serves reads. Under WAL, readers never wait on the writer.
 # ---------------------------------------------------------------------------
 
 _engine = None
+_read_engine = None
+
+
+def _apply_pragmas(dbapi_connection, readonly: bool) -> None:
+    """Apply the configured SQLite performance profile to a new connection."""
+    cfg = get_settings().database
+    cursor = dbapi_connection.cursor()
+    if not readonly:
+        # journal_mode is persistent and needs write access; the writer sets it
+        cursor.execute(f"PRAGMA journal_mode={cfg.journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={cfg.synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={cfg.busy_timeout}")
+    cursor.execute(f"PRAGMA cache_size={cfg.cache_size}")
+    cursor.execute(f"PRAGMA mmap_size={cfg.mmap_size}")
+    cursor.execute(f"PRAGMA temp_store={cfg.temp_store}")
+    if readonly:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _create_engine(*, readonly: bool):
+    settings = get_settings()
+    db_path = Path(settings.database.path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    db_url = f"sqlite+aiosqlite:///{db_path}"
+    pool_size = settings.database.reader_pool_size if readonly else 1
+    engine = create_async_engine(
+        db_url,
+        echo=settings.server.debug,
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    event.listen(
+        engine.sync_engine,
+        "connect",
+        lambda dbapi_connection, _record: _apply_pragmas(dbapi_connection, readonly),
+    )
+    if settings.metrics.enabled:
+        metrics.instrument(engine.sync_engine, "reader" if readonly else "writer")
+    if settings.diagnostics.slow_query_ms > 0:
+        diagnostics.instrument(engine.sync_engine, "reader" if readonly else "writer")
+    return engine
 
 
 def _get_engine():
+    """The single writer engine."""
     global _engine
     if _engine is None:
-        settings = get_settings()
-        db_path = Path(settings.database.path)
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-
-        db_url = f"sqlite+aiosqlite:///{db_path}"
-        _engine = create_async_engine(db_url, echo=settings.server.debug)
+        _engine = _create_engine(readonly=False)
     return _engine
 
 
-# Session factory
+def _get_read_engine():
+    """The read-only engine; created after the writer so WAL is already on."""
+    global _read_engine
+    if _read_engine is None:
+        _get_engine()
+        _read_engine = _create_engine(readonly=True)
+    return _read_engine
+
+
+# Session factories
 _async_session_factory = None
+_read_session_factory = None
 
 
 def _get_session_factory():
@@ -43,20 +99,56 @@ def _get_session_factory():
     return _async_session_factory
 
 
+def _get_read_session_factory():
+    global _read_session_factory
+    if _read_session_factory is None:
+        _read_session_factory = sessionmaker(
+            bind=_get_read_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _read_session_factory
+
+
 # ---------------------------------------------------------------------------
 # Lifecycle helpers (called from main.py lifespan)
 # ---------------------------------------------------------------------------
 
 async def init_db() -> None:
-    """Create all tables defined in SQLModel metadata."""
+    """Bring the schema up to date (see app.migrations)."""
+    engine = _get_engine()
+    async with engine.begin() as conn:
+        # Take the write lock before reading the schema version, so worker
+        # processes starting together migrate one after another
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        await migrations.migrate(conn)
+
+
+async def build_online_indexes() -> None:
+    """Build indexes deferred until after startup (see app.migrations)."""
+    await migrations.build_online_indexes(_get_engine())
+
+
+async def rebuild_search_index() -> None:
+    """Rebuild the full-text search index from the bookmarks table."""
     engine = _get_engine()
     async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        await search.ensure_index(conn)
+        await search.rebuild_index(conn)
+        # Search results may differ afterwards: a new revision makes running
+        # servers drop their cached responses (see app.coherence)
+        await conn.execute(sa.text(
+            f"UPDATE {COUNTS_TABLE} SET value = value + 1 WHERE name = 'revision'"
+        ))
 
 
 async def close_db() -> None:
-    """Dispose of the engine connection pool."""
-    global _engine, _async_session_factory
+    """Dispose of the reader and writer connection pools."""
+    global _engine, _read_engine, _async_session_factory, _read_session_factory
+    if _read_engine is not None:
+        await _read_engine.dispose()
+        _read_engine = None
+        _read_session_factory = None
     if _engine is not None:
         await _engine.dispose()
         _engine = None
@@ -68,7 +160,22 @@ async def close_db() -> None:
 # ---------------------------------------------------------------------------
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    """Yield an async session for use in route handlers via `Depends`."""
+    """Yield a writer session for use in route handlers via `Depends`."""
     factory = _get_session_factory()
     async with factory() as session:
         yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield a read-only session for GET route handlers via `Depends`."""
+    factory = _get_read_session_factory()
+    async with factory() as session:
+        yield session
+
+
+@asynccontextmanager
+async def session_scope(*, readonly: bool = False) -> AsyncIterator[AsyncSession]:
+    """Open a standalone session outside a request (background tasks, CLI)."""
+    factory = _get_read_session_factory() if readonly else _get_session_factory()
+    async with factory() as session:
+        yield session
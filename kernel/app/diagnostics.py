@@ -0,0 +1,317 @@
+"""Request profiler and slow-query log (served under `/api/debug`).
+
+* Slow-query log: `instrument(engine)` times every statement. Any statement
+  slower than `diagnostics.slow_query_ms` is recorded in a ring buffer with
+  its bound parameters and its SQLite `EXPLAIN QUERY PLAN`. The plan is
+  captured right away, on the same connection, so temp tables and the open
+  transaction are visible to it.
+* Request profiler: `ProfilerMiddleware` samples the event-loop thread every
+  `profile_interval_ms` while a profiled request is in flight. When the
+  request's task is on the CPU, the sample is its Python stack, under
+  `(running)`. Otherwise it is the chain of coroutines the task is suspended
+  in (an SQL round trip, a thread hop, the loop being busy with someone
+  else), under `(waiting)`. The result is wall-clock folded stacks
+  ("a;b;c 12" per line), ready for flamegraph.pl or speedscope. Requests
+  are profiled when `diagnostics.profile_requests` is on, or when they
+  carry an `X-Arvai-Profile` header and `server.debug` is on.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger("arvai-kernel.diagnostics")
+
+PROFILE_HEADER = "x-arvai-profile"
+PROFILE_ID_HEADER = b"x-arvai-profile-id"
+
+_EXPLAINABLE = ("select", "insert", "update", "delete", "replace", "with")
+_MAX_PARAMS = 50
+_MAX_PARAM_CHARS = 200
+
+
+# ---------------------------------------------------------------------------
+# Slow-query log
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SlowQuery:
+    """One statement that ran longer than the threshold."""
+
+    statement: str
+    parameters: list[Any]
+    duration_ms: float
+    engine: str
+    plan: list[str]
+    executemany: bool = False
+    recorded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+_slow_queries: deque[SlowQuery] = deque(maxlen=get_settings().diagnostics.slow_query_log_size)
+
+
+def _shorten(value: Any) -> Any:
+    if isinstance(value, (str, bytes)) and len(value) > _MAX_PARAM_CHARS:
+        return f"{value[:_MAX_PARAM_CHARS]!r}… ({len(value)} chars)"
+    if isinstance(value, (int, float, str, type(None))):
+        return value
+    return repr(value)[:_MAX_PARAM_CHARS]
+
+
+def _loggable(parameters: Any, executemany: bool) -> list[Any]:
+    """Bound parameters as a JSON-friendly, size-capped list."""
+    if executemany:
+        return [_loggable(row, False) for row in list(parameters)[:_MAX_PARAMS]]
+    values = list(parameters.values()) if isinstance(parameters, dict) else list(parameters or ())
+    shown = [_shorten(v) for v in values[:_MAX_PARAMS]]
+    if len(values) > _MAX_PARAMS:
+        shown.append(f"… {len(values) - _MAX_PARAMS} more")
+    return shown
+
+
+def _query_plan(dbapi_connection, statement: str, parameters: Any, executemany: bool) -> list[str]:
+    """`EXPLAIN QUERY PLAN` as indented lines, like the sqlite3 shell prints it."""
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return []
+    if executemany:
+        parameters = next(iter(parameters), ())
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        return [f"(no plan: {e})"]
+    finally:
+        cursor.close()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def instrument(engine: Engine, name: str) -> None:
+    """Record `engine`'s statements that exceed the slow-query threshold."""
+    threshold = get_settings().diagnostics.slow_query_ms / 1000
+
+    def before(conn, cursor, statement, parameters, context, executemany) -> None:
+        context._diagnostics_started = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._diagnostics_started
+        if elapsed < threshold:
+            return
+        entry = SlowQuery(
+            statement=statement,
+            parameters=_loggable(parameters, executemany),
+            duration_ms=round(elapsed * 1000, 3),
+            engine=name,
+            plan=_query_plan(conn.connection.dbapi_connection, statement, parameters, executemany),
+            executemany=executemany,
+        )
+        _slow_queries.append(entry)
+        logger.debug("Slow query (%.1f ms): %s", entry.duration_ms, statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+
+
+def slow_queries(limit: Optional[int] = None) -> list[SlowQuery]:
+    """Logged slow statements, newest first."""
+    entries = list(reversed(_slow_queries))
+    return entries[:limit] if limit else entries
+
+
+def clear_slow_queries() -> None:
+    _slow_queries.clear()
+
+
+# ---------------------------------------------------------------------------
+# Sampling profiler
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Profile:
+    """Folded-stack samples of one request."""
+
+    method: str
+    path: str
+    interval_ms: float
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    route: str = ""
+    status: int = 0
+    duration_ms: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Set while the request runs; cleared when it is stored
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    root: Optional[FrameType] = field(default=None, repr=False)  # the middleware's frame
+    thread_id: int = 0
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}:{frame.f_lineno}"
+
+
+def _running_stack(frame: Optional[FrameType], root: FrameType) -> Optional[list[str]]:
+    """Thread stack from `root` up, if `root` is on it."""
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame))
+        if frame is root:
+            stack.reverse()
+            return stack
+        frame = frame.f_back
+    return None
+
+
+def _waiting_stack(coro, root: FrameType) -> list[str]:
+    """Chain of coroutines (and generators) a suspended task awaits in, from `root` on."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            stack.append(f"<{type(coro).__name__}>")
+            break
+        if stack or frame is root:
+            stack.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+class _Sampler:
+    """One daemon thread sampling every profile in flight; idles when none are."""
+
+    def __init__(self) -> None:
+        self._active: dict[str, Profile] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                # The sampler needs the GIL on time; by default it waits up to 5 ms
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval, profile.interval_ms / 2000))
+                self._thread = threading.Thread(
+                    target=self._run, name="arvai-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def remove(self, profile: Profile) -> None:
+        with self._lock:
+            self._active.pop(profile.id, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    sys.setswitchinterval(self._switch_interval)
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in active:
+                task, root = profile.task, profile.root
+                if task is None or root is None:
+                    continue
+                stack = _running_stack(frames.get(profile.thread_id), root)
+                if stack is not None:
+                    profile.samples[";".join(["(running)", *stack])] += 1
+                else:
+                    waiting = _waiting_stack(task.get_coro(), root)
+                    profile.samples[";".join(["(waiting)", *waiting])] += 1
+            time.sleep(min(p.interval_ms for p in active) / 1000)
+
+
+_sampler = _Sampler()
+_profiles: OrderedDict[str, Profile] = OrderedDict()
+
+
+def _store(profile: Profile) -> None:
+    _profiles[profile.id] = profile
+    while len(_profiles) > get_settings().diagnostics.profile_history:
+        _profiles.popitem(last=False)
+
+
+def profiles() -> list[Profile]:
+    """Stored request profiles, newest first."""
+    return list(reversed(_profiles.values()))
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    return _profiles.get(profile_id)
+
+
+class ProfilerMiddleware:
+    """Profiles requests that opt in (or all of them, if configured)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        settings = get_settings()
+        self.cfg = settings.diagnostics
+        self.allow_header = settings.server.debug
+
+    def _wanted(self, scope) -> bool:
+        if self.cfg.profile_requests:
+            return True
+        if not self.allow_header:
+            return False
+        return any(name == PROFILE_HEADER.encode() for name, _ in scope["headers"])
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(
+            method=scope["method"],
+            path=scope["path"],
+            interval_ms=self.cfg.profile_interval_ms,
+            task=asyncio.current_task(),
+            root=sys._getframe(),
+            thread_id=threading.get_ident(),
+        )
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []), (PROFILE_ID_HEADER, profile.id.encode())
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        _sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _sampler.remove(profile)
+            profile.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            profile.route = getattr(scope.get("route"), "path", "")
+            profile.task = profile.root = None
+            _store(profile)
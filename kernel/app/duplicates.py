@@ -0,0 +1,150 @@
+"""Duplicate bookmark detection.
+
+Two kinds of groups are reported:
+
+* `canonical` — rows sharing a canonical URL (saved before canonicalization
+  existed, or under different rules).
+* `similar` — different URLs whose title, description and page text are
+  near-identical (mirrors, AMP pages, reposts).
+
+Similar pages are found with MinHash signatures over word shingles and
+locality-sensitive hashing: each signature is cut into bands, bookmarks
+whose band values collide become candidates, and only candidates are
+compared (on their exact shingle overlap). Work is linear in the number
+of bookmarks instead of quadratic, and the heavy lifting is vectorized
+with NumPy.
+"""
+
+import re
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+
+from app.config import DuplicatesConfig
+
+_WORD = re.compile(r"[^\W_]+")
+_SEED = 0x5EED
+_MIN_SHINGLES = 3
+_ESTIMATE_SLACK = 0.15
+
+
+def shingles(text: str) -> set[int]:
+    """Hashed word bigrams of `text` (single words for one-word texts)."""
+    words = _WORD.findall(text.lower())
+    if len(words) < 2:
+        return {hash(w) for w in words}
+    return {hash((a, b)) for a, b in zip(words, words[1:])}
+
+
+def signatures(docs: list[set[int]], num_perm: int) -> np.ndarray:
+    """
+    (len(docs), num_perm) MinHash signatures; every doc must be non-empty.
+
+    Uses multiply-shift hashing, h(x) = (a·x + b) mod 2^64 >> 32, evaluated
+    for all shingles of all docs at once, one permutation at a time.
+    """
+    lengths = np.fromiter((len(d) for d in docs), dtype=np.intp, count=len(docs))
+    offsets = np.cumsum(lengths) - lengths
+    values = np.fromiter(
+        (x & 0xFFFFFFFF for d in docs for x in d), dtype=np.uint64, count=int(lengths.sum())
+    )
+    rng = np.random.default_rng(_SEED)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    out = np.empty((len(docs), num_perm), dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for i in range(num_perm):
+            hashed = (values * a[i] + b[i]) >> np.uint64(32)
+            out[:, i] = np.minimum.reduceat(hashed, offsets)
+    return out
+
+
+def _find(parent: list[int], x: int) -> int:
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def _jaccard(a: set[int], b: set[int]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def similar_groups(
+    docs: list[set[int]], sigs: np.ndarray, threshold: float, bands: int
+) -> list[tuple[list[int], float]]:
+    """
+    Indexes of near-duplicate groups among `docs`, with each group's lowest
+    similarity to its first member.
+
+    Within each band, every doc is compared only with the first doc of its
+    bucket. Candidates whose signatures roughly agree are verified on their
+    exact shingle Jaccard, and verified pairs are merged with union-find.
+    """
+    n, num_perm = sigs.shape
+    rows_per_band = num_perm // bands
+    parent = list(range(n))
+    checked: set[tuple[int, int]] = set()
+    for band in range(bands):
+        chunk = np.ascontiguousarray(sigs[:, band * rows_per_band:(band + 1) * rows_per_band])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows_per_band))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        leaders = first[inverse]
+        members = np.flatnonzero(leaders != np.arange(n))
+        if members.size == 0:
+            continue
+        # Signature agreement estimates Jaccard; the slack absorbs its noise
+        agree = (sigs[members] == sigs[leaders[members]]).mean(axis=1)
+        plausible = members[agree >= threshold - _ESTIMATE_SLACK]
+        for member, leader in zip(plausible.tolist(), leaders[plausible].tolist()):
+            if (member, leader) in checked:
+                continue
+            checked.add((member, leader))
+            if _jaccard(docs[member], docs[leader]) < threshold:
+                continue
+            ra, rb = _find(parent, member), _find(parent, leader)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    components: dict[int, list[int]] = defaultdict(list)
+    for i in range(n):
+        components[_find(parent, i)].append(i)
+    groups = []
+    for rows in components.values():
+        if len(rows) > 1:
+            similarity = min(_jaccard(docs[rows[0]], docs[r]) for r in rows[1:])
+            groups.append((rows, similarity))
+    return groups
+
+
+def find_duplicates(
+    rows: list[tuple[int, str, str]], cfg: DuplicatesConfig, threshold: Optional[float] = None
+) -> list[tuple[str, list[int], float]]:
+    """
+    Duplicate groups among (id, canonical_url, text) rows, as
+    (kind, ids, similarity), largest groups first.
+
+    CPU-bound; call it off the event loop.
+    """
+    threshold = cfg.threshold if threshold is None else threshold
+    by_canonical: dict[str, list[int]] = defaultdict(list)
+    texts: dict[int, str] = {}
+    for bookmark_id, canonical_url, text in rows:
+        ids = by_canonical[canonical_url]
+        ids.append(bookmark_id)
+        if len(ids) == 1:  # one representative per canonical URL
+            texts[bookmark_id] = text
+
+    groups = [("canonical", ids, 1.0) for ids in by_canonical.values() if len(ids) > 1]
+
+    # Too little text ("Home", "Login") says nothing about being the same page
+    candidates = [(i, s) for i, t in texts.items() if len(s := shingles(t)) >= _MIN_SHINGLES]
+    if len(candidates) > 1:
+        docs = [s for _, s in candidates]
+        sigs = signatures(docs, cfg.num_perm)
+        for members, similarity in similar_groups(docs, sigs, threshold, cfg.bands):
+            groups.append(("similar", [candidates[m][0] for m in members], similarity))
+
+    groups.sort(key=lambda g: (-len(g[1]), -g[2], g[1][0]))
+    return groups
@@ -0,0 +1,251 @@
+"""Background enrichment of newly saved bookmarks with page metadata.
+
+When enabled, the pipeline listens for `created` bookmark events and fetches
+each page through one pooled HTTP client. Fetching is bounded globally
+(`enrichment.concurrency` worker tasks) and per host (at most
+`per_host_concurrency` requests at once, started at least
+`per_host_interval` seconds apart). HTML extraction (`pages.extract`) runs
+in a process pool, off the event loop, and results are written back in
+batches through `crud.bookmarks.apply_metadata`. Saving a bookmark never
+waits for any of this.
+
+Tests and benchmarks can pass their own `httpx.AsyncClient` to `Enricher`
+(e.g. pointed at a local stand-in server) and wait with `Enricher.join()`.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app import pages, write_queue
+from app.config import EnrichmentConfig, get_settings
+from app.crud import bookmarks
+from app.database import session_scope
+from app.events import hub
+
+logger = logging.getLogger("arvai-kernel.enrichment")
+
+_MAX_IDLE_HOSTS = 1024
+
+
+class _HostLimiter:
+    """Concurrency cap and minimum start spacing for requests to one host."""
+
+    def __init__(self, concurrency: int, interval: float) -> None:
+        self._sem = asyncio.Semaphore(concurrency)
+        self._interval = interval
+        self._next_start = 0.0
+
+    @property
+    def idle(self) -> bool:
+        loop = asyncio.get_running_loop()
+        return not self._sem.locked() and self._next_start <= loop.time()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._sem:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+class Enricher:
+    """Fetch → extract → batched write-back pipeline."""
+
+    def __init__(
+        self, cfg: EnrichmentConfig, client: Optional[httpx.AsyncClient] = None
+    ) -> None:
+        self._cfg = cfg
+        self._client = client
+        self._owns_client = client is None
+        self._pool: Optional[Executor] = None
+        self._queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue(cfg.queue_size)
+        self._hosts: dict[str, _HostLimiter] = {}
+        self._results: list[dict] = []
+        self._flush_now = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+
+    # ---- lifecycle ----
+
+    def start(self) -> None:
+        cfg = self._cfg
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=cfg.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": cfg.user_agent, "Accept": "text/html,*/*;q=0.5"},
+                limits=httpx.Limits(
+                    max_connections=cfg.concurrency,
+                    max_keepalive_connections=cfg.concurrency,
+                ),
+            )
+        if cfg.parse_workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=cfg.parse_workers)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(cfg.concurrency)]
+        self._tasks.append(asyncio.create_task(self._write_loop()))
+        self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def join(self) -> None:
+        """Wait until every queued URL is processed and written back."""
+        await self._queue.join()
+        await self._flush()
+
+    async def stop(self) -> None:
+        """Stop fetching, write back finished results and release resources."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._flush()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, bookmark_id: int, url: str) -> bool:
+        """Queue a bookmark for enrichment; False if the queue is full."""
+        try:
+            self._queue.put_nowait((bookmark_id, url))
+        except asyncio.QueueFull:
+            logger.warning("Enrichment queue full; skipping %s", url)
+            return False
+        return True
+
+    # ---- pipeline stages ----
+
+    async def _listen(self) -> None:
+        sub = hub.subscribe()
+        try:
+            while (event := await sub.get()) is not None:
+                if event.type == "created":
+                    self.submit(event.data["id"], event.data["url"])
+        finally:
+            sub.close()
+
+    def _limiter(self, host: str) -> _HostLimiter:
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            if len(self._hosts) >= _MAX_IDLE_HOSTS:
+                self._hosts = {h: lim for h, lim in self._hosts.items() if not lim.idle}
+            limiter = self._hosts[host] = _HostLimiter(
+                self._cfg.per_host_concurrency, self._cfg.per_host_interval
+            )
+        return limiter
+
+    async def _fetch(self, url: str) -> tuple[int, Optional[bytes], Optional[str]]:
+        """(HTTP status, HTML body or None if not HTML, declared charset)."""
+        assert self._client is not None
+        async with self._limiter(urlsplit(url).hostname or "").slot():
+            async with self._client.stream("GET", url) as response:
+                content_type = response.headers.get("content-type", "")
+                if response.status_code >= 400 or "html" not in content_type:
+                    return response.status_code, None, None
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self._cfg.max_bytes:
+                        break
+                body = b"".join(chunks)[: self._cfg.max_bytes]
+                return response.status_code, body, response.charset_encoding
+
+    async def _process(self, bookmark_id: int, url: str) -> dict:
+        result = {
+            "bookmark_id": bookmark_id,
+            "status": "error",
+            "http_status": None,
+            "title": "",
+            "description": "",
+            "image": "",
+            "site_name": "",
+            "text": "",
+            "fetched_at": datetime.now(timezone.utc),
+        }
+        try:
+            status, body, encoding = await self._fetch(url)
+        except httpx.HTTPError as e:
+            logger.info("Enrichment fetch failed for %s: %s", url, e)
+            return result
+        result["http_status"] = status
+        if body is None:
+            return result
+        loop = asyncio.get_running_loop()
+        result.update(await loop.run_in_executor(self._pool, pages.extract, body, encoding))
+        result["status"] = "ok"
+        return result
+
+    async def _work(self) -> None:
+        while True:
+            bookmark_id, url = await self._queue.get()
+            try:
+                result = await self._process(bookmark_id, url)
+                self._results.append(result)
+            except Exception:
+                logger.exception("Enrichment of %s failed", url)
+            finally:
+                self._queue.task_done()
+            if len(self._results) >= self._cfg.batch_size:
+                self._flush_now.set()
+
+    async def _write_loop(self) -> None:
+        while True:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._flush_now.wait(), self._cfg.flush_interval)
+            self._flush_now.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        # Serialized so join() also waits for a batch the write loop took
+        async with self._flush_lock:
+            await self._write(self._results)
+
+    async def _write(self, batch: list[dict]) -> None:
+        self._results = []
+        if not batch:
+            return
+        try:
+            async with session_scope() as session:
+                changed = await write_queue.execute(
+                    session, partial(bookmarks.apply_metadata, results=batch)
+                )
+        except Exception:
+            logger.exception("Writing back %d enrichment results failed", len(batch))
+            return
+        logger.info("Enrichment: stored %d results, filled %d bookmarks", len(batch), changed)
+
+
+_enricher: Optional[Enricher] = None
+
+
+def start() -> None:
+    """Start the pipeline if enabled in config (called from lifespan)."""
+    global _enricher
+    cfg = get_settings().enrichment
+    if not cfg.enabled:
+        return
+    _enricher = Enricher(cfg)
+    _enricher.start()
+    logger.info(
+        "Enrichment pipeline started (concurrency=%d, per_host=%d, parse_workers=%d)",
+        cfg.concurrency, cfg.per_host_concurrency, cfg.parse_workers,
+    )
+
+
+async def stop() -> None:
+    """Stop the pipeline (called from lifespan)."""
+    global _enricher
+    enricher, _enricher = _enricher, None
+    if enricher is not None:
+        await enricher.stop()
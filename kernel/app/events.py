@@ -0,0 +1,113 @@
+"""In-process fan-out of bookmark change events to push subscribers.
+
+The bookmark write paths publish an event once their transaction has
+committed; every connected subscriber (e.g. an SSE stream) receives it via
+its own bounded queue. Publishing never blocks: a subscriber whose queue is
+full loses its backlog and gets a single `resync` event instead, telling the
+client to catch up through `GET /api/bookmarks/changes`.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Literal, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger("arvai-kernel.events")
+
+EventType = Literal["created", "updated", "deleted", "bulk", "resync"]
+
+
+@dataclass(frozen=True)
+class Event:
+    """A change notification; `data` is JSON-serializable."""
+
+    id: int
+    type: EventType
+    data: dict[str, Any]
+
+    def to_sse(self) -> str:
+        """Encode as a `text/event-stream` message."""
+        payload = json.dumps(self.data, ensure_ascii=False)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """One subscriber's bounded queue; `None` in the queue means the hub closed."""
+
+    def __init__(self, hub: "EventHub", maxsize: int) -> None:
+        self._hub = hub
+        self._queue: asyncio.Queue[Optional[Event]] = asyncio.Queue(maxsize)
+        self._overflowed = False
+
+    def _offer(self, event: Event) -> None:
+        if self._overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._overflowed = True
+            logger.info("Event subscriber fell behind; backlog dropped, resync pending")
+
+    def _close(self) -> None:
+        self._overflowed = False
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[Event]:
+        """Next event, a `resync` event after an overflow, or None once the hub closes."""
+        if self._overflowed:
+            self._overflowed = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return self._hub.make_event("resync", {})
+        return await self._queue.get()
+
+    def pending(self) -> bool:
+        """True if `get` would return without waiting."""
+        return self._overflowed or not self._queue.empty()
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+
+class EventHub:
+    """Broadcasts events to all current subscribers."""
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def make_event(self, type_: EventType, data: dict[str, Any]) -> Event:
+        return Event(next(self._ids), type_, data)
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(self, get_settings().events.queue_size)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def publish(self, type_: EventType, data: dict[str, Any]) -> None:
+        if not self._subscribers:
+            return
+        event = self.make_event(type_, data)
+        for sub in self._subscribers:
+            sub._offer(event)
+
+    def close(self) -> None:
+        """End every subscription (called at shutdown)."""
+        for sub in self._subscribers:
+            sub._close()
+        self._subscribers.clear()
+
+
+hub = EventHub()
@@ -0,0 +1,138 @@
+"""Constant-memory bookmark export: NDJSON, CSV and Netscape bookmark HTML.
+
+Rows are read in keyset pages of `EXPORT_BATCH` (`id > last`), each in a
+short read of its own, and encoded page by page: memory use depends on the
+batch size, not the library size, and a slow download never holds a pooled
+reader connection between pages.
+NDJSON and HTML output can be fed back into `app.importer`. NDJSON and CSV
+accept a field selection, which limits the columns read. Stored favicons are
+inlined as `data:` URIs, so an export does not depend on this server.
+"""
+
+import csv
+import html
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import timezone
+from typing import Literal, Optional
+
+from sqlalchemy import Row, select
+
+from app import favicons, serialization, tagging
+from app.database import session_scope
+from app.models import Bookmark
+
+ExportFormat = Literal["ndjson", "csv", "html"]
+
+EXPORT_BATCH = 1000
+
+# Label of the id column every page is read with, for the next page's key
+_PAGE_KEY = "_page_key"
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+
+_COLUMNS = serialization.FIELDS
+
+_HTML_HEADER = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+"""
+_HTML_FOOTER = "</DL><p>\n"
+
+
+def _record(r: Row, icons: dict[str, str]) -> dict:
+    """Row as a flat dict with ISO-8601 timestamps and inlined favicons."""
+    record = r._asdict()
+    record.pop(_PAGE_KEY, None)
+    for c in ("created_at", "updated_at"):
+        if c in record:
+            record[c] = record[c].isoformat()
+    if "favicon" in record:
+        record["favicon"] = icons.get(record["favicon"], record["favicon"])
+    return record
+
+
+def _ndjson(rows: Sequence[Row], icons: dict[str, str]) -> str:
+    out = []
+    for r in rows:
+        record = _record(r, icons)
+        if "tags" in record:
+            record["tags"] = tagging.split_stored(r.tags)
+        out.append(json.dumps(record, ensure_ascii=False))
+    return "\n".join(out) + "\n"
+
+
+def _csv(rows: Sequence[Row], icons: dict[str, str]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(_record(r, icons).values() for r in rows)
+    return buf.getvalue()
+
+
+def _html(rows: Sequence[Row], icons: dict[str, str]) -> str:
+    out = []
+    for r in rows:
+        created_at = r.created_at.replace(tzinfo=r.created_at.tzinfo or timezone.utc)
+        attrs = f'HREF="{html.escape(r.url)}" ADD_DATE="{int(created_at.timestamp())}"'
+        if r.tags:
+            attrs += f' TAGS="{html.escape(r.tags)}"'
+        if r.favicon:
+            attrs += f' ICON="{html.escape(icons.get(r.favicon, r.favicon))}"'
+        out.append(f"    <DT><A {attrs}>{html.escape(r.title or r.url)}</A>\n")
+        if r.description:
+            out.append(f"    <DD>{html.escape(r.description)}\n")
+    return "".join(out)
+
+
+def _csv_header(columns: Sequence[str]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(columns)
+    return buf.getvalue()
+
+
+async def stream_export(
+    fmt: ExportFormat, fields: Optional[tuple[str, ...]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Yield the whole library in `fmt`, oldest first, one encoded batch at a time.
+
+    `fields` (see `serialization.parse_fields`) selects the NDJSON/CSV
+    columns; the HTML format always uses the columns it needs. Pages are
+    read separately, so rows saved while the export runs are included and
+    rows deleted before their page is read are not.
+    """
+    columns = fields if fields and fmt != "html" else _COLUMNS
+    encode = {"ndjson": _ndjson, "csv": _csv, "html": _html}[fmt]
+    if fmt == "csv":
+        yield _csv_header(columns).encode()
+    elif fmt == "html":
+        yield _HTML_HEADER.encode()
+
+    table = Bookmark.__table__  # type: ignore[attr-defined]
+    stmt = (
+        select(*(table.c[c] for c in columns), table.c.id.label(_PAGE_KEY))
+        .order_by(table.c.id)
+        .limit(EXPORT_BATCH)
+    )
+    last_id = 0
+    while True:
+        # The reader connection goes back to the pool before the page is
+        # sent, however long the client takes to receive it
+        async with session_scope(readonly=True) as session:
+            rows = (await session.execute(stmt.where(table.c.id > last_id))).all()
+            icons = {}
+            if rows and "favicon" in columns:
+                icons = await favicons.data_uris(session, {r.favicon for r in rows})
+        if not rows:
+            break
+        last_id = rows[-1]._mapping[_PAGE_KEY]
+        yield encode(rows, icons).encode()
+
+    if fmt == "html":
+        yield _HTML_FOOTER.encode()
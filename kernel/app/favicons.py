@@ -0,0 +1,264 @@
+"""Content-addressed favicon store.
+
+Favicons submitted as `data:` URIs are decoded once and written to a blob
+directory next to the database, named by the hash of their bytes; the
+`favicons` table records each blob's media type. Bookmarks then store a
+short reference (`/api/favicons/<hash>`) instead of the URI, so an icon
+shared by thousands of bookmarks is kept, and sent to clients, only once.
+Plain `http(s)` favicon URLs are left untouched. Only image types in
+`ALLOWED_TYPES` up to `MAX_BYTES` are stored, since the store is served
+without authentication on the kernel's own origin; other `data:` URIs are
+dropped.
+
+Blobs no bookmark refers to any more are removed by a periodic sweep (see
+`app.crud.favicons`). Blobs are only written and removed under the
+database write lock, so a sweep never deletes an icon that a concurrent
+save refers to.
+
+Clients render icons from another origin (the desktop app, the extension),
+so API responses carry the reference as an absolute URL on the kernel's
+public origin (`public_url`); exports inline the icon as a `data:` URI
+again (`data_uris`), so they do not depend on this server.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote_to_bytes
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.config import get_settings
+from app.models import Bookmark, Favicon
+
+logger = logging.getLogger("arvai-kernel.favicons")
+
+ROUTE_PREFIX = "/api/favicons/"
+
+# Media types browsers render as icons and that cannot carry active content
+# outside the sandbox the route serves them in
+ALLOWED_TYPES = frozenset({
+    "image/png", "image/x-icon", "image/vnd.microsoft.icon", "image/svg+xml",
+    "image/gif", "image/jpeg", "image/webp",
+})
+MAX_BYTES = 64 * 1024
+# Longest `data:` URI accepted, with room for base64 or percent-encoding
+MAX_URI_LENGTH = 4 * MAX_BYTES
+
+_HASH_RE = re.compile(r"^[0-9a-f]{32}$")
+_MIGRATE_CHUNK = 500
+
+
+def store_dir() -> Path:
+    """Blob directory, kept alongside the database file."""
+    return Path(get_settings().database.path).parent / "favicons"
+
+
+def public_origin() -> str:
+    """Origin clients reach the kernel at (`server.public_url`, else host/port)."""
+    server = get_settings().server
+    if server.public_url:
+        return server.public_url.rstrip("/")
+    host = "127.0.0.1" if server.host in ("", "0.0.0.0", "::") else server.host
+    if ":" in host:
+        host = f"[{host}]"
+    return f"http://{host}:{server.port}"
+
+
+def public_url(favicon: str) -> str:
+    """A stored favicon value as clients should use it."""
+    if favicon.startswith(ROUTE_PREFIX):
+        return public_origin() + favicon
+    return favicon
+
+
+def is_valid_hash(value: str) -> bool:
+    return _HASH_RE.match(value) is not None
+
+
+def blob_path(content_hash: str) -> Path:
+    return store_dir() / content_hash[:2] / content_hash
+
+
+def _decode_data_uri(uri: str) -> Optional[tuple[str, bytes]]:
+    """
+    (media type, bytes) of a `data:` URI, or None if it is not a valid one,
+    not of an allowed image type, or larger than `MAX_BYTES`.
+    """
+    if len(uri) > MAX_URI_LENGTH:
+        return None
+    header, sep, payload = uri[5:].partition(",")
+    if not sep:
+        return None
+    params = header.split(";")
+    mime_type = params[0].strip().lower()
+    if mime_type not in ALLOWED_TYPES:
+        return None
+    try:
+        if "base64" in params[1:]:
+            data = base64.b64decode(payload, validate=False)
+        else:
+            data = unquote_to_bytes(payload)
+    except (binascii.Error, ValueError):
+        return None
+    return (mime_type, data) if 0 < len(data) <= MAX_BYTES else None
+
+
+def _write_blob(content_hash: str, data: bytes) -> None:
+    path = blob_path(content_hash)
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so a reader never sees a partial file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _decode(uri: str) -> Optional[tuple[dict, bytes]]:
+    """A data URI's `favicons` row and bytes, or None if it cannot be stored."""
+    decoded = _decode_data_uri(uri)
+    if decoded is None:
+        return None
+    mime_type, data = decoded
+    content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return {"hash": content_hash, "mime_type": mime_type, "size": len(data)}, data
+
+
+def _write_blobs(blobs: dict[str, bytes]) -> None:
+    for content_hash, data in blobs.items():
+        _write_blob(content_hash, data)
+
+
+def remove_blobs(hashes: Iterable[str]) -> None:
+    """Delete blobs; the caller holds the write lock (see `crud.favicons`)."""
+    for content_hash in hashes:
+        blob_path(content_hash).unlink(missing_ok=True)
+
+
+async def intern_many(
+    executor: AsyncSession | AsyncConnection, values: Iterable[dict]
+) -> None:
+    """
+    Move `data:` favicons of bookmark value dicts into the store, in place.
+
+    Each dict's `favicon` is replaced by its store reference, or by "" if it
+    cannot be stored; the metadata rows are recorded on `executor`, inside
+    the caller's transaction. A `public_url` handed back by a client is
+    turned into a reference again.
+    """
+    values = list(values)
+    own_prefix = public_origin() + ROUTE_PREFIX
+    inline: set[str] = set()
+    for v in values:
+        favicon = v.get("favicon") or ""
+        if favicon.startswith(own_prefix):
+            v["favicon"] = favicon[len(own_prefix) - len(ROUTE_PREFIX):]
+        elif favicon.startswith("data:"):
+            inline.add(favicon)
+    if not inline:
+        return
+
+    # Decoding and hashing large URIs is CPU work: keep it off the loop
+    decoded = await asyncio.to_thread(lambda: {uri: _decode(uri) for uri in inline})
+    stored = {row["hash"]: (row, data) for row, data in filter(None, decoded.values())}
+    for v in values:
+        favicon = v.get("favicon") or ""
+        if favicon in decoded:
+            entry = decoded[favicon]
+            v["favicon"] = ROUTE_PREFIX + entry[0]["hash"] if entry is not None else ""
+    if not stored:
+        return
+    # The insert takes the write lock, so the blobs are written under it
+    await executor.execute(
+        sqlite_insert(Favicon.__table__)  # type: ignore[arg-type]
+        .on_conflict_do_nothing(index_elements=["hash"]),
+        [row for row, _ in stored.values()],
+    )
+    await asyncio.to_thread(_write_blobs, {h: data for h, (_, data) in stored.items()})
+
+
+async def intern(executor: AsyncSession | AsyncConnection, favicon: str) -> str:
+    """Store reference for one favicon value (unchanged unless a `data:` URI)."""
+    values = {"favicon": favicon}
+    await intern_many(executor, [values])
+    return values["favicon"]
+
+
+def _read_blobs(hashes: Iterable[str]) -> dict[str, bytes]:
+    blobs = {}
+    for content_hash in hashes:
+        try:
+            blobs[content_hash] = blob_path(content_hash).read_bytes()
+        except FileNotFoundError:
+            logger.warning("Favicon blob %s is missing", content_hash)
+    return blobs
+
+
+async def data_uris(
+    executor: AsyncSession | AsyncConnection, favicons: Iterable[str]
+) -> dict[str, str]:
+    """`data:` URIs for the store references among `favicons`, by reference."""
+    hashes = {
+        f[len(ROUTE_PREFIX):] for f in favicons
+        if f and f.startswith(ROUTE_PREFIX) and is_valid_hash(f[len(ROUTE_PREFIX):])
+    }
+    if not hashes:
+        return {}
+    result = await executor.execute(
+        sa.select(Favicon.hash, Favicon.mime_type).where(Favicon.hash.in_(hashes))
+    )
+    mime_types = dict(result.tuples().all())
+    blobs = await asyncio.to_thread(_read_blobs, mime_types)
+    return {
+        ROUTE_PREFIX + h: f"data:{mime_types[h]};base64,{base64.b64encode(data).decode()}"
+        for h, data in blobs.items()
+    }
+
+
+async def get_mime_type(session: AsyncSession, content_hash: str) -> Optional[str]:
+    result = await session.execute(
+        sa.select(Favicon.mime_type).where(Favicon.hash == content_hash)
+    )
+    return result.scalar_one_or_none()
+
+
+# ---------------------------------------------------------------------------
+# Migration (called from app.migrations)
+# ---------------------------------------------------------------------------
+
+async def migrate_inline(conn: AsyncConnection) -> None:
+    """Move favicons still stored inline as `data:` URIs into the store."""
+    # substr() rather than LIKE, which is case-insensitive
+    is_inline = sa.func.substr(Bookmark.favicon, 1, 5) == "data:"
+    rows = await conn.stream(sa.select(Bookmark.id, Bookmark.favicon).where(is_inline))
+    migrated = 0
+    async for chunk in rows.partitions(_MIGRATE_CHUNK):
+        values = [{"b_id": bookmark_id, "favicon": favicon} for bookmark_id, favicon in chunk]
+        await intern_many(conn, values)
+        rewrites = [
+            {"b_id": v["b_id"], "b_favicon": v["favicon"]}
+            for v in values
+            if v["favicon"].startswith(ROUTE_PREFIX)
+        ]
+        if rewrites:
+            await conn.execute(
+                sa.update(Bookmark)
+                .where(Bookmark.id == sa.bindparam("b_id"))
+                .values(favicon=sa.bindparam("b_favicon")),
+                rewrites,
+            )
+        migrated += len(rewrites)
+    if migrated:
+        logger.info("Moved %d inline favicons into the favicon store", migrated)
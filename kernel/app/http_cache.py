@@ -0,0 +1,129 @@
+"""Conditional GET support driven by a global data version.
+
+Every committed bookmark write bumps `data_version`. Read endpoints derive
+their ETag from (boot id, data version, request path + query), so a client
+revalidating with `If-None-Match` gets a 304 without any database work, and
+rendered JSON for recently requested keys is served from a small LRU.
+"""
+
+import hashlib
+import os
+import secrets
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import get_settings
+
+# Distinguishes ETags across restarts, when the version counter starts over.
+# Worker processes inherit one from the parent (see `main._serve`), so their
+# ETags agree.
+BOOT_ID_ENV = "ARVAI_BOOT_ID"
+_BOOT_ID = os.environ.get(BOOT_ID_ENV) or secrets.token_hex(4)
+
+_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+class DataVersion:
+    """
+    Monotonically increasing counter of committed data changes.
+
+    A server follows the shared bookmark revision through `app.coherence`,
+    which also sees other processes' commits; until then (and in tools that
+    run without it) the process counts its own commits.
+    """
+
+    def __init__(self) -> None:
+        self._value = 0
+        self._shared = False
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> None:
+        if not self._shared:
+            self._value += 1
+
+    def follow(self, value: int) -> None:
+        """Adopt a version shared with other processes; local bumps stop counting."""
+        self._shared = True
+        self._value = value
+
+
+data_version = DataVersion()
+
+
+class _ResponseCache:
+    """LRU of rendered response bodies, tagged with the version they reflect."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+
+    def get(self, key: str, version: int) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, version: int, body: bytes) -> None:
+        size = get_settings().cache.response_cache_size
+        if size <= 0:
+            return
+        self._entries[key] = (version, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+response_cache = _ResponseCache()
+
+
+def _request_key(request: Request) -> str:
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    return f"{request.url.path}?{query}"
+
+
+def make_etag(key: str, version: int) -> str:
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return f'W/"{_BOOT_ID}-{version}-{digest}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {t.strip() for t in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+async def cached_response(
+    request: Request, render: Callable[[], Awaitable[BaseModel | bytes]]
+) -> Response:
+    """
+    Serve a read endpoint with ETag revalidation and response caching.
+
+    `render` returns a response model or already-encoded JSON and is only
+    awaited on a cache miss. The version is captured before
+    rendering, so a write racing the query can only make the entry stale
+    (and be refetched), never make stale data look current.
+    """
+    version = data_version.value
+    key = _request_key(request)
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, **_CACHE_HEADERS}
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key, version)
+    if body is None:
+        rendered = await render()
+        body = rendered if isinstance(rendered, bytes) else rendered.model_dump_json().encode()
+        response_cache.put(key, version, body)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,393 @@
+"""Streaming bookmark import: Netscape bookmark HTML, JSON arrays and NDJSON.
+
+Input is decoded and parsed incrementally, so memory stays bounded by the
+batch size rather than the file size. Parsed rows are written through
+`crud.bookmarks.upsert_many` in large transactions.
+
+The HTTP endpoint spools the request body to a temporary file and runs the
+import as a background job whose progress can be polled; the CLI runs the
+same pipeline directly against a file. With several worker processes the
+job's progress is also recorded in the `import_jobs` table, so a poll that
+reaches another worker still finds it.
+"""
+
+import asyncio
+import codecs
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from pydantic import HttpUrl, TypeAdapter, ValidationError
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import write_queue
+from app.config import get_settings
+from app.crud import bookmarks
+from app.database import session_scope
+from app.models import ImportJobRecord
+
+logger = logging.getLogger("arvai-kernel.importer")
+
+ImportFormat = Literal["html", "json", "ndjson"]
+
+READ_CHUNK = 64 * 1024
+BATCH_SIZE = 5000  # rows per transaction
+MAX_FINISHED_JOBS = 20
+
+_url_adapter = TypeAdapter(HttpUrl)
+
+
+# ---------------------------------------------------------------------------
+# Incremental parsers: feed(text) / close() return newly completed records
+# ---------------------------------------------------------------------------
+
+class _NetscapeParser(HTMLParser):
+    """Netscape bookmark file (`<DT><A HREF=...>title</A><DD>description`)."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._done: list[dict] = []
+        self._pending: Optional[dict] = None
+        self._in_anchor = False
+        self._in_description = False
+
+    def _flush(self) -> None:
+        if self._pending is not None:
+            self._pending["title"] = self._pending["title"].strip()
+            self._pending["description"] = self._pending["description"].strip()
+            self._done.append(self._pending)
+            self._pending = None
+        self._in_description = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag == "dd" and self._pending is not None:
+            self._in_description = True
+            return
+        self._flush()
+        if tag == "a":
+            a = {k: v or "" for k, v in attrs}
+            self._pending = {
+                "url": a.get("href", ""),
+                "title": "",
+                "description": "",
+                "favicon": a.get("icon", ""),
+                "tags": a.get("tags", ""),
+                "created_at": a.get("add_date") or None,
+            }
+            self._in_anchor = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a":
+            self._in_anchor = False
+        elif tag in ("dl", "dt"):
+            self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if self._pending is None:
+            return
+        if self._in_anchor:
+            self._pending["title"] += data
+        elif self._in_description:
+            self._pending["description"] += data
+
+    def feed(self, data: str) -> list[dict]:  # type: ignore[override]
+        super().feed(data)
+        done, self._done = self._done, []
+        return done
+
+    def close(self) -> list[dict]:  # type: ignore[override]
+        super().close()
+        self._flush()
+        done, self._done = self._done, []
+        return done
+
+
+class _JsonArrayParser:
+    """Top-level JSON array, decoded one element at a time."""
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, text: str) -> list[Any]:
+        self._buf += text
+        buf, pos, out = self._buf, 0, []
+        while not self._finished:
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not self._started:
+                if buf[pos] != "[":
+                    raise ValueError("JSON import must be an array of bookmark objects")
+                self._started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                self._finished = True
+                pos += 1
+                break
+            try:
+                obj, pos = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # incomplete element; wait for more input
+            out.append(obj)
+        self._buf = buf[pos:]
+        return out
+
+    def close(self) -> list[Any]:
+        if self._buf.strip() or not self._finished:
+            raise ValueError("Truncated or malformed JSON array")
+        return []
+
+
+class _NdjsonParser:
+    """One JSON object per line; malformed lines yield None."""
+
+    def __init__(self) -> None:
+        self._buf = ""
+
+    @staticmethod
+    def _parse(line: str) -> Any:
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    def feed(self, text: str) -> list[Any]:
+        *lines, self._buf = (self._buf + text).split("\n")
+        return [self._parse(line) for line in lines if line.strip()]
+
+    def close(self) -> list[Any]:
+        line, self._buf = self._buf, ""
+        return [self._parse(line)] if line.strip() else []
+
+
+_PARSERS: dict[str, Callable[[], Any]] = {
+    "html": _NetscapeParser,
+    "json": _JsonArrayParser,
+    "ndjson": _NdjsonParser,
+}
+
+
+def detect_format(path: Path) -> ImportFormat:
+    """Guess the import format from a file extension."""
+    suffix = path.suffix.lower()
+    if suffix in (".html", ".htm"):
+        return "html"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "json"
+
+
+# ---------------------------------------------------------------------------
+# Record normalization
+# ---------------------------------------------------------------------------
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    try:
+        ts = float(value)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+        return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    # Some exporters use milliseconds or microseconds since the epoch
+    while ts > 1e11:
+        ts /= 1000
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+def _to_row(record: Any) -> Optional[dict]:
+    """Convert a parsed record into `upsert_many` keyword form; None if invalid."""
+    if not isinstance(record, dict):
+        return None
+    try:
+        url = str(_url_adapter.validate_python(record.get("url") or record.get("href")))
+    except ValidationError:
+        return None
+
+    tags = record.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+
+    return {
+        "url": url,
+        "title": str(record.get("title") or ""),
+        "description": str(record.get("description") or ""),
+        "favicon": str(record.get("favicon") or ""),
+        "tags": [str(t) for t in tags],
+        "source": str(record.get("source") or "import"),
+        "created_at": _parse_timestamp(record.get("created_at")),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Import pipeline
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ImportJob:
+    """Progress of one import run."""
+
+    format: ImportFormat
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: Literal["running", "completed", "failed"] = "running"
+    processed: int = 0
+    imported: int = 0
+    skipped: int = 0
+    error: str = ""
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+
+async def _write_batch(rows: list[dict], job: ImportJob) -> None:
+    async with session_scope() as session:
+        job.imported += await bookmarks.upsert_many(session, rows)
+    logger.info("Import %s: %d imported, %d skipped", job.id, job.imported, job.skipped)
+
+
+async def import_stream(
+    chunks: AsyncIterable[bytes],
+    job: ImportJob,
+    on_batch: Optional[Callable[[ImportJob], Awaitable[None]]] = None,
+) -> ImportJob:
+    """
+    Parse `chunks` incrementally and upsert them in batches, updating `job`
+    (and awaiting `on_batch(job)` after each batch is written).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    parser = _PARSERS[job.format]()
+    batch: list[dict] = []
+
+    async def consume(records: list[Any]) -> None:
+        nonlocal batch
+        for record in records:
+            job.processed += 1
+            row = _to_row(record)
+            if row is None:
+                job.skipped += 1
+            else:
+                batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await _write_batch(batch, job)
+            batch = []
+            if on_batch is not None:
+                await on_batch(job)
+
+    try:
+        async for chunk in chunks:
+            await consume(parser.feed(decoder.decode(chunk)))
+        await consume(parser.feed(decoder.decode(b"", final=True)))
+        await consume(parser.close())
+        if batch:
+            await _write_batch(batch, job)
+        job.status = "completed"
+    except BaseException as e:
+        job.status = "failed"
+        job.error = str(e) or type(e).__name__
+        raise
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+    return job
+
+
+async def read_file(path: Path) -> AsyncIterator[bytes]:
+    """Read a file in chunks without blocking the event loop."""
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, READ_CHUNK):
+            yield chunk
+
+
+# ---------------------------------------------------------------------------
+# Background jobs (HTTP endpoint)
+# ---------------------------------------------------------------------------
+
+_jobs: OrderedDict[str, ImportJob] = OrderedDict()
+_tasks: set[asyncio.Task] = set()
+
+
+def _shared() -> bool:
+    """Whether other worker processes may be asked about this process's jobs."""
+    return get_settings().server.workers > 1
+
+
+async def _save(job: ImportJob) -> None:
+    """Record `job` in the `import_jobs` table, keeping the newest finished ones."""
+    table = ImportJobRecord.__table__  # type: ignore[attr-defined]
+
+    async def apply(session: AsyncSession) -> None:
+        await session.merge(ImportJobRecord(**asdict(job)))
+        if job.status != "running":
+            stale = (
+                select(table.c.id)
+                .where(table.c.status != "running")
+                .order_by(table.c.finished_at.desc())
+                .offset(MAX_FINISHED_JOBS)
+            )
+            await session.execute(delete(table).where(table.c.id.in_(stale)))
+        await write_queue.commit(session)
+
+    async with session_scope() as session:
+        await write_queue.execute(session, apply)
+
+
+async def _run_job(path: Path, job: ImportJob) -> None:
+    shared = _shared()
+    try:
+        await import_stream(read_file(path), job, on_batch=_save if shared else None)
+    except Exception:
+        logger.exception("Import %s failed", job.id)
+    finally:
+        path.unlink(missing_ok=True)
+        if shared:
+            try:
+                await _save(job)
+            except Exception:
+                logger.exception("Could not record the outcome of import %s", job.id)
+
+
+async def start_job(path: Path, fmt: ImportFormat) -> ImportJob:
+    """Import a spooled file in the background; the file is removed afterwards."""
+    job = ImportJob(format=fmt)
+    _jobs[job.id] = job
+    finished = [j for j in _jobs.values() if j.status != "running"]
+    for old in finished[:-MAX_FINISHED_JOBS]:
+        del _jobs[old.id]
+    if _shared():
+        # Recorded before the id is handed out, so any worker can be polled
+        await _save(job)
+
+    task = asyncio.create_task(_run_job(path, job))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def get_job(job_id: str) -> Optional[ImportJob | ImportJobRecord]:
+    """A job started by this process or, with several workers, by any of them."""
+    job = _jobs.get(job_id)
+    if job is None and _shared():
+        async with session_scope(readonly=True) as session:
+            return await session.get(ImportJobRecord, job_id)
+    return job
+
+
+async def cancel_jobs() -> None:
+    """Cancel running imports (called at shutdown)."""
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
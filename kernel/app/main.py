@@ -1,17 +1,31 @@
 """FastAPI application entry point for Arvai Kernel."""
 
+import argparse
+import asyncio
 import logging
+import os
+import secrets
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
+from pathlib import Path
 
-import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from app.config import get_settings
-from app.database import init_db, close_db
+from app.auth import flush_last_used, run_last_used_flusher
+from app.database import init_db, close_db, build_online_indexes, rebuild_search_index
+from app import coherence, diagnostics, http_cache, importer, metrics, write_queue
+from app.crud import favicons as favicon_store
+from app.events import hub as event_hub
+from app.membership import url_index
 from app.routers.bookmarks import router as bookmarks_router
 from app.routers.api_keys import router as api_keys_router
+from app.routers.tags import router as tags_router
+from app.routers.events import router as events_router
+from app.routers.favicons import router as favicons_router
+from app.routers.debug import router as debug_router
 
 logger = logging.getLogger("arvai-kernel")
 
@@ -32,9 +46,39 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
     )
     await init_db()
     logger.info("Database ready: %s", settings.database.path)
+    # Neither is needed to serve: lookups fall back to SQLite until they finish
+    url_index.start()
+    coherence.start()
+    index_builder = asyncio.create_task(build_online_indexes())
+    write_queue.start()
+    if settings.enrichment.enabled:
+        from app import enrichment  # only the pipeline needs httpx
+        enrichment.start()
+    if settings.semantic.enabled:
+        from app import semantic  # NumPy-backed; not imported unless enabled
+        semantic.start()
+    metrics.start()
+    last_used_flusher = asyncio.create_task(run_last_used_flusher())
+    favicon_sweeper = asyncio.create_task(favicon_store.run_sweeper())
 
     yield  # --- application running ---
 
+    await metrics.stop()
+    await coherence.stop()
+    if settings.enrichment.enabled:
+        await enrichment.stop()
+    if settings.semantic.enabled:
+        await semantic.stop()
+    event_hub.close()
+    await importer.cancel_jobs()
+    background = (last_used_flusher, favicon_sweeper, index_builder)
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await flush_last_used()
+    await write_queue.stop()
+    await url_index.stop()
+    url_index.reset()
     await close_db()
     logger.info("Shutdown complete.")
 
@@ -61,16 +105,32 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(coherence.CoherenceMiddleware)
+    if settings.server.debug or settings.diagnostics.profile_requests:
+        app.add_middleware(diagnostics.ProfilerMiddleware)
+    # Outermost, so its timings include CORS handling
+    if settings.metrics.enabled:
+        app.add_middleware(metrics.MetricsMiddleware)
 
     # Routers
     app.include_router(bookmarks_router)
     app.include_router(api_keys_router)
+    app.include_router(tags_router)
+    app.include_router(events_router)
+    app.include_router(favicons_router)
+    app.include_router(debug_router)
 
     # Health check
     @app.get("/health", tags=["system"])
     async def health():
         return {"status": "ok", "version": settings.app.version}
 
+    if settings.metrics.enabled:
+        @app.get("/metrics", tags=["system"], response_class=Response)
+        async def prometheus_metrics():
+            """Request, SQL and event-loop metrics in Prometheus text format."""
+            return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
     return app
 
 
@@ -78,19 +138,80 @@ def create_app() -> FastAPI:
 # CLI entry point
 # ---------------------------------------------------------------------------
 
-def run() -> None:
+def _serve() -> None:
+    import uvicorn  # not needed by the other commands
+
     settings = get_settings()
-    logging.basicConfig(
-        level=logging.DEBUG if settings.server.debug else logging.INFO,
-        format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
-    )
+    if settings.server.workers > 1:
+        # Migrate once here instead of in every worker at the same time
+        asyncio.run(_migrate())
+        # Workers share the ETag boot id, so any of them can answer a revalidation
+        os.environ.setdefault(http_cache.BOOT_ID_ENV, secrets.token_hex(4))
     uvicorn.run(
         "app.main:create_app",
         factory=True,
         host=settings.server.host,
         port=settings.server.port,
         reload=settings.server.debug,
+        workers=settings.server.workers,
+    )
+
+
+async def _migrate() -> None:
+    await init_db()
+    await close_db()
+
+
+async def _import_file(path: Path, fmt: importer.ImportFormat | None) -> None:
+    await init_db()
+    try:
+        job = importer.ImportJob(format=fmt or importer.detect_format(path))
+        await importer.import_stream(importer.read_file(path), job)
+    finally:
+        await close_db()
+    logger.info(
+        "Import finished: %d processed, %d imported, %d skipped",
+        job.processed,
+        job.imported,
+        job.skipped,
+    )
+
+
+async def _rebuild_index() -> None:
+    await init_db()
+    try:
+        await rebuild_search_index()
+    finally:
+        await close_db()
+    logger.info("Search index rebuilt.")
+
+
+def run(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    logging.basicConfig(
+        level=logging.DEBUG if settings.server.debug else logging.INFO,
+        format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
+    )
+
+    parser = argparse.ArgumentParser(prog="arvai-kernel", description=settings.app.name)
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("serve", help="Run the API server (default)")
+    commands.add_parser("rebuild-index", help="Rebuild the full-text search index")
+    import_cmd = commands.add_parser("import", help="Import bookmarks from a file")
+    import_cmd.add_argument("file", type=Path, help="Netscape HTML, JSON or NDJSON file")
+    import_cmd.add_argument(
+        "--format",
+        choices=["html", "json", "ndjson"],
+        help="Input format (default: guessed from the file extension)",
     )
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild-index":
+        asyncio.run(_rebuild_index())
+    elif args.command == "import":
+        asyncio.run(_import_file(args.file, args.format))
+    else:
+        _serve()
 
 
 if __name__ == "__main__":
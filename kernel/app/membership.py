@@ -0,0 +1,153 @@
+"""In-memory URL membership index.
+
+Holds a 64-bit hash of every bookmarked page's canonical URL (see
+`app.canonical`) so that "is this URL saved?" checks, which are
+overwhelmingly negative, can be answered without touching SQLite. The set
+has no false negatives; a hit (or a hash collision) falls through to the
+database, which returns the authoritative row.
+
+Rows written by other processes (other workers, CLI imports) reach the
+index through `advance` (see `app.coherence`): it is told the latest
+bookmark revision and adds rows changed after the revision it covers,
+answering "maybe" until it has caught up.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+
+from app import changes
+from app.database import session_scope
+from app.models import Bookmark
+
+logger = logging.getLogger("arvai-kernel.membership")
+
+_LOAD_CHUNK = 10_000
+
+
+def _url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
+
+
+class UrlIndex:
+    """Set of canonical URL hashes, kept current by the bookmark write paths."""
+
+    def __init__(self) -> None:
+        self._hashes: set[int] = set()
+        self._ready = False
+        # Hashes added while `load` runs, merged into its result
+        self._added_during_load: Optional[set[int]] = None
+        self._task: Optional[asyncio.Task] = None
+        # Bookmark revision the set is known to cover, and the latest one seen
+        self._revision = 0
+        self._target = 0
+        self._catch_up_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def current(self) -> bool:
+        """Loaded and caught up with every revision passed to `advance`."""
+        return self._ready and self._revision >= self._target
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    async def load(self) -> None:
+        """
+        Populate the index from the database.
+
+        Lookups fall through to the database until it finishes, so it can run
+        while requests are served; URLs added meanwhile are kept.
+        """
+        self._added_during_load = set()
+        try:
+            revision, hashes = await self._scan(None)
+            self._hashes = hashes | self._added_during_load
+        finally:
+            self._added_during_load = None
+        self._revision = revision
+        self._ready = True
+        logger.info("URL index loaded: %d entries", len(self._hashes))
+        self._schedule_catch_up()
+
+    async def _scan(self, since: Optional[int]) -> tuple[int, set[int]]:
+        """
+        Hashes of rows changed after revision `since` (all rows if None),
+        and a revision the result is guaranteed to cover.
+        """
+        hashes: set[int] = set()
+        async with session_scope(readonly=True) as session:
+            # Read first: rows committed after it are included, never missed
+            revision = await changes.current_revision(session)
+            stmt = select(Bookmark.canonical_url)
+            if since is not None:
+                stmt = stmt.where(Bookmark.revision > since)
+            result = await session.stream(stmt)
+            async for chunk in result.partitions(_LOAD_CHUNK):
+                hashes.update(_url_hash(url) for url, in chunk)
+        return revision, hashes
+
+    def advance(self, revision: int) -> None:
+        """
+        Note that the bookmarks table has reached `revision`, possibly
+        through another process; rows newer than the index are added in the
+        background, and lookups go to the database until then.
+        """
+        if revision <= self._target:
+            return
+        self._target = revision
+        self._schedule_catch_up()
+
+    def _schedule_catch_up(self) -> None:
+        if not self._ready or self._revision >= self._target:
+            return
+        if self._catch_up_task is None or self._catch_up_task.done():
+            self._catch_up_task = asyncio.create_task(self._catch_up())
+
+    async def _catch_up(self) -> None:
+        try:
+            while self._revision < self._target:
+                revision, hashes = await self._scan(self._revision)
+                self._hashes |= hashes
+                self._revision = max(self._revision, revision)
+        except Exception:
+            logger.exception("URL index catch-up failed; lookups fall back to the database")
+
+    def start(self) -> None:
+        """Load in the background (called from main.py lifespan)."""
+        self._task = asyncio.create_task(self.load())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._task, self._catch_up_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = self._catch_up_task = None
+
+    def reset(self) -> None:
+        """Forget all entries; lookups go to the database until `load` runs."""
+        self._hashes = set()
+        self._ready = False
+        self._revision = self._target = 0
+
+    def add(self, url: str) -> None:
+        url_hash = _url_hash(url)
+        self._hashes.add(url_hash)
+        if self._added_during_load is not None:
+            self._added_during_load.add(url_hash)
+
+    def discard(self, url: str) -> None:
+        self._hashes.discard(_url_hash(url))
+
+    def might_contain(self, url: str) -> bool:
+        """False means definitely not bookmarked; True means ask the database."""
+        return not self.current or _url_hash(url) in self._hashes
+
+
+url_index = UrlIndex()
@@ -0,0 +1,283 @@
+"""Hot-path metrics in Prometheus text format (served at `GET /metrics`).
+
+* `MetricsMiddleware` times every HTTP request and counts responses by
+  route template and status. Unmatched paths share one label so 404 probes
+  cannot blow up the series count.
+* `instrument(engine)` hooks cursor execution. Statements and SQL time are
+  totalled per engine, and also per request through a context variable, so
+  a route's queries-per-request histogram exposes N+1 patterns. Writes that
+  run on the write-queue task count towards the engine totals only.
+* `LoopLagMonitor` measures how late a periodic timer fires, which is how
+  long something blocked the event loop.
+
+Series live in plain dicts that are updated on the event loop thread. Each
+observation is a bisect and a few additions; text is only built when
+`/metrics` is scraped.
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 100)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+# ---------------------------------------------------------------------------
+# Metric families
+# ---------------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter family keyed by a tuple of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()) -> None:
+        self.name, self.doc, self.labels = name, doc, labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.labels, key)} {_number(v)}"
+            for key, v in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Point-in-time value family."""
+
+    kind = "gauge"
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        self.values[labels] = value
+
+
+class Histogram:
+    """Fixed-bucket histogram family keyed by a tuple of label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, doc: str, labels: tuple[str, ...], buckets: tuple[float, ...]
+    ) -> None:
+        self.name, self.doc, self.labels, self.buckets = name, doc, labels, buckets
+        # labels -> per-bucket counts (last slot is +Inf), then the running sum
+        self.series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(bound)
+                labels = _labels(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+ROUTE = ("method", "route")
+
+REQUESTS = Counter(
+    "arvai_http_requests_total", "HTTP responses by route and status.", (*ROUTE, "status")
+)
+REQUEST_SECONDS = Histogram(
+    "arvai_http_request_duration_seconds", "Time to serve a request, streaming included.",
+    ROUTE, LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge("arvai_http_requests_in_flight", "Requests being served.")
+REQUEST_QUERIES = Histogram(
+    "arvai_http_request_sql_queries", "SQL statements issued while serving a request.",
+    ROUTE, QUERY_BUCKETS,
+)
+REQUEST_SQL_SECONDS = Histogram(
+    "arvai_http_request_sql_duration_seconds", "Time spent in SQL while serving a request.",
+    ROUTE, LATENCY_BUCKETS,
+)
+SQL_QUERIES = Counter(
+    "arvai_sql_queries_total", "SQL statements executed, background work included.", ("engine",)
+)
+SQL_SECONDS = Counter(
+    "arvai_sql_duration_seconds_total", "Time spent executing SQL statements.", ("engine",)
+)
+LOOP_LAG = Histogram(
+    "arvai_event_loop_lag_seconds", "How late the loop-lag timer fired.", (), LAG_BUCKETS
+)
+LOOP_LAG_LAST = Gauge("arvai_event_loop_lag_last_seconds", "Most recent loop-lag sample.")
+
+FAMILIES = [
+    REQUESTS, REQUEST_SECONDS, IN_FLIGHT, REQUEST_QUERIES, REQUEST_SQL_SECONDS,
+    SQL_QUERIES, SQL_SECONDS, LOOP_LAG, LOOP_LAG_LAST,
+]
+
+
+def render() -> str:
+    """All metric families in Prometheus text exposition format."""
+    lines = []
+    for family in FAMILIES:
+        lines.append(f"# HELP {family.name} {family.doc}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        lines.extend(family.samples())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Per-request SQL accounting
+# ---------------------------------------------------------------------------
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("arvai_request_stats", default=None)
+
+
+def instrument(engine: Engine, name: str) -> None:
+    """Count and time every statement `engine` executes."""
+
+    def before(conn, cursor, statement, parameters, context, executemany) -> None:
+        context._metrics_started = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._metrics_started
+        SQL_QUERIES.inc((name,))
+        SQL_SECONDS.inc((name,), elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """Records latency, status and SQL work for every HTTP request."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.inc(amount=-1)
+            _current.reset(token)
+            # The router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            labels = (scope["method"], route)
+            REQUESTS.inc((*labels, status))
+            REQUEST_SECONDS.observe(elapsed, labels)
+            REQUEST_QUERIES.observe(stats.queries, labels)
+            REQUEST_SQL_SECONDS.observe(stats.sql_seconds, labels)
+
+
+# ---------------------------------------------------------------------------
+# Event loop lag
+# ---------------------------------------------------------------------------
+
+class LoopLagMonitor:
+    """Wakes every `interval` seconds and records how late it woke up."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - due)
+            LOOP_LAG.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def start() -> None:
+    """Start the loop-lag monitor (called from main.py lifespan)."""
+    global _monitor
+    cfg = get_settings().metrics
+    if cfg.enabled and cfg.loop_lag_interval > 0:
+        _monitor = LoopLagMonitor(cfg.loop_lag_interval)
+        _monitor.start()
+
+
+async def stop() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
@@ -0,0 +1,575 @@
+"""Versioned schema migrations, keyed on SQLite `PRAGMA user_version`.
+
+The database header records the number of the last step applied. On a
+current database, startup costs one pragma read plus the cheap per-boot
+checks in `_EVERY_START`, instead of re-running every module's DDL and
+backfill.
+
+* `MIGRATIONS` is an ordered list of steps. Step N upgrades version N-1 to
+  N inside the startup transaction, together with the version bump. Never
+  edit a released step; append a new one.
+* Steps spell out their DDL here instead of deriving it from the models or
+  from other modules, which keep changing: a released step has to do the
+  same thing on every database it meets.
+* Step 1 is the baseline: the schema as the first versioned release built
+  it. Every statement is idempotent, so step 1 both creates a new database
+  and adopts an older, unversioned one, adding the columns and back-filling
+  the tables that older releases lacked.
+* `ONLINE_INDEXES` are indexes that queries can do without, which are
+  built after the server is up (`build_online_indexes`). Readers keep
+  working under WAL; writes wait for each build.
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app import canonical, favicons
+
+logger = logging.getLogger("arvai-kernel.migrations")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+async def _execute_all(conn: AsyncConnection, statements: list[str]) -> None:
+    for ddl in statements:
+        await conn.execute(sa.text(ddl))
+
+
+async def _columns(conn: AsyncConnection, table: str) -> set[str]:
+    result = await conn.execute(sa.text(f"SELECT name FROM pragma_table_info('{table}')"))
+    return set(result.scalars())
+
+
+async def _has_table(conn: AsyncConnection, name: str) -> bool:
+    result = await conn.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": name},
+    )
+    return result.first() is not None
+
+
+# ---------------------------------------------------------------------------
+# Step 1: baseline
+# ---------------------------------------------------------------------------
+
+_BASELINE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS bookmarks (
+        id INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        title TEXT DEFAULT '' NOT NULL,
+        description TEXT DEFAULT '' NOT NULL,
+        favicon TEXT DEFAULT '' NOT NULL,
+        domain TEXT DEFAULT '' NOT NULL,
+        tags TEXT DEFAULT '' NOT NULL,
+        source TEXT DEFAULT 'extension' NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL,
+        canonical_url TEXT DEFAULT '' NOT NULL,
+        revision INTEGER DEFAULT '0' NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS api_keys (
+        id INTEGER NOT NULL,
+        key_hash TEXT NOT NULL,
+        key_prefix TEXT DEFAULT '' NOT NULL,
+        name TEXT DEFAULT 'Extension' NOT NULL,
+        is_active BOOLEAN DEFAULT '1' NOT NULL,
+        created_at DATETIME NOT NULL,
+        last_used_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER NOT NULL,
+        name TEXT COLLATE "NOCASE" NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookmark_tags (
+        bookmark_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (bookmark_id, tag_id),
+        FOREIGN KEY(bookmark_id) REFERENCES bookmarks (id),
+        FOREIGN KEY(tag_id) REFERENCES tags (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookmark_tombstones (
+        bookmark_id INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        revision INTEGER NOT NULL,
+        deleted_at DATETIME NOT NULL,
+        PRIMARY KEY (bookmark_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS favicons (
+        hash TEXT NOT NULL,
+        mime_type TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (hash)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS page_metadata (
+        bookmark_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        http_status INTEGER,
+        title TEXT DEFAULT '' NOT NULL,
+        description TEXT DEFAULT '' NOT NULL,
+        image TEXT DEFAULT '' NOT NULL,
+        site_name TEXT DEFAULT '' NOT NULL,
+        text TEXT DEFAULT '' NOT NULL,
+        fetched_at DATETIME NOT NULL,
+        PRIMARY KEY (bookmark_id),
+        FOREIGN KEY(bookmark_id) REFERENCES bookmarks (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookmark_counts (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+]
+
+_BASELINE_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_bookmarks_url ON bookmarks (url)",
+    "CREATE INDEX IF NOT EXISTS ix_bookmarks_domain ON bookmarks (domain)",
+    "CREATE INDEX IF NOT EXISTS ix_bookmarks_created_at ON bookmarks (created_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_api_keys_key_hash ON api_keys (key_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_bookmark_tags_tag_id ON bookmark_tags (tag_id, bookmark_id)",
+    "CREATE INDEX IF NOT EXISTS ix_bookmark_tombstones_revision ON bookmark_tombstones (revision)",
+]
+
+# Built right away only on a new table; older databases get them online
+_BASELINE_NEW_TABLE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_bookmarks_revision ON bookmarks (revision)",
+    "CREATE INDEX IF NOT EXISTS ix_bookmarks_canonical_url ON bookmarks (canonical_url)",
+]
+
+_BASELINE_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS bookmarks_fts USING fts5(
+        title, url, description, domain,
+        content='bookmarks',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmarks_fts_ai AFTER INSERT ON bookmarks BEGIN
+        INSERT INTO bookmarks_fts(rowid, title, url, description, domain)
+        VALUES (new.id, new.title, new.url, new.description, new.domain);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmarks_fts_ad AFTER DELETE ON bookmarks BEGIN
+        INSERT INTO bookmarks_fts(bookmarks_fts, rowid, title, url, description, domain)
+        VALUES ('delete', old.id, old.title, old.url, old.description, old.domain);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmarks_fts_au
+    AFTER UPDATE OF title, url, description, domain ON bookmarks BEGIN
+        INSERT INTO bookmarks_fts(bookmarks_fts, rowid, title, url, description, domain)
+        VALUES ('delete', old.id, old.title, old.url, old.description, old.domain);
+        INSERT INTO bookmarks_fts(rowid, title, url, description, domain)
+        VALUES (new.id, new.title, new.url, new.description, new.domain);
+    END
+    """,
+]
+
+_BASELINE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmark_tags_ad AFTER DELETE ON bookmarks BEGIN
+        DELETE FROM bookmark_tags WHERE bookmark_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmark_counts_ai AFTER INSERT ON bookmarks BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'total';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmark_counts_ad AFTER DELETE ON bookmarks BEGIN
+        UPDATE bookmark_counts SET value = value - 1 WHERE name = 'total';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS page_metadata_ad AFTER DELETE ON bookmarks BEGIN
+        DELETE FROM page_metadata WHERE bookmark_id = old.id;
+    END
+    """,
+]
+
+# Every insert, client-visible update and delete takes the next revision;
+# stamping the revision is itself an UPDATE, which the WHEN clause skips
+_BASELINE_REVISION_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmarks_revision_ai AFTER INSERT ON bookmarks BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'revision';
+        UPDATE bookmarks SET revision = (SELECT value FROM bookmark_counts WHERE name = 'revision')
+        WHERE id = new.id;
+        DELETE FROM bookmark_tombstones WHERE bookmark_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmarks_revision_au
+    AFTER UPDATE OF url, title, description, favicon, domain, tags, source, created_at, updated_at
+    ON bookmarks
+    WHEN new.revision = old.revision BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'revision';
+        UPDATE bookmarks SET revision = (SELECT value FROM bookmark_counts WHERE name = 'revision')
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bookmarks_revision_ad AFTER DELETE ON bookmarks BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'revision';
+        INSERT OR REPLACE INTO bookmark_tombstones (bookmark_id, url, revision, deleted_at)
+        VALUES (old.id, old.url, (SELECT value FROM bookmark_counts WHERE name = 'revision'),
+                CURRENT_TIMESTAMP);
+    END
+    """,
+]
+
+_BACKFILL_CHUNK = 1000
+
+
+def _baseline_tag_names(tags_str: str) -> list[str]:
+    """Tag names as the baseline normalized them: stripped, casefold-deduplicated."""
+    seen: set[str] = set()
+    names = []
+    for raw in tags_str.split(","):
+        name = raw.strip()
+        if name and name.casefold() not in seen:
+            seen.add(name.casefold())
+            names.append(name)
+    return names
+
+
+async def _backfill_tag_links(conn: AsyncConnection) -> None:
+    """Fill `tags`/`bookmark_tags` from the tag strings of older databases."""
+    if (await conn.execute(sa.text("SELECT 1 FROM bookmark_tags LIMIT 1"))).first():
+        return
+    lookup = sa.text("SELECT id, name FROM tags WHERE name IN :names").bindparams(
+        sa.bindparam("names", expanding=True)
+    )
+    last_id = 0
+    while True:
+        rows = (await conn.execute(sa.text(
+            "SELECT id, tags FROM bookmarks WHERE id > :last AND tags != '' "
+            "ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": _BACKFILL_CHUNK})).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        parsed = {r.id: _baseline_tag_names(r.tags) for r in rows}
+        rewrites = [
+            {"id": r.id, "tags": ",".join(parsed[r.id])}
+            for r in rows if ",".join(parsed[r.id]) != r.tags
+        ]
+        if rewrites:
+            await conn.execute(sa.text("UPDATE bookmarks SET tags = :tags WHERE id = :id"), rewrites)
+        names = list({n: None for ns in parsed.values() for n in ns})
+        if not names:
+            continue
+        await conn.execute(
+            sa.text("INSERT OR IGNORE INTO tags (name) VALUES (:name)"),
+            [{"name": n} for n in names],
+        )
+        result = await conn.execute(lookup, {"names": names})
+        tag_ids = {name.casefold(): tag_id for tag_id, name in result}
+        await conn.execute(
+            sa.text("INSERT OR IGNORE INTO bookmark_tags (bookmark_id, tag_id) VALUES (:b, :t)"),
+            [{"b": b, "t": tag_ids[n.casefold()]} for b, ns in parsed.items() for n in ns],
+        )
+
+
+async def _baseline(conn: AsyncConnection) -> None:
+    bookmarks_existed = await _has_table(conn, "bookmarks")
+    await _execute_all(conn, _BASELINE_TABLES)
+
+    # Columns added after the first releases; `canonical.sync_rules` fills
+    # `canonical_url`, existing rows are numbered by id
+    columns = await _columns(conn, "bookmarks")
+    if "canonical_url" not in columns:
+        await conn.execute(sa.text(
+            "ALTER TABLE bookmarks ADD COLUMN canonical_url TEXT NOT NULL DEFAULT ''"
+        ))
+    if "revision" not in columns:
+        await conn.execute(sa.text(
+            "ALTER TABLE bookmarks ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+        ))
+        await conn.execute(sa.text("UPDATE bookmarks SET revision = id"))
+
+    await _execute_all(conn, _BASELINE_INDEXES)
+    if not bookmarks_existed:
+        await _execute_all(conn, _BASELINE_NEW_TABLE_INDEXES)
+
+    search_existed = await _has_table(conn, "bookmarks_fts")
+    await _execute_all(conn, _BASELINE_SEARCH)
+    if not search_existed:
+        await conn.execute(sa.text("INSERT INTO bookmarks_fts(bookmarks_fts) VALUES ('rebuild')"))
+
+    await _backfill_tag_links(conn)
+    await _execute_all(conn, _BASELINE_TRIGGERS)
+
+    await conn.execute(sa.text(
+        "INSERT OR IGNORE INTO bookmark_counts (name, value) "
+        "SELECT 'total', count(*) FROM bookmarks"
+    ))
+    await conn.execute(sa.text(
+        "INSERT OR IGNORE INTO bookmark_counts (name, value) "
+        "SELECT 'revision', max("
+        "  (SELECT coalesce(max(revision), 0) FROM bookmarks),"
+        "  (SELECT coalesce(max(revision), 0) FROM bookmark_tombstones))"
+    ))
+    # Databases created before updates were column-filtered get the new trigger
+    old_trigger = (await conn.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'bookmarks_revision_au'"
+    ))).scalar()
+    if old_trigger is not None and "UPDATE OF" not in old_trigger:
+        await conn.execute(sa.text("DROP TRIGGER bookmarks_revision_au"))
+    await _execute_all(conn, _BASELINE_REVISION_TRIGGERS)
+
+    await favicons.migrate_inline(conn)
+
+
+# ---------------------------------------------------------------------------
+# Step 2: API key revision
+# ---------------------------------------------------------------------------
+
+# Bumped when a key is created, renamed, revoked or deleted (but not when
+# `last_used_at` is written back), see app.auth
+_API_KEY_REVISION = [
+    "INSERT OR IGNORE INTO bookmark_counts (name, value) VALUES ('api_key_revision', 0)",
+    """
+    CREATE TRIGGER IF NOT EXISTS api_keys_revision_ai AFTER INSERT ON api_keys BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'api_key_revision';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_keys_revision_au
+    AFTER UPDATE OF key_hash, key_prefix, name, is_active ON api_keys BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'api_key_revision';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_keys_revision_ad AFTER DELETE ON api_keys BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'api_key_revision';
+    END
+    """,
+]
+
+
+async def _api_key_revision(conn: AsyncConnection) -> None:
+    await _execute_all(conn, _API_KEY_REVISION)
+
+
+# ---------------------------------------------------------------------------
+# Step 3: import jobs
+# ---------------------------------------------------------------------------
+
+_IMPORT_JOBS = """
+    CREATE TABLE IF NOT EXISTS import_jobs (
+        id TEXT NOT NULL,
+        format TEXT NOT NULL,
+        status TEXT NOT NULL,
+        processed INTEGER NOT NULL,
+        imported INTEGER NOT NULL,
+        skipped INTEGER NOT NULL,
+        error TEXT DEFAULT '' NOT NULL,
+        started_at DATETIME NOT NULL,
+        finished_at DATETIME,
+        PRIMARY KEY (id)
+    )
+"""
+
+
+async def _import_jobs(conn: AsyncConnection) -> None:
+    await conn.execute(sa.text(_IMPORT_JOBS))
+
+
+# ---------------------------------------------------------------------------
+# Step 4: page content revisions
+# ---------------------------------------------------------------------------
+
+# Fetched page content is embedded by the semantic index and compared by
+# duplicate detection, so storing new content for a page counts as a change
+# of its bookmark (fetch status and time alone do not)
+_PAGE_METADATA_REVISION = [
+    """
+    CREATE TRIGGER IF NOT EXISTS page_metadata_revision_ai AFTER INSERT ON page_metadata
+    WHEN new.title != '' OR new.description != '' OR new.image != ''
+        OR new.site_name != '' OR new.text != '' BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'revision';
+        UPDATE bookmarks SET revision = (SELECT value FROM bookmark_counts WHERE name = 'revision')
+        WHERE id = new.bookmark_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS page_metadata_revision_au
+    AFTER UPDATE OF title, description, image, site_name, text ON page_metadata
+    WHEN new.title IS NOT old.title OR new.description IS NOT old.description
+        OR new.image IS NOT old.image OR new.site_name IS NOT old.site_name
+        OR new.text IS NOT old.text BEGIN
+        UPDATE bookmark_counts SET value = value + 1 WHERE name = 'revision';
+        UPDATE bookmarks SET revision = (SELECT value FROM bookmark_counts WHERE name = 'revision')
+        WHERE id = new.bookmark_id;
+    END
+    """,
+    # Every bookmark with stored page content gets a new revision, so
+    # followers pick that content up once
+    """
+    UPDATE bookmarks SET revision = counts.value + pending.n
+    FROM (
+        SELECT bookmark_id, ROW_NUMBER() OVER (ORDER BY bookmark_id) AS n
+        FROM page_metadata
+        WHERE title != '' OR description != '' OR image != '' OR site_name != '' OR text != ''
+    ) AS pending, bookmark_counts AS counts
+    WHERE bookmarks.id = pending.bookmark_id AND counts.name = 'revision'
+    """,
+    """
+    UPDATE bookmark_counts
+    SET value = value + (
+        SELECT count(*) FROM page_metadata
+        WHERE title != '' OR description != '' OR image != '' OR site_name != '' OR text != ''
+    )
+    WHERE name = 'revision'
+    """,
+]
+
+
+async def _page_metadata_revision(conn: AsyncConnection) -> None:
+    await _execute_all(conn, _PAGE_METADATA_REVISION)
+
+
+# ---------------------------------------------------------------------------
+# Step 5: casefolded tag keys
+# ---------------------------------------------------------------------------
+
+# `tags.name` is unique under NOCASE, which folds ASCII letters only, while
+# tag lists were deduplicated with `str.casefold`; names that differ only in
+# other letters' case ("Éte", "éte") became separate tags. `name_key` holds
+# the casefolded name under a unique index, and such tags are merged into
+# the oldest one.
+_TAG_NAME_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS ix_tags_name_key ON tags (name_key)"
+
+
+async def _tag_name_keys(conn: AsyncConnection) -> None:
+    if "name_key" not in await _columns(conn, "tags"):
+        await conn.execute(sa.text("ALTER TABLE tags ADD COLUMN name_key TEXT DEFAULT '' NOT NULL"))
+    kept: dict[str, int] = {}
+    keys, merged = [], []
+    for tag_id, name in (await conn.execute(sa.text("SELECT id, name FROM tags ORDER BY id"))).all():
+        key = name.casefold()
+        if key in kept:
+            merged.append({"old": tag_id, "new": kept[key]})
+        else:
+            kept[key] = tag_id
+            keys.append({"id": tag_id, "key": key})
+    if keys:
+        await conn.execute(sa.text("UPDATE tags SET name_key = :key WHERE id = :id"), keys)
+    if merged:
+        await conn.execute(sa.text(
+            "INSERT OR IGNORE INTO bookmark_tags (bookmark_id, tag_id) "
+            "SELECT bookmark_id, :new FROM bookmark_tags WHERE tag_id = :old"
+        ), merged)
+        await conn.execute(sa.text("DELETE FROM bookmark_tags WHERE tag_id = :old"), merged)
+        await conn.execute(sa.text("DELETE FROM tags WHERE id = :old"), merged)
+        logger.info("Merged %d tags that differed only in case", len(merged))
+    await conn.execute(sa.text(_TAG_NAME_KEY_INDEX))
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline schema (tables, search index, triggers, backfills)", _baseline),
+    Migration(2, "API key revision counter", _api_key_revision),
+    Migration(3, "import job table", _import_jobs),
+    Migration(4, "page content advances the bookmark revision", _page_metadata_revision),
+    Migration(5, "casefolded tag keys", _tag_name_keys),
+]
+
+LATEST = MIGRATIONS[-1].version
+
+# Checks that depend on configuration rather than schema version
+_EVERY_START: list[Callable[[AsyncConnection], Awaitable[None]]] = [
+    canonical.sync_rules,
+]
+
+# (name, DDL) of indexes built in the background after startup
+ONLINE_INDEXES: list[tuple[str, str]] = [
+    ("ix_bookmarks_revision", "CREATE INDEX IF NOT EXISTS ix_bookmarks_revision ON bookmarks (revision)"),
+    (
+        "ix_bookmarks_canonical_url",
+        "CREATE INDEX IF NOT EXISTS ix_bookmarks_canonical_url ON bookmarks (canonical_url)",
+    ),
+]
+
+
+class SchemaTooNew(RuntimeError):
+    """The database was written by a newer kernel."""
+
+
+async def schema_version(conn: AsyncConnection) -> int:
+    return (await conn.execute(sa.text("PRAGMA user_version"))).scalar() or 0
+
+
+async def migrate(conn: AsyncConnection) -> int:
+    """Apply pending steps and the per-boot checks; returns the steps applied."""
+    current = await schema_version(conn)
+    if current > LATEST:
+        raise SchemaTooNew(
+            f"Database schema is version {current}, this kernel supports up to {LATEST}"
+        )
+    pending = [m for m in MIGRATIONS if m.version > current]
+    for step in pending:
+        logger.info("Migrating schema to version %d: %s", step.version, step.description)
+        await step.apply(conn)
+        # PRAGMA takes no bound parameters; the version is an int from this module
+        await conn.execute(sa.text(f"PRAGMA user_version = {int(step.version)}"))
+    for check in _EVERY_START:
+        await check(conn)
+    return len(pending)
+
+
+async def missing_indexes(conn: AsyncConnection) -> list[tuple[str, str]]:
+    names = set((await conn.execute(sa.text(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    ))).scalars())
+    return [(name, ddl) for name, ddl in ONLINE_INDEXES if name not in names]
+
+
+async def build_online_indexes(engine: AsyncEngine) -> None:
+    """Build missing `ONLINE_INDEXES`, one transaction each."""
+    async with engine.connect() as conn:
+        todo = await missing_indexes(conn)
+    for name, ddl in todo:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(sa.text(ddl))
+        except sa.exc.OperationalError as e:
+            # e.g. another worker process is building it
+            logger.warning("Could not build index %s (%s); retrying at next start", name, e)
+            continue
+        logger.info("Built index %s", name)
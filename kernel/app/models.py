@@ -33,6 +33,16 @@ class Bookmark(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=sa.Column(sa.DateTime, nullable=False),
     )
+    # Normalized form of `url` for matching variants of one page (see app.canonical)
+    canonical_url: str = Field(
+        default="",
+        sa_column=sa.Column(sa.Text, nullable=False, server_default="", index=True),
+    )
+    # Position in the change log; stamped by triggers (see app.changes)
+    revision: int = Field(
+        default=0,
+        sa_column=sa.Column(sa.Integer, nullable=False, server_default="0", index=True),
+    )
 
     # ---- Helpers for tag list conversion ----
 
@@ -75,3 +85,89 @@ class ApiKey(SQLModel, table=True):
         default=None,
         sa_column=sa.Column(sa.DateTime, nullable=True),
     )
+
+
+class Tag(SQLModel, table=True):
+    """A distinct tag name (case-insensitive, see `app.tagging.fold`)."""
+
+    __tablename__ = "tags"
+
+    id: Optional[int] = Field(default=None, primary_key=True, autoincrement=True)
+    name: str = Field(
+        sa_column=sa.Column(sa.Text(collation="NOCASE"), nullable=False, unique=True),
+    )
+    # Casefolded name; NOCASE above only folds ASCII letters
+    name_key: str = Field(
+        sa_column=sa.Column(sa.Text, nullable=False, server_default="", unique=True, index=True),
+    )
+
+
+class BookmarkTag(SQLModel, table=True):
+    """Association between bookmarks and tags."""
+
+    __tablename__ = "bookmark_tags"
+    __table_args__ = (
+        sa.Index("ix_bookmark_tags_tag_id", "tag_id", "bookmark_id"),
+    )
+
+    bookmark_id: int = Field(
+        sa_column=sa.Column(sa.Integer, sa.ForeignKey("bookmarks.id"), primary_key=True),
+    )
+    tag_id: int = Field(
+        sa_column=sa.Column(sa.Integer, sa.ForeignKey("tags.id"), primary_key=True),
+    )
+
+
+class BookmarkTombstone(SQLModel, table=True):
+    """Record of a deleted bookmark, kept so sync clients can learn of deletes."""
+
+    __tablename__ = "bookmark_tombstones"
+
+    bookmark_id: int = Field(sa_column=sa.Column(sa.Integer, primary_key=True))
+    url: str = Field(sa_column=sa.Column(sa.Text, nullable=False))
+    revision: int = Field(sa_column=sa.Column(sa.Integer, nullable=False, index=True))
+    deleted_at: datetime = Field(sa_column=sa.Column(sa.DateTime, nullable=False))
+
+
+class Favicon(SQLModel, table=True):
+    """A stored favicon; the bytes live on disk under their content hash (see app.favicons)."""
+
+    __tablename__ = "favicons"
+
+    hash: str = Field(sa_column=sa.Column(sa.Text, primary_key=True))
+    mime_type: str = Field(sa_column=sa.Column(sa.Text, nullable=False))
+    size: int = Field(sa_column=sa.Column(sa.Integer, nullable=False))
+
+
+class PageMetadata(SQLModel, table=True):
+    """Metadata fetched from a bookmarked page by the enrichment pipeline."""
+
+    __tablename__ = "page_metadata"
+
+    bookmark_id: int = Field(
+        sa_column=sa.Column(sa.Integer, sa.ForeignKey("bookmarks.id"), primary_key=True),
+    )
+    status: str = Field(sa_column=sa.Column(sa.Text, nullable=False))  # ok | error
+    http_status: Optional[int] = Field(default=None, sa_column=sa.Column(sa.Integer, nullable=True))
+    title: str = Field(default="", sa_column=sa.Column(sa.Text, nullable=False, server_default=""))
+    description: str = Field(default="", sa_column=sa.Column(sa.Text, nullable=False, server_default=""))
+    image: str = Field(default="", sa_column=sa.Column(sa.Text, nullable=False, server_default=""))
+    site_name: str = Field(default="", sa_column=sa.Column(sa.Text, nullable=False, server_default=""))
+    text: str = Field(default="", sa_column=sa.Column(sa.Text, nullable=False, server_default=""))
+    fetched_at: datetime = Field(sa_column=sa.Column(sa.DateTime, nullable=False))
+
+
+class ImportJobRecord(SQLModel, table=True):
+    """Progress of a background import, shared by worker processes (see app.importer)."""
+
+    __tablename__ = "import_jobs"
+
+    id: str = Field(sa_column=sa.Column(sa.Text, primary_key=True))
+    format: str = Field(sa_column=sa.Column(sa.Text, nullable=False))
+    status: str = Field(sa_column=sa.Column(sa.Text, nullable=False))  # running | completed | failed
+    processed: int = Field(default=0, sa_column=sa.Column(sa.Integer, nullable=False))
+    imported: int = Field(default=0, sa_column=sa.Column(sa.Integer, nullable=False))
+    skipped: int = Field(default=0, sa_column=sa.Column(sa.Integer, nullable=False))
+    error: str = Field(default="", sa_column=sa.Column(sa.Text, nullable=False, server_default=""))
+    started_at: datetime = Field(sa_column=sa.Column(sa.DateTime, nullable=False))
+    finished_at: Optional[datetime] = Field(default=None, sa_column=sa.Column(sa.DateTime, nullable=True))
@@ -0,0 +1,109 @@
+"""Fetched page metadata: HTML extraction.
+
+`extract` turns raw HTML into a title, description, OpenGraph fields and
+readable body text. It is a pure function over bytes so the enrichment
+pipeline can run it in worker processes, off the event loop.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+MAX_TEXT_CHARS = 20_000
+
+# Elements whose text is never part of the readable content
+_SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select",
+})
+_BLOCK_TAGS = frozenset({
+    "p", "div", "section", "article", "main", "li", "br", "tr",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+})
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+})
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+class _PageParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.meta: dict[str, str] = {}
+        self._in_title = False
+        self._skip_depth = 0
+        self._text: list[str] = []
+        self._text_len = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            a = {k: v or "" for k, v in attrs}
+            key = (a.get("property") or a.get("name") or "").lower()
+            if key and "content" in a and key not in self.meta:
+                self.meta[key] = a["content"].strip()
+        elif tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._text.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        elif tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in _BLOCK_TAGS:
+            self._text.append("\n")
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        # <meta ... /> and friends must not open a skip region
+        if tag in _VOID_TAGS or tag not in _SKIP_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth and self._text_len < MAX_TEXT_CHARS:
+            self._text.append(data)
+            self._text_len += len(data)
+
+    def text(self) -> str:
+        raw = _WHITESPACE.sub(" ", "".join(self._text))
+        lines = (line.strip() for line in raw.split("\n"))
+        text = _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+        return text[:MAX_TEXT_CHARS]
+
+
+def _decode(body: bytes, encoding: Optional[str]) -> str:
+    if encoding is None:
+        m = _META_CHARSET.search(body[:4096])
+        encoding = m.group(1).decode("ascii") if m else "utf-8"
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def extract(body: bytes, encoding: Optional[str] = None) -> dict[str, str]:
+    """
+    Metadata of an HTML document.
+
+    Returns title, description, image, site_name and text; OpenGraph values
+    win over `<title>` / `<meta name=description>` when both are present.
+    """
+    parser = _PageParser()
+    parser.feed(_decode(body, encoding))
+    parser.close()
+    meta = parser.meta
+    return {
+        "title": _WHITESPACE.sub(" ", meta.get("og:title") or parser.title).strip(),
+        "description": (meta.get("og:description") or meta.get("description") or "").strip(),
+        "image": meta.get("og:image", ""),
+        "site_name": meta.get("og:site_name", ""),
+        "text": parser.text(),
+    }
@@ -0,0 +1,48 @@
+"""Keyset pagination cursors and the maintained bookmark total.
+
+Cursors encode the `(created_at, id)` position of the last row of a page and
+are opaque to clients. The unfiltered total is kept in `bookmark_counts` by
+triggers (see app.migrations), so listing without filters never needs a
+`COUNT(*)` scan.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COUNTS_TABLE = "bookmark_counts"
+
+class InvalidCursor(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, bookmark_id: int) -> str:
+    """Encode a row position as an opaque URL-safe cursor."""
+    raw = json.dumps([created_at.isoformat(), bookmark_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, bookmark_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(bookmark_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+# ---------------------------------------------------------------------------
+# Maintained total
+# ---------------------------------------------------------------------------
+
+async def get_total(session: AsyncSession) -> int:
+    """Return the maintained number of bookmarks."""
+    result = await session.execute(
+        sa.text(f"SELECT value FROM {COUNTS_TABLE} WHERE name = 'total'")
+    )
+    return result.scalar() or 0
@@ -5,7 +5,7 @@ from typing import Annotated
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session
+from app.database import get_session, get_read_session
 from app.schemas import ApiKeyCreate, ApiKeyOut, ApiKeyCreated, MessageOut
 from app import crud
 
@@ -13,6 +13,7 @@ router = APIRouter(prefix="/api/keys", tags=["api-keys"])
 
 # Type alias for session dependency
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
 
 
 # ---------------------------------------------------------------------------
@@ -36,7 +37,7 @@ async def create_api_key(payload: ApiKeyCreate, session: SessionDep):
 # ---------------------------------------------------------------------------
 
 @router.get("", response_model=list[ApiKeyOut])
-async def list_api_keys(session: SessionDep):
+async def list_api_keys(session: ReadSessionDep):
     """
     List all API keys.
     
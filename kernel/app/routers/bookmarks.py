@@ -1,26 +1,50 @@
 """Bookmark API router — CRUD endpoints for browser extension and frontend."""
 
-from typing import Optional, Annotated
+import asyncio
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Optional, Annotated, Literal
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session
+from app.database import get_session, get_read_session, session_scope
 from app.schemas import (
     BookmarkCreate,
     BookmarkUpdate,
+    BookmarkBulkIn,
+    BookmarkBulkOut,
     BookmarkOut,
     BookmarkListOut,
+    BookmarkChangesOut,
+    DuplicatesOut,
     BookmarkCheckOut,
+    BookmarkCheckBatchIn,
+    BookmarkCheckItemOut,
+    BookmarkCheckBatchOut,
+    ImportJobOut,
     MessageOut,
 )
 from app.auth import ApiKeyDep
-from app import crud
+from app.config import get_settings
+from app.pagination import InvalidCursor
+from app import crud, exporter, http_cache, importer, serialization, write_queue
 
 router = APIRouter(prefix="/api/bookmarks", tags=["bookmarks"])
 
-# Type alias for session dependency
+# Type aliases for session dependencies: writer for mutations, reader for queries
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+def _parse_fields(fields: Optional[list[str]]) -> Optional[tuple[str, ...]]:
+    """Resolve a `fields=` query parameter; unknown names are a 400."""
+    try:
+        return serialization.parse_fields(fields)
+    except serialization.InvalidFields as e:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {e}")
 
 
 # ---------------------------------------------------------------------------
@@ -30,18 +54,50 @@ SessionDep = Annotated[AsyncSession, Depends(get_session)]
 @router.get("/check", response_model=BookmarkCheckOut)
 async def check_bookmark(
     url: str,
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
+    api_key: ApiKeyDep,
+):
+    """
+    Check if a URL is already bookmarked. Requires API key authentication.
+
+    Supports conditional requests via `ETag` / `If-None-Match`.
+    """
+    async def render() -> BookmarkCheckOut:
+        bookmark = await crud.get_bookmark_by_url(session, url)
+        if bookmark:
+            return BookmarkCheckOut(
+                bookmarked=True,
+                bookmark_id=bookmark.id,
+                created_at=bookmark.created_at,
+            )
+        return BookmarkCheckOut(bookmarked=False)
+
+    return await http_cache.cached_response(request, render)
+
+
+# ---------------------------------------------------------------------------
+# POST /api/bookmarks/check/batch — check many URLs at once (requires auth)
+# ---------------------------------------------------------------------------
+
+@router.post("/check/batch", response_model=BookmarkCheckBatchOut)
+async def check_bookmarks_batch(
+    payload: BookmarkCheckBatchIn,
+    session: ReadSessionDep,
     api_key: ApiKeyDep,
 ):
-    """Check if a URL is already bookmarked. Requires API key authentication."""
-    bookmark = await crud.get_bookmark_by_url(session, url)
-    if bookmark:
-        return BookmarkCheckOut(
-            bookmarked=True,
-            bookmark_id=bookmark.id,
-            created_at=bookmark.created_at,
-        )
-    return BookmarkCheckOut(bookmarked=False)
+    """Check up to 1000 URLs in one round trip. Requires API key authentication."""
+    saved = await crud.check_bookmark_urls(session, payload.urls)
+    results = []
+    for url in payload.urls:
+        if url in saved:
+            bookmark_id, created_at = saved[url]
+            results.append(BookmarkCheckItemOut(
+                url=url, bookmarked=True, bookmark_id=bookmark_id, created_at=created_at,
+            ))
+        else:
+            results.append(BookmarkCheckItemOut(url=url, bookmarked=False))
+    return BookmarkCheckBatchOut(results=results)
 
 
 # ---------------------------------------------------------------------------
@@ -51,36 +107,258 @@ async def check_bookmark(
 @router.post("", response_model=BookmarkOut, status_code=201)
 async def create_bookmark(payload: BookmarkCreate, session: SessionDep, api_key: ApiKeyDep):
     """Save a bookmark. Duplicate URLs will update the existing record. Requires API key."""
-    result = await crud.create_bookmark(
-        session,
+    result = await write_queue.execute(session, partial(
+        crud.create_bookmark,
         url=str(payload.url),
         title=payload.title,
         description=payload.description,
         favicon=payload.favicon,
         tags=payload.tags,
         source=payload.source,
-    )
+    ))
     return result
 
 
+# ---------------------------------------------------------------------------
+# POST /api/bookmarks/bulk — retag, edit or delete many bookmarks at once
+# ---------------------------------------------------------------------------
+
+@router.post("/bulk", response_model=BookmarkBulkOut)
+async def bulk_update_bookmarks(payload: BookmarkBulkIn, session: SessionDep, api_key: ApiKeyDep):
+    """
+    Change or delete every bookmark selected by `ids` and/or the list
+    filters (`q`, `tag`, `tag_mode`, `domain`). Requires API key.
+
+    All changes are applied in one transaction; the response counts the
+    bookmarks matched, actually changed and deleted.
+    """
+    fields = payload.set
+    return await write_queue.execute(session, partial(
+        crud.bulk_update_bookmarks,
+        ids=payload.ids,
+        query=payload.q,
+        tags=payload.tag,
+        tag_mode=payload.tag_mode,
+        domain=payload.domain,
+        title=fields.title if fields else None,
+        description=fields.description if fields else None,
+        favicon=fields.favicon if fields else None,
+        set_tags=fields.tags if fields else None,
+        add_tags=payload.add_tags,
+        remove_tags=payload.remove_tags,
+        delete=payload.delete,
+    ))
+
+
+# ---------------------------------------------------------------------------
+# POST /api/bookmarks/import — bulk import (Netscape HTML / JSON / NDJSON)
+# ---------------------------------------------------------------------------
+
+@router.post("/import", response_model=ImportJobOut, status_code=202)
+async def import_bookmarks(
+    request: Request,
+    api_key: ApiKeyDep,
+    format: Literal["html", "json", "ndjson"] = Query(..., description="导入文件格式"),
+):
+    """
+    Start a bulk import from the raw request body. Requires API key.
+
+    The body is spooled to disk and imported in the background; poll
+    `GET /api/bookmarks/import/{job_id}` for progress.
+    """
+    with tempfile.NamedTemporaryFile(prefix="arvai-import-", delete=False) as f:
+        path = Path(f.name)
+        try:
+            async for chunk in request.stream():
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+    return await importer.start_job(path, format)
+
+
+@router.get("/import/{job_id}", response_model=ImportJobOut)
+async def get_import_job(job_id: str, api_key: ApiKeyDep):
+    """Get the progress of a bulk import job. Requires API key."""
+    job = await importer.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+# ---------------------------------------------------------------------------
+# GET /api/bookmarks/export — stream the whole library
+# ---------------------------------------------------------------------------
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {t: {} for t in exporter.MEDIA_TYPES.values()}}},
+)
+async def export_bookmarks(
+    api_key: ApiKeyDep,
+    format: Literal["ndjson", "csv", "html"] = Query("ndjson", description="导出格式"),
+    fields: Optional[list[str]] = Query(None, description="只返回指定字段（可重复或逗号分隔，如 id,title,url,domain）"),
+):
+    """
+    Export every bookmark as NDJSON, CSV or Netscape bookmark HTML. Requires API key.
+
+    Rows are streamed from a server-side cursor, so memory stays flat
+    regardless of library size. `fields` limits the NDJSON/CSV columns.
+    """
+    selected = _parse_fields(fields)
+    return StreamingResponse(
+        exporter.stream_export(format, selected),
+        media_type=exporter.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="bookmarks.{format}"'},
+    )
+
+
+# ---------------------------------------------------------------------------
+# GET /api/bookmarks/changes — incremental change feed for sync clients
+# ---------------------------------------------------------------------------
+
+@router.get("/changes", response_model=BookmarkChangesOut)
+async def list_bookmark_changes(
+    request: Request,
+    session: ReadSessionDep,
+    api_key: ApiKeyDep,
+    since: int = Query(0, ge=0, description="上次同步得到的 next_since（0 表示全量）"),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """
+    Inserts, updates and deletes after revision `since`, ordered by revision.
+    Requires API key.
+
+    Keep calling with the returned `next_since` while `has_more` is true to
+    bring a local replica up to date.
+    """
+    async def render() -> BookmarkChangesOut:
+        changes, has_more = await crud.list_bookmark_changes(session, since=since, limit=limit)
+        next_since = changes[-1].revision if changes else since
+        return BookmarkChangesOut(changes=changes, next_since=next_since, has_more=has_more)
+
+    return await http_cache.cached_response(request, render)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/bookmarks/duplicates — same page saved more than once
+# ---------------------------------------------------------------------------
+
+@router.get("/duplicates", response_model=DuplicatesOut)
+async def list_duplicates(
+    request: Request,
+    session: ReadSessionDep,
+    api_key: ApiKeyDep,
+    threshold: Optional[float] = Query(None, ge=0.3, le=1.0, description="近似重复的相似度阈值（默认取配置）"),
+    limit: int = Query(50, ge=1, le=500, description="最多返回的分组数"),
+):
+    """
+    Report duplicate bookmarks. Requires API key.
+
+    Groups rows sharing a canonical URL (`kind=canonical`) and different
+    URLs with near-identical title, description and page text
+    (`kind=similar`, found with MinHash/LSH). Supports conditional
+    requests via `ETag` / `If-None-Match`.
+    """
+    async def render() -> DuplicatesOut:
+        groups, scanned = await crud.find_duplicate_bookmarks(session, threshold=threshold, limit=limit)
+        return DuplicatesOut(groups=groups, scanned=scanned)
+
+    return await http_cache.cached_response(request, render)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/bookmarks/semantic — similarity search over the embedding index
+# ---------------------------------------------------------------------------
+
+@router.get("/semantic", response_model=BookmarkListOut)
+async def semantic_search(
+    api_key: ApiKeyDep,
+    q: str = Query(..., min_length=1, description="自然语言描述，如“那篇讲异步 Rust 运行时的文章”"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[list[str]] = Query(None, description="只返回指定字段（可重复或逗号分隔，如 id,title,url,domain）"),
+):
+    """
+    Bookmarks most similar in meaning to `q`, best first. Requires API key.
+
+    Matches do not need to share exact words with the bookmark; each item
+    carries its cosine `score`. Bookmarks saved moments ago may take a
+    short while to become searchable; while the index is first loading the
+    response is a 503 with `Retry-After`.
+    """
+    if not get_settings().semantic.enabled:
+        raise HTTPException(status_code=503, detail="Semantic search is disabled")
+    from app import semantic  # NumPy-backed; imported by the lifespan when enabled
+    index = semantic.get_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Semantic index is not running")
+    selected = _parse_fields(fields)
+    try:
+        scored = await index.search(q, limit)
+    except semantic.IndexNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    # Only take a reader once there are rows to fetch
+    async with session_scope(readonly=True) as session:
+        items = await crud.get_bookmark_records(session, scored, selected)
+    return Response(serialization.dump_page(items, None, None), media_type="application/json")
+
+
 # ---------------------------------------------------------------------------
 # GET /api/bookmarks  — list / search bookmarks
 # ---------------------------------------------------------------------------
 
 @router.get("", response_model=BookmarkListOut)
 async def list_bookmarks(
-    session: SessionDep,
+    request: Request,
+    session: ReadSessionDep,
     api_key: ApiKeyDep,
     q: Optional[str] = Query(None, description="关键字搜索"),
-    tag: Optional[str] = Query(None, description="按标签筛选"),
+    tag: Optional[list[str]] = Query(None, description="按标签筛选（可重复或逗号分隔）"),
+    tag_mode: Literal["all", "any"] = Query("all", description="多标签匹配方式：all=AND, any=OR"),
+    domain: Optional[str] = Query(None, description="按域名筛选"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor（游标分页）"),
+    with_total: bool = Query(True, description="是否返回总数"),
+    highlight: bool = Query(False, description="返回搜索高亮片段"),
+    fields: Optional[list[str]] = Query(None, description="只返回指定字段（可重复或逗号分隔，如 id,title,url,domain）"),
 ):
-    """List bookmarks with optional keyword search and tag filter. Requires API key."""
-    items, total = await crud.list_bookmarks(
-        session, query=q, tag=tag, limit=limit, offset=offset
-    )
-    return BookmarkListOut(total=total, items=items)
+    """
+    List bookmarks with optional keyword search and tag filter. Requires API key.
+
+    Keyword results are ranked by relevance (BM25). Recency-ordered results
+    return a `next_cursor`; passing it back as `cursor` pages by keyset, so
+    deep pages cost the same as the first one.
+
+    With `fields`, items only carry the selected fields (plus `id`), and
+    only those columns are read.
+
+    Supports conditional requests via `ETag` / `If-None-Match`.
+    """
+    tags = [t for value in tag or [] for t in value.split(",")]
+    selected = _parse_fields(fields)
+
+    async def render() -> bytes:
+        try:
+            items, total, next_cursor = await crud.list_bookmarks(
+                session,
+                query=q,
+                tags=tags,
+                tag_mode=tag_mode,
+                domain=domain,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                with_total=with_total,
+                highlight=highlight,
+                fields=selected,
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+        return serialization.dump_page(items, total, next_cursor)
+
+    return await http_cache.cached_response(request, render)
 
 
 # ---------------------------------------------------------------------------
@@ -88,12 +366,28 @@ async def list_bookmarks(
 # ---------------------------------------------------------------------------
 
 @router.get("/{bookmark_id}", response_model=BookmarkOut)
-async def get_bookmark(bookmark_id: int, session: SessionDep, api_key: ApiKeyDep):
-    """Get a bookmark by ID. Requires API key."""
-    result = await crud.get_bookmark_by_id(session, bookmark_id)
-    if result is None:
-        raise HTTPException(status_code=404, detail="Bookmark not found")
-    return result
+async def get_bookmark(
+    bookmark_id: int,
+    request: Request,
+    session: ReadSessionDep,
+    api_key: ApiKeyDep,
+    fields: Optional[list[str]] = Query(None, description="只返回指定字段（可重复或逗号分隔，如 id,title,url,domain）"),
+):
+    """
+    Get a bookmark by ID. Requires API key.
+
+    `fields` limits the returned fields (plus `id`). Supports conditional
+    requests via `ETag` / `If-None-Match`.
+    """
+    selected = _parse_fields(fields)
+
+    async def render() -> bytes:
+        record = await crud.get_bookmark_record(session, bookmark_id, selected)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Bookmark not found")
+        return serialization.dump_record(record)
+
+    return await http_cache.cached_response(request, render)
 
 
 # ---------------------------------------------------------------------------
@@ -103,18 +397,16 @@ async def get_bookmark(bookmark_id: int, session: SessionDep, api_key: ApiKeyDep
 @router.patch("/{bookmark_id}", response_model=BookmarkOut)
 async def update_bookmark(bookmark_id: int, payload: BookmarkUpdate, session: SessionDep, api_key: ApiKeyDep):
     """Update a bookmark by ID. Requires API key."""
-    existing = await crud.get_bookmark_by_id(session, bookmark_id)
-    if existing is None:
-        raise HTTPException(status_code=404, detail="Bookmark not found")
-
-    result = await crud.update_bookmark(
-        session,
-        bookmark_id,
+    result = await write_queue.execute(session, partial(
+        crud.update_bookmark,
+        bookmark_id=bookmark_id,
         title=payload.title,
         description=payload.description,
         favicon=payload.favicon,
         tags=payload.tags,
-    )
+    ))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Bookmark not found")
     return result
 
 
@@ -125,7 +417,9 @@ async def update_bookmark(bookmark_id: int, payload: BookmarkUpdate, session: Se
 @router.delete("/{bookmark_id}", response_model=MessageOut)
 async def delete_bookmark(bookmark_id: int, session: SessionDep, api_key: ApiKeyDep):
     """Delete a bookmark by ID. Requires API key."""
-    deleted = await crud.delete_bookmark(session, bookmark_id)
+    deleted = await write_queue.execute(
+        session, partial(crud.delete_bookmark, bookmark_id=bookmark_id)
+    )
     if not deleted:
         raise HTTPException(status_code=404, detail="Bookmark not found")
     return MessageOut(message="Bookmark deleted", detail=f"id={bookmark_id}")
@@ -0,0 +1,57 @@
+"""Debug API router — slow-query log and request profiles."""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.schemas import MessageOut, ProfileOut, SlowQueryOut
+from app.auth import ApiKeyDep
+from app import diagnostics
+
+router = APIRouter(prefix="/api/debug", tags=["debug"])
+
+
+# ---------------------------------------------------------------------------
+# GET /api/debug/slow-queries — statements over the slow-query threshold
+# ---------------------------------------------------------------------------
+
+@router.get("/slow-queries", response_model=list[SlowQueryOut])
+async def list_slow_queries(
+    api_key: ApiKeyDep,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="最多返回的条数（最新的在前）"),
+):
+    """
+    Recent slow SQL statements with bound parameters and `EXPLAIN QUERY PLAN`.
+    Requires API key.
+    """
+    return diagnostics.slow_queries(limit)
+
+
+@router.delete("/slow-queries", response_model=MessageOut)
+async def clear_slow_queries(api_key: ApiKeyDep):
+    """Empty the slow-query log. Requires API key."""
+    diagnostics.clear_slow_queries()
+    return MessageOut(message="Slow-query log cleared")
+
+
+# ---------------------------------------------------------------------------
+# GET /api/debug/profiles — sampled request profiles
+# ---------------------------------------------------------------------------
+
+@router.get("/profiles", response_model=list[ProfileOut])
+async def list_profiles(api_key: ApiKeyDep):
+    """Recently profiled requests, newest first. Requires API key."""
+    return diagnostics.profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, api_key: ApiKeyDep):
+    """
+    One request's samples as folded stacks ("frame;frame;frame count" per
+    line), the input format of flamegraph.pl and speedscope. Requires API key.
+    """
+    profile = diagnostics.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded())
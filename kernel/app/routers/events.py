@@ -0,0 +1,56 @@
+"""Event stream router — push bookmark changes to the extension and desktop app."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.auth import ApiKeyDep
+from app.config import get_settings
+from app.events import hub
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+async def _stream() -> AsyncIterator[str]:
+    heartbeat = get_settings().events.heartbeat_interval
+    sub = hub.subscribe()
+    try:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), heartbeat)
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:  # server shutting down
+                return
+            yield event.to_sse()
+    finally:
+        sub.close()
+
+
+# ---------------------------------------------------------------------------
+# GET /api/events — server-sent events
+# ---------------------------------------------------------------------------
+
+@router.get(
+    "",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_events(api_key: ApiKeyDep):
+    """
+    Subscribe to bookmark changes as server-sent events. Requires API key.
+
+    Events are `created`, `updated` (data: the bookmark), `deleted` (data: id
+    and url) and `bulk` (data: count, after imports). A `resync` event means
+    this client fell behind and should catch up via
+    `GET /api/bookmarks/changes`.
+    """
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,49 @@
+"""Favicon router — serve icons from the content-addressed favicon store."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import favicons
+from app.database import get_read_session
+
+router = APIRouter(prefix="/api/favicons", tags=["favicons"])
+
+# Type alias for read-only session dependency
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+# The URL names the content, so it can never change. The sandbox CSP keeps
+# SVG icons opened directly from running scripts on the kernel origin.
+_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox",
+    "X-Content-Type-Options": "nosniff",
+}
+
+
+# ---------------------------------------------------------------------------
+# GET /api/favicons/{hash}
+# ---------------------------------------------------------------------------
+
+@router.get(
+    "/{content_hash}",
+    response_class=FileResponse,
+    responses={200: {"content": {"image/*": {}}}},
+)
+async def get_favicon(content_hash: str, session: ReadSessionDep):
+    """
+    Serve a stored favicon by content hash.
+
+    No API key is required so that bookmark `favicon` references work as
+    plain `<img src>` URLs; hashes are only learned from bookmark responses.
+    """
+    if not favicons.is_valid_hash(content_hash):
+        raise HTTPException(status_code=404, detail="Favicon not found")
+    mime_type = await favicons.get_mime_type(session, content_hash)
+    path = favicons.blob_path(content_hash)
+    # Rows stored before the type allowlist existed are not served
+    if mime_type not in favicons.ALLOWED_TYPES or not path.is_file():
+        raise HTTPException(status_code=404, detail="Favicon not found")
+    return FileResponse(path, media_type=mime_type, headers=_HEADERS)
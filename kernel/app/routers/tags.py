@@ -0,0 +1,26 @@
+"""Tag API router — tag facets for the sidebar."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_session
+from app.schemas import TagOut
+from app.auth import ApiKeyDep
+from app import crud
+
+router = APIRouter(prefix="/api/tags", tags=["tags"])
+
+# Type alias for read-only session dependency
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+# ---------------------------------------------------------------------------
+# GET /api/tags — tag facet counts
+# ---------------------------------------------------------------------------
+
+@router.get("", response_model=list[TagOut])
+async def list_tags(session: ReadSessionDep, api_key: ApiKeyDep):
+    """List all tags in use with per-tag bookmark counts. Requires API key."""
+    return await crud.list_tags(session)
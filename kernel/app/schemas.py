@@ -4,9 +4,11 @@ These are separate from SQLModel table models to maintain clean API boundaries.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, HttpUrl, Field, ConfigDict
+from pydantic import BaseModel, HttpUrl, Field, ConfigDict, field_validator, model_validator
+
+from app.favicons import MAX_URI_LENGTH as _FAVICON_MAX_LENGTH
 
 
 # ---------------------------------------------------------------------------
@@ -19,7 +21,7 @@ class BookmarkCreate(BaseModel):
     url: HttpUrl
     title: str = ""
     description: str = ""
-    favicon: str = ""
+    favicon: str = Field("", max_length=_FAVICON_MAX_LENGTH)
     tags: list[str] = Field(default_factory=list)
     source: str = "extension"
 
@@ -29,10 +31,63 @@ class BookmarkUpdate(BaseModel):
 
     title: Optional[str] = None
     description: Optional[str] = None
-    favicon: Optional[str] = None
+    favicon: Optional[str] = Field(None, max_length=_FAVICON_MAX_LENGTH)
     tags: Optional[list[str]] = None
 
 
+class BookmarkBulkSet(BaseModel):
+    """Fields given the same value on every selected bookmark."""
+
+    title: Optional[str] = None
+    description: Optional[str] = None
+    favicon: Optional[str] = Field(None, max_length=_FAVICON_MAX_LENGTH)
+    tags: Optional[list[str]] = None  # replaces each bookmark's tags
+
+
+class BookmarkBulkIn(BaseModel):
+    """
+    A change applied to many bookmarks in one transaction.
+
+    Bookmarks are selected by `ids` and/or the filters of `GET /api/bookmarks`
+    (`q`, `tag`, `tag_mode`, `domain`); a bookmark must match all that are
+    given. `set`, `add_tags` and `remove_tags` may be combined (applied in
+    that order); `delete` stands alone.
+    """
+
+    ids: Optional[list[int]] = Field(None, max_length=100_000)
+    q: Optional[str] = None
+    tag: Optional[str | list[str]] = None  # like `?tag=`: one value or several, comma-separated
+    tag_mode: Literal["all", "any"] = "all"
+    domain: Optional[str] = None
+
+    set: Optional[BookmarkBulkSet] = None
+    add_tags: list[str] = Field(default_factory=list)
+    remove_tags: list[str] = Field(default_factory=list)
+    delete: bool = False
+
+    @field_validator("tag")
+    @classmethod
+    def _split_tags(cls, value: Optional[str | list[str]]) -> Optional[list[str]]:
+        if value is None:
+            return None
+        values = [value] if isinstance(value, str) else value
+        return [t.strip() for v in values for t in v.split(",") if t.strip()]
+
+    @model_validator(mode="after")
+    def _check(self) -> "BookmarkBulkIn":
+        # A blank filter matches everything, so it does not count as a selection
+        if self.ids is None and not any(
+            f and f.strip() for f in (self.q, *(self.tag or ()), self.domain)
+        ):
+            raise ValueError("select bookmarks with `ids` or at least one of `q`, `tag`, `domain`")
+        edits = self.set is not None or bool(self.add_tags or self.remove_tags)
+        if self.delete and edits:
+            raise ValueError("`delete` cannot be combined with other changes")
+        if not self.delete and not edits:
+            raise ValueError("nothing to do: give `set`, `add_tags`, `remove_tags` or `delete`")
+        return self
+
+
 # ---------------------------------------------------------------------------
 # Response Schemas
 # ---------------------------------------------------------------------------
@@ -52,13 +107,79 @@ class BookmarkOut(BaseModel):
     source: str
     created_at: datetime
     updated_at: datetime
+    snippet: Optional[str] = None  # Highlighted search excerpt, only when requested
+    score: Optional[float] = None  # Cosine similarity, only in semantic search results
 
 
 class BookmarkListOut(BaseModel):
     """Paginated list of bookmarks."""
 
-    total: int
+    total: Optional[int]  # None when the count was not requested
     items: list[BookmarkOut]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page
+
+
+class BookmarkChangeOut(BaseModel):
+    """One entry of the change feed: the latest state of a bookmark, or its deletion."""
+
+    revision: int
+    id: int
+    deleted: bool
+    bookmark: Optional[BookmarkOut] = None  # None for deletions
+
+
+class BookmarkChangesOut(BaseModel):
+    """A page of the change feed, ordered by revision."""
+
+    changes: list[BookmarkChangeOut]
+    next_since: int  # Pass back as `since` to continue
+    has_more: bool
+
+
+class BookmarkBulkOut(BaseModel):
+    """Outcome of a bulk change."""
+
+    matched: int  # bookmarks selected
+    updated: int  # of those, bookmarks whose content changed
+    deleted: int
+
+
+class DuplicateGroupOut(BaseModel):
+    """Bookmarks that point at the same page."""
+
+    kind: str  # canonical (same canonical URL) | similar (near-identical content)
+    similarity: float  # lowest estimated similarity within the group (1.0 for canonical)
+    bookmarks: list[BookmarkOut]
+
+
+class DuplicatesOut(BaseModel):
+    """Duplicate report, largest groups first."""
+
+    groups: list[DuplicateGroupOut]
+    scanned: int  # bookmarks examined
+
+
+class ImportJobOut(BaseModel):
+    """Progress of a bulk import job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    format: str
+    status: str  # running | completed | failed
+    processed: int
+    imported: int
+    skipped: int
+    error: str
+    started_at: datetime
+    finished_at: Optional[datetime]
+
+
+class TagOut(BaseModel):
+    """A tag with the number of bookmarks carrying it."""
+
+    name: str
+    count: int
 
 
 class MessageOut(BaseModel):
@@ -107,3 +228,55 @@ class BookmarkCheckOut(BaseModel):
     bookmarked: bool
     bookmark_id: Optional[int] = None
     created_at: Optional[datetime] = None
+
+
+class BookmarkCheckBatchIn(BaseModel):
+    """Schema for checking many URLs in one request."""
+
+    urls: list[str] = Field(max_length=1000)
+
+
+class BookmarkCheckItemOut(BookmarkCheckOut):
+    """Check result for one URL of a batch."""
+
+    url: str
+
+
+class BookmarkCheckBatchOut(BaseModel):
+    """Batch check response, in request order."""
+
+    results: list[BookmarkCheckItemOut]
+
+
+# ---------------------------------------------------------------------------
+# Diagnostics Schemas
+# ---------------------------------------------------------------------------
+
+class SlowQueryOut(BaseModel):
+    """A statement that exceeded the slow-query threshold."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    statement: str
+    parameters: list
+    duration_ms: float
+    engine: str  # writer | reader
+    plan: list[str]  # EXPLAIN QUERY PLAN, indented by depth
+    executemany: bool
+    recorded_at: datetime
+
+
+class ProfileOut(BaseModel):
+    """Summary of a profiled request; fetch the stacks by id."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    interval_ms: float
+    sample_count: int
+    started_at: datetime
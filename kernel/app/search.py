@@ -0,0 +1,148 @@
+"""SQLite FTS5 full-text index for bookmark search.
+
+The index is an external-content FTS5 table over `bookmarks`, kept in sync
+by triggers so every write path (ORM, raw SQL, bulk imports) stays covered.
+The trigram tokenizer gives substring semantics equivalent to the previous
+`ilike('%q%')` search, including CJK text, while using the index.
+"""
+
+import html
+import re
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+FTS_TABLE = "bookmarks_fts"
+
+# Trigram tokens need at least three characters; shorter terms cannot be
+# answered from the index and fall back to LIKE.
+MIN_TERM_LENGTH = 3
+
+# bm25() column weights, in declaration order: title, url, description, domain
+BM25_WEIGHTS = (10.0, 2.0, 1.0, 4.0)
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 32
+
+# snippet() marks matches with these control characters, which cannot come
+# from user text once escaped; they become the HTML markers afterwards
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+_COLUMNS = "title, url, description, domain"
+_NEW_VALUES = "new.title, new.url, new.description, new.domain"
+_OLD_VALUES = "old.title, old.url, old.description, old.domain"
+
+SCHEMA_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_COLUMNS},
+        content='bookmarks',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON bookmarks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON bookmarks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS})
+        VALUES ('delete', old.id, {_OLD_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF {_COLUMNS} ON bookmarks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS})
+        VALUES ('delete', old.id, {_OLD_VALUES});
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END
+    """,
+]
+
+# Lightweight table handle for building queries; not part of SQLModel
+# metadata so `create_all` never tries to create it.
+fts_table = sa.table(FTS_TABLE, sa.column("rowid"), sa.column(FTS_TABLE))
+
+
+# ---------------------------------------------------------------------------
+# Schema lifecycle
+# ---------------------------------------------------------------------------
+
+async def ensure_index(conn: AsyncConnection) -> None:
+    """Create the FTS table and triggers; populate it if newly created."""
+    result = await conn.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    )
+    existed = result.first() is not None
+
+    for ddl in SCHEMA_DDL:
+        await conn.execute(sa.text(ddl))
+
+    if not existed:
+        await rebuild_index(conn)
+
+
+async def rebuild_index(conn: AsyncConnection) -> None:
+    """Rebuild the whole FTS index from the `bookmarks` table."""
+    await conn.execute(
+        sa.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Query helpers
+# ---------------------------------------------------------------------------
+
+def split_terms(query: str) -> tuple[list[str], list[str]]:
+    """
+    Split a user query into (indexable, short) terms.
+
+    Indexable terms are matched through FTS5; short terms are too small for
+    trigram tokens and must be filtered with LIKE instead.
+    """
+    terms = [t for t in re.split(r"\s+", query.strip()) if t]
+    indexable = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+    short = [t for t in terms if len(t) < MIN_TERM_LENGTH]
+    return indexable, short
+
+
+def build_match_expression(terms: list[str]) -> str:
+    """Build an FTS5 MATCH expression that ANDs each term as a quoted phrase."""
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def match_condition(expression: str) -> sa.ColumnElement[bool]:
+    """`bookmarks_fts MATCH :expression`."""
+    return fts_table.c[FTS_TABLE].op("MATCH")(expression)
+
+
+def rank_expression() -> sa.ColumnElement[float]:
+    """BM25 rank (lower is better) using the configured column weights."""
+    return sa.func.bm25(sa.literal_column(FTS_TABLE), *BM25_WEIGHTS)
+
+
+def snippet_expression() -> sa.ColumnElement[str]:
+    """Highlighted excerpt from the best-matching column."""
+    return sa.func.snippet(
+        sa.literal_column(FTS_TABLE),
+        -1,
+        _MATCH_START,
+        _MATCH_END,
+        SNIPPET_ELLIPSIS,
+        SNIPPET_TOKENS,
+    )
+
+
+def render_snippet(raw: str | None) -> str | None:
+    """HTML-escape a `snippet_expression()` value, then add the match markers."""
+    if raw is None:
+        return None
+    text = html.escape(raw)
+    return text.replace(_MATCH_START, SNIPPET_OPEN).replace(_MATCH_END, SNIPPET_CLOSE)
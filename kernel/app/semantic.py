@@ -0,0 +1,428 @@
+"""Offline semantic search over bookmarks.
+
+Every bookmark is embedded into a fixed-size, L2-normalised float32 vector
+(title, description, tags, domain, URL words and, when enrichment has run,
+the start of the page text). Vectors live in a memory-mapped matrix next to
+the database, with a parallel id column so row `i` belongs to bookmark
+`ids[i]`; a query is embedded the same way and ranked with one matrix-vector
+product and an `argpartition` top-k.
+
+The index follows the change log (`app.changes`): it records the last
+revision it has embedded and, on startup or whenever a bookmark event
+arrives, embeds only rows with a newer revision and drops tombstoned ones.
+Nothing is re-embedded after a restart unless the embedder changes.
+
+The default `HashingEmbedder` needs no model or network: words and
+character trigrams are hashed into buckets, so "runtimes" still lands near
+"runtime". Any object with `name`, `dim` and `embed(texts)` can replace it
+via `semantic.embedder` ("package.module:factory").
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Protocol
+
+import numpy as np
+import sqlalchemy as sa
+
+from app import coherence
+from app.config import SemanticConfig, get_settings
+from app.database import session_scope
+from app.events import hub
+from app.models import Bookmark, BookmarkTombstone, PageMetadata
+
+logger = logging.getLogger("arvai-kernel.semantic")
+
+_INITIAL_ROWS = 1024
+
+
+# ---------------------------------------------------------------------------
+# Embedders
+# ---------------------------------------------------------------------------
+
+class Embedder(Protocol):
+    name: str  # stored with the index; a different name triggers a rebuild
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32 matrix with L2-normalised rows."""
+        ...
+
+
+_WORD = re.compile(r"[^\W_]+")
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its of on or "
+    "that the this to was what when where which who why with www http https "
+    "com org net html htm php".split()
+)
+
+
+def _tokens(text: str) -> list[str]:
+    """Lowercased words without stopwords; CJK runs become character bigrams."""
+    tokens: list[str] = []
+    for word in _WORD.findall(text.lower()):
+        if _CJK.match(word):
+            tokens.extend(word[i:i + 2] for i in range(max(len(word) - 1, 1)))
+        elif len(word) > 1 and word not in _STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+
+@lru_cache(maxsize=1 << 17)
+def _token_buckets(token: str, dim: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Signed bucket weights of one token: the token itself, plus its character
+    trigrams at half weight so inflections ("runtime"/"runtimes") overlap.
+    """
+    features = [(token, 1.0)]
+    if not _CJK.match(token):
+        padded = f"<{token}>"
+        features += [("#" + padded[i:i + 3], 0.5) for i in range(len(padded) - 2)]
+    cols, vals = [], []
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode())
+        cols.append(h % dim)
+        vals.append(weight if h & 0x80000000 else -weight)
+    return np.array(cols, dtype=np.intp), np.array(vals, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """Signed feature hashing with sublinear term frequency; deterministic and offline."""
+
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        # (document, token, count) triples; Python only touches distinct tokens
+        vocab: dict[str, int] = {}
+        pair_rows: list[int] = []
+        pair_tokens: list[int] = []
+        pair_counts: list[int] = []
+        for row, text in enumerate(texts):
+            for token, count in Counter(_tokens(text)).items():
+                pair_rows.append(row)
+                pair_tokens.append(vocab.setdefault(token, len(vocab)))
+                pair_counts.append(count)
+        out = np.zeros(len(texts) * self.dim, dtype=np.float32)
+        if vocab:
+            buckets = [_token_buckets(token, self.dim) for token in vocab]
+            lengths = np.array([len(cols) for cols, _ in buckets], dtype=np.intp)
+            starts = np.cumsum(lengths) - lengths
+            cols = np.concatenate([c for c, _ in buckets])
+            vals = np.concatenate([v for _, v in buckets])
+            # Expand every pair into its token's buckets, then sum per cell
+            tokens = np.array(pair_tokens, dtype=np.intp)
+            n = lengths[tokens]
+            offsets = np.cumsum(n) - n
+            idx = np.repeat(starts[tokens] - offsets, n) + np.arange(n.sum())
+            weights = np.repeat(1.0 + np.log(np.array(pair_counts, dtype=np.float32)), n)
+            cells = np.repeat(np.array(pair_rows, dtype=np.intp) * self.dim, n) + cols[idx]
+            out = np.bincount(cells, weights * vals[idx], minlength=out.size).astype(np.float32)
+        out = out.reshape(len(texts), self.dim)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def load_embedder(cfg: SemanticConfig) -> Embedder:
+    """The embedder named by `semantic.embedder`."""
+    if cfg.embedder == "hashing":
+        return HashingEmbedder(cfg.dim)
+    module, _, attr = cfg.embedder.partition(":")
+    return getattr(importlib.import_module(module), attr)()
+
+
+def document_text(title: str, description: str, tags: str, domain: str, url: str,
+                  page_text: Optional[str], text_chars: int) -> str:
+    """What gets embedded for one bookmark; the title is weighted twice."""
+    url_words = url.split("://", 1)[-1].replace(domain, " ", 1)
+    parts = [title, title, description, tags.replace(",", " "), domain, url_words]
+    if page_text:
+        parts.append(page_text[:text_chars])
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Memory-mapped vector store
+# ---------------------------------------------------------------------------
+
+class VectorStore:
+    """
+    Row-aligned `vectors.f32` / `ids.i64` files plus `meta.json`.
+
+    Deleted rows are zeroed (id 0) and reused by later inserts. The files
+    only ever grow, so a search holding the previous mapping stays valid
+    while the store is resized.
+    """
+
+    def __init__(self, directory: Path, embedder_name: str, dim: int) -> None:
+        self._dir = directory
+        self._name = embedder_name
+        self._dim = dim
+        self.revision = 0
+        self._rows = 0
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._row_of: dict[int, int] = {}
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    @property
+    def _meta_path(self) -> Path:
+        return self._dir / "meta.json"
+
+    def open(self) -> None:
+        """Map existing files, or start empty if they belong to another embedder."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        meta = {}
+        if self._meta_path.exists():
+            meta = json.loads(self._meta_path.read_text())
+        if meta.get("embedder") != self._name or meta.get("dim") != self._dim:
+            if meta:
+                logger.info("Embedder changed (%s → %s); rebuilding", meta.get("embedder"), self._name)
+            meta = {"rows": 0, "revision": 0}
+            self._resize(_INITIAL_ROWS, truncate=True)
+        else:
+            self._map()
+        self._rows = meta["rows"]
+        self.revision = meta["revision"]
+        ids = np.asarray(self._ids[: self._rows])
+        live = np.flatnonzero(ids)
+        self._row_of = dict(zip(ids[live].tolist(), live.tolist()))
+        self._free = np.flatnonzero(ids == 0).tolist()[::-1]
+
+    def _map(self) -> None:
+        capacity = (self._dir / "ids.i64").stat().st_size // 8
+        self._vectors = np.memmap(self._dir / "vectors.f32", np.float32, "r+", shape=(capacity, self._dim))
+        self._ids = np.memmap(self._dir / "ids.i64", np.int64, "r+", shape=(capacity,))
+
+    def _resize(self, capacity: int, *, truncate: bool = False) -> None:
+        for name, itemsize in (("vectors.f32", 4 * self._dim), ("ids.i64", 8)):
+            with open(self._dir / name, "wb" if truncate else "r+b") as f:
+                f.truncate(capacity * itemsize)
+        self._map()
+
+    def _allocate(self, count: int) -> list[int]:
+        rows = [self._free.pop() for _ in range(min(count, len(self._free)))]
+        extra = count - len(rows)
+        if extra:
+            assert self._ids is not None
+            if self._rows + extra > len(self._ids):
+                self._resize(max(len(self._ids) * 2, self._rows + extra))
+            rows.extend(range(self._rows, self._rows + extra))
+            self._rows += extra
+        return rows
+
+    def put(self, ids: list[int], vectors: np.ndarray) -> None:
+        new = [i for i in ids if i not in self._row_of]
+        self._row_of.update(zip(new, self._allocate(len(new))))
+        rows = [self._row_of[i] for i in ids]
+        assert self._vectors is not None and self._ids is not None
+        self._vectors[rows] = vectors
+        self._ids[rows] = ids
+
+    def remove(self, ids: list[int]) -> None:
+        rows = [r for r in (self._row_of.pop(i, None) for i in ids) if r is not None]
+        if rows:
+            assert self._vectors is not None and self._ids is not None
+            self._vectors[rows] = 0
+            self._ids[rows] = 0
+            self._free.extend(rows)
+
+    def flush(self, revision: int) -> None:
+        """Persist vectors first, then the revision they cover."""
+        if self._vectors is None or self._ids is None:
+            return
+        self._vectors.flush()
+        self._ids.flush()
+        self.revision = revision
+        tmp = self._meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "embedder": self._name, "dim": self._dim, "rows": self._rows, "revision": revision,
+        }))
+        os.replace(tmp, self._meta_path)
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Ids and cosine scores of the `k` nearest rows, best first."""
+        vectors, ids, n = self._vectors, self._ids, self._rows
+        if vectors is None or ids is None or n == 0 or k <= 0:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        scores = vectors[:n] @ query
+        scores[ids[:n] == 0] = -np.inf
+        k = min(k, len(self._row_of))
+        if k == 0:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return np.asarray(ids[top]), scores[top]
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------------
+
+class IndexNotReady(RuntimeError):
+    """Raised by `SemanticIndex.search` before the index has loaded (or if loading failed)."""
+
+
+class SemanticIndex:
+    """Keeps a `VectorStore` in step with the bookmarks table."""
+
+    def __init__(self, cfg: SemanticConfig, directory: Path,
+                 embedder: Optional[Embedder] = None) -> None:
+        self._cfg = cfg
+        self.embedder = embedder or load_embedder(cfg)
+        self.store = VectorStore(directory, self.embedder.name, self.embedder.dim)
+        self._ready = asyncio.Event()
+        self._failed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._ready.is_set():
+            self.store.flush(self.store.revision)
+
+    async def load(self) -> None:
+        """Map the stored vectors and embed whatever changed since they were written."""
+        await asyncio.to_thread(self.store.open)
+        await self.sync()
+        self._ready.set()
+        logger.info("Semantic index ready: %d vectors (%s)", len(self.store), self.embedder.name)
+
+    async def _run(self) -> None:
+        # Subscribe first so nothing committed during the catch-up is missed
+        sub = hub.subscribe()
+        try:
+            await self.load()
+            while await sub.get() is not None:
+                # Coalesce a burst of events into one catch-up
+                while sub.pending():
+                    await sub.get()
+                await self.sync()
+        except Exception:
+            logger.exception("Semantic index maintenance stopped")
+            self._failed = True
+            raise
+        finally:
+            sub.close()
+
+    async def sync(self) -> int:
+        """Embed rows changed since the stored revision; returns rows touched."""
+        touched = 0
+        revision = self.store.revision
+        while True:
+            live, dead, revision, more = await self._changes(revision)
+            if dead:
+                self.store.remove(dead)
+            if live:
+                texts = [
+                    document_text(r.title, r.description, r.tags, r.domain, r.url,
+                                  r.text, self._cfg.text_chars)
+                    for r in live
+                ]
+                vectors = await asyncio.to_thread(self.embedder.embed, texts)
+                await asyncio.to_thread(self.store.put, [r.id for r in live], vectors)
+            touched += len(live) + len(dead)
+            if not more:
+                break
+        if touched or revision != self.store.revision:
+            await asyncio.to_thread(self.store.flush, revision)
+        return touched
+
+    async def _changes(self, since: int) -> tuple[list, list[int], int, bool]:
+        """One batch of (live rows, deleted ids, new revision, has_more) after `since`."""
+        limit = self._cfg.batch_size
+        t = Bookmark.__table__  # type: ignore[attr-defined]
+        meta = PageMetadata.__table__  # type: ignore[attr-defined]
+        tomb = BookmarkTombstone.__table__  # type: ignore[attr-defined]
+        async with session_scope(readonly=True) as session:
+            live = (await session.execute(
+                sa.select(t.c.id, t.c.revision, t.c.url, t.c.title, t.c.description,
+                          t.c.tags, t.c.domain, meta.c.text)
+                .select_from(t.outerjoin(meta, meta.c.bookmark_id == t.c.id))
+                .where(t.c.revision > since)
+                .order_by(t.c.revision)
+                .limit(limit)
+            )).all()
+            dead = (await session.execute(
+                sa.select(tomb.c.bookmark_id, tomb.c.revision)
+                .where(tomb.c.revision > since)
+                .order_by(tomb.c.revision)
+                .limit(limit)
+            )).all()
+        # A full batch on either side bounds how far both can be applied
+        cutoff = math.inf
+        if len(live) == limit:
+            cutoff = live[-1].revision
+        if len(dead) == limit:
+            cutoff = min(cutoff, dead[-1].revision)
+        live = [r for r in live if r.revision <= cutoff]
+        dead = [r for r in dead if r.revision <= cutoff]
+        revision = max([since] + [r.revision for r in live] + [r.revision for r in dead])
+        return live, [r.bookmark_id for r in dead], revision, cutoff != math.inf
+
+    async def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """
+        (bookmark id, cosine score) pairs for `query`, best first.
+
+        Raises `IndexNotReady` instead of waiting while the index loads.
+        """
+        if not self._ready.is_set():
+            raise IndexNotReady("Semantic index failed to load" if self._failed
+                                else "Semantic index is loading")
+        vector = self.embedder.embed([query])[0]
+        if not vector.any():
+            return []
+        ids, scores = await asyncio.to_thread(self.store.search, vector, limit)
+        # Rows sharing no features with the query score around zero
+        return [(i, s) for i, s in zip(ids.tolist(), scores.tolist()) if s > 0]
+
+
+_index: Optional[SemanticIndex] = None
+
+
+def get_index() -> Optional[SemanticIndex]:
+    """The running index, or None when semantic search is disabled."""
+    return _index
+
+
+def start() -> None:
+    """Open and catch up the index in the background (called from lifespan)."""
+    global _index
+    settings = get_settings()
+    if not settings.semantic.enabled:
+        return
+    directory = Path(settings.database.path).parent / "semantic"
+    if settings.server.workers > 1:
+        # The vector files are updated in place, so workers cannot share them
+        directory = coherence.private_directory(directory)
+    _index = SemanticIndex(settings.semantic, directory)
+    _index.start()
+
+
+async def stop() -> None:
+    """Stop index maintenance and persist it (called from lifespan)."""
+    global _index
+    index, _index = _index, None
+    if index is not None:
+        await index.stop()
@@ -0,0 +1,118 @@
+"""Fast JSON encoding for bookmark list pages.
+
+List endpoints build plain dicts from SQLAlchemy rows and encode the whole
+page with a precompiled `TypeAdapter`, instead of constructing a
+`BookmarkOut` per row and having FastAPI validate the page again. The
+TypedDicts mirror `schemas.BookmarkOut` / `schemas.BookmarkListOut` field
+for field, so the JSON is identical; routes keep declaring those schemas as
+`response_model` for OpenAPI.
+
+Records may be sparse: with a `fields=` selection only the requested keys
+(plus `id`) are present, and only those columns are read from the database.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Optional, TypedDict
+
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+
+from app import favicons, tagging
+
+
+# Selectable response fields, in `BookmarkOut` order; each maps to a column
+FIELDS = (
+    "id", "url", "title", "description", "favicon", "domain",
+    "tags", "source", "created_at", "updated_at",
+)
+
+
+class InvalidFields(ValueError):
+    """Raised when a `fields=` selection names unknown fields."""
+
+
+class BookmarkRecord(TypedDict, total=False):
+    id: int
+    url: str
+    title: str
+    description: str
+    favicon: str
+    domain: str
+    tags: list[str]
+    source: str
+    created_at: datetime
+    updated_at: datetime
+    snippet: Optional[str]
+    score: Optional[float]
+
+
+class BookmarkPage(TypedDict):
+    total: Optional[int]
+    items: list[BookmarkRecord]
+    next_cursor: Optional[str]
+
+
+_page_adapter = TypeAdapter(BookmarkPage)
+_record_adapter = TypeAdapter(BookmarkRecord)
+
+
+def parse_fields(values: Optional[Iterable[str]]) -> Optional[tuple[str, ...]]:
+    """
+    Resolve a `fields=` selection (repeated and/or comma-separated values).
+
+    Returns None for "all fields", otherwise the requested fields in
+    canonical order, always including `id`. Raises `InvalidFields`.
+    """
+    names = {n.strip() for v in values or [] for n in v.split(",") if n.strip()}
+    if not names:
+        return None
+    unknown = names.difference(FIELDS)
+    if unknown:
+        raise InvalidFields(", ".join(sorted(unknown)))
+    names.add("id")
+    return tuple(f for f in FIELDS if f in names)
+
+
+def bookmark_record(
+    row: Row, snippet: Optional[str] = None, score: Optional[float] = None
+) -> BookmarkRecord:
+    """A `bookmarks` table row as a response record."""
+    return {
+        "id": row.id,
+        "url": row.url,
+        "title": row.title,
+        "description": row.description,
+        "favicon": favicons.public_url(row.favicon),
+        "domain": row.domain,
+        "tags": tagging.split_stored(row.tags),
+        "source": row.source,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "snippet": snippet,
+        "score": score,
+    }
+
+
+def sparse_record(row: Row, fields: tuple[str, ...]) -> BookmarkRecord:
+    """Only the selected `fields` of a row (which need not carry the others)."""
+    record = {f: getattr(row, f) for f in fields}
+    if "favicon" in record:
+        record["favicon"] = favicons.public_url(record["favicon"])
+    if "tags" in record:
+        record["tags"] = tagging.split_stored(record["tags"])
+    return record  # type: ignore[return-value]
+
+
+def dump_page(
+    items: list[BookmarkRecord], total: Optional[int], next_cursor: Optional[str]
+) -> bytes:
+    """Encode a list page exactly as `BookmarkListOut` would serialize."""
+    return _page_adapter.dump_json(
+        {"total": total, "items": items, "next_cursor": next_cursor}
+    )
+
+
+def dump_record(record: BookmarkRecord) -> bytes:
+    """Encode one record exactly as `BookmarkOut` would serialize."""
+    return _record_adapter.dump_json(record)
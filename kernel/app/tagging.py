@@ -0,0 +1,116 @@
+"""Normalized tag storage: `tags` + `bookmark_tags`.
+
+`Bookmark.tags` keeps the comma-joined display string, while the join table
+is the indexed source of truth for filtering and facet counts. Write paths
+call `sync_bookmark_tags`; a trigger drops associations when a bookmark row
+is deleted (see app.migrations).
+
+Tags are compared under one rule everywhere, `fold` (Unicode casefolding):
+when deduplicating a list here, and in the database through the unique
+`tags.name_key` column, which lookups and filters use instead of `name`.
+"""
+
+from collections.abc import Iterable
+from typing import Literal
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models import Bookmark, BookmarkTag, Tag
+
+TagMode = Literal["all", "any"]
+
+
+def fold(name: str) -> str:
+    """The key two tag names are equal under (stored as `Tag.name_key`)."""
+    return name.casefold()
+
+
+def normalize(tags: Iterable[str]) -> list[str]:
+    """Strip whitespace, drop empties and case-insensitive duplicates (order kept)."""
+    seen: set[str] = set()
+    result: list[str] = []
+    for raw in tags:
+        name = raw.strip()
+        if name and fold(name) not in seen:
+            seen.add(fold(name))
+            result.append(name)
+    return result
+
+
+def parse(tags_str: str) -> list[str]:
+    """Normalize a comma-joined tag string."""
+    return normalize(tags_str.split(","))
+
+
+def split_stored(tags_str: str) -> list[str]:
+    """Split a stored tag string; it was normalized on write, so only split."""
+    if not tags_str:
+        return []
+    return [t for t in map(str.strip, tags_str.split(",")) if t]
+
+
+# ---------------------------------------------------------------------------
+# Write path
+# ---------------------------------------------------------------------------
+
+async def sync_bookmark_tags(
+    session: AsyncSession, bookmark_id: int, names: list[str]
+) -> None:
+    """Replace a bookmark's tag associations with `names` (already normalized)."""
+    await sync_many(session, {bookmark_id: names})
+
+
+async def sync_many(
+    executor: AsyncSession | AsyncConnection, links: dict[int, list[str]]
+) -> None:
+    """Replace the tag associations of several bookmarks in a few statements."""
+    if not links:
+        return
+    await executor.execute(
+        sa.delete(BookmarkTag).where(BookmarkTag.bookmark_id.in_(list(links)))
+    )
+    names = normalize(n for ns in links.values() for n in ns)
+    if not names:
+        return
+
+    keys = [fold(n) for n in names]
+    await executor.execute(
+        sqlite_insert(Tag)
+        .values([{"name": n, "name_key": k} for n, k in zip(names, keys)])
+        .on_conflict_do_nothing(index_elements=["name_key"])
+    )
+    result = await executor.execute(sa.select(Tag.name_key, Tag.id).where(Tag.name_key.in_(keys)))
+    tag_ids = dict(result.all())
+    await executor.execute(
+        sa.insert(BookmarkTag.__table__),  # type: ignore[arg-type]
+        [
+            {"bookmark_id": bookmark_id, "tag_id": tag_ids[fold(n)]}
+            for bookmark_id, ns in links.items()
+            for n in ns
+        ],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Query helpers
+# ---------------------------------------------------------------------------
+
+def filter_condition(names: list[str], mode: TagMode = "all") -> sa.ColumnElement[bool]:
+    """
+    `Bookmark.id IN (...)` condition resolved through the tag index.
+
+    `all` requires every tag to be present (AND); `any` requires at least one (OR).
+    """
+    keys = list(dict.fromkeys(fold(n) for n in names))
+    subq = (
+        sa.select(BookmarkTag.bookmark_id)
+        .join(Tag, Tag.id == BookmarkTag.tag_id)
+        .where(Tag.name_key.in_(keys))
+    )
+    if mode == "all":
+        subq = subq.group_by(BookmarkTag.bookmark_id).having(
+            sa.func.count(sa.distinct(BookmarkTag.tag_id)) == len(keys)
+        )
+    return Bookmark.id.in_(subq)
@@ -0,0 +1,202 @@
+"""Group-commit write queue.
+
+When enabled, bookmark mutations are handed to a single writer task instead
+of each committing on its own. The writer collects whatever arrives within
+`write_queue.window_ms` (up to `write_queue.max_batch` operations), runs each
+operation inside a SAVEPOINT of one shared transaction, commits once, and
+resolves every caller's future with its own result or exception. A burst of
+saves then costs one fsync instead of one per request.
+
+Write paths cooperate through three helpers: `commit(session)` flushes
+instead of committing inside a batch, `after_commit(session, callback)`
+defers in-memory side effects (e.g. URL index updates) until the data is
+durable, and `lock(session)` makes a read-then-write path atomic.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import session_scope
+
+logger = logging.getLogger("arvai-kernel.write_queue")
+
+T = TypeVar("T")
+WriteOp = Callable[[AsyncSession], Awaitable[T]]
+
+_GROUPED = "arvai_group_commit"
+_AFTER_COMMIT = "arvai_after_commit"
+
+
+# ---------------------------------------------------------------------------
+# Helpers for write paths
+# ---------------------------------------------------------------------------
+
+async def commit(session: AsyncSession) -> None:
+    """Commit, or only flush when running inside a group-commit batch."""
+    if session.info.get(_GROUPED):
+        await session.flush()
+    else:
+        await session.commit()
+
+
+async def lock(session: AsyncSession) -> None:
+    """
+    Take the database write lock before the first statement of a write.
+
+    For writes that decide what to write from what they read: no other
+    connection, in this process or another, can commit in between. A
+    group-commit batch already holds the lock.
+    """
+    if not session.info.get(_GROUPED):
+        connection = await session.connection()
+        await connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Any]) -> None:
+    """Run `callback` once the current write is committed."""
+    pending = session.info.get(_AFTER_COMMIT)
+    if pending is None:
+        callback()  # not batched: the caller has already committed
+    else:
+        pending.append(callback)
+
+
+# ---------------------------------------------------------------------------
+# Writer task
+# ---------------------------------------------------------------------------
+
+class WriteQueue:
+    """Single writer task that group-commits queued operations."""
+
+    def __init__(self, window: float, max_batch: int) -> None:
+        self._window = window
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue[Optional[tuple[WriteOp, asyncio.Future]]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Process everything already queued, then stop the writer."""
+        await self._queue.put(None)
+        if self._task is not None:
+            await self._task
+
+    async def submit(self, op: WriteOp[T]) -> T:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _collect(self, first: tuple[WriteOp, asyncio.Future]) -> tuple[list, bool]:
+        loop = asyncio.get_running_loop()
+        batch = [first]
+        deadline = loop.time() + self._window
+        while len(batch) < self._max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0 and self._queue.empty():
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), max(timeout, 0))
+            except TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect(first)
+            try:
+                await self._commit_batch(batch)
+            except Exception:
+                logger.exception("Group commit of %d operations failed", len(batch))
+
+    async def _commit_batch(self, batch: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        done: list[tuple[asyncio.Future, Any]] = []
+        callbacks: list[Callable[[], Any]] = []
+
+        async with session_scope() as session:
+            # pysqlite only opens a transaction implicitly before DML, so the
+            # first SAVEPOINT would start one and each RELEASE commit it; an
+            # explicit BEGIN makes the savepoints nest in a single transaction
+            connection = await session.connection()
+            try:
+                await connection.exec_driver_sql("BEGIN IMMEDIATE")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            session.info[_GROUPED] = True
+            for op, future in batch:
+                if future.done():  # caller went away
+                    continue
+                session.info[_AFTER_COMMIT] = op_callbacks = []
+                try:
+                    async with session.begin_nested():
+                        result = await op(session)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                done.append((future, result))
+                callbacks.extend(op_callbacks)
+
+            try:
+                await session.commit()
+            except Exception as e:
+                for future, _ in done:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+
+        for callback in callbacks:
+            callback()
+        for future, result in done:
+            if not future.done():
+                future.set_result(result)
+
+
+_write_queue: Optional[WriteQueue] = None
+
+
+async def execute(session: AsyncSession, op: WriteOp[T]) -> T:
+    """
+    Run a write operation.
+
+    With the queue running, `op` is group-committed by the writer task and
+    `session` is unused; otherwise `op` runs on `session` and commits itself.
+    """
+    if _write_queue is not None:
+        return await _write_queue.submit(op)
+    return await op(session)
+
+
+def start() -> None:
+    """Start the writer task if enabled in config (called from lifespan)."""
+    global _write_queue
+    cfg = get_settings().write_queue
+    if not cfg.enabled:
+        return
+    _write_queue = WriteQueue(window=cfg.window_ms / 1000, max_batch=cfg.max_batch)
+    _write_queue.start()
+    logger.info("Group-commit write queue started (window=%sms, max_batch=%d)",
+                cfg.window_ms, cfg.max_batch)
+
+
+async def stop() -> None:
+    """Drain pending writes and stop the writer task (called from lifespan)."""
+    global _write_queue
+    queue, _write_queue = _write_queue, None
+    if queue is not None:
+        await queue.stop()
@@ -0,0 +1,11 @@
+"""Performance benchmarks for Arvai Kernel.
+
+Run from the `kernel/` directory, e.g.:
+
+    uv run python -m benchmarks.search_bench
+
+End-to-end load tests against a seeded library, compared between commits:
+
+    uv run python -m benchmarks.load --size 100k --target uvicorn
+    uv run python -m benchmarks.compare benchmarks/results/BEFORE.json benchmarks/results/AFTER.json
+"""
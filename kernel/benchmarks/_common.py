@@ -0,0 +1,127 @@
+"""Shared helpers for benchmarks that drive the kernel's own code paths."""
+
+import os
+import socket
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import yaml
+from sqlalchemy import event, text
+
+from app import database
+from app.config import get_settings
+
+KERNEL_DIR = Path(__file__).resolve().parent.parent
+
+
+@asynccontextmanager
+async def temp_database() -> AsyncIterator[Path]:
+    """Point the kernel at a throwaway SQLite file for the duration of a run."""
+    settings = get_settings()
+    original = settings.database.path
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.database.path = str(Path(tmp) / "bench.db")
+        try:
+            await database.init_db()
+            yield Path(settings.database.path)
+        finally:
+            await database.close_db()
+            settings.database.path = original
+
+
+class StatementCounter:
+    """Counts SQL statements and commits issued through the kernel engine."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.commits = 0
+        for engine in (database._get_engine(), database._get_read_engine()):
+            event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+            event.listen(engine.sync_engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args) -> None:
+        self.statements += 1
+
+    def _on_commit(self, *args) -> None:
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+
+class WalCommitCounter:
+    """
+    Counts transactions SQLite actually committed, from the commit frames
+    appended to the WAL file; SQLAlchemy "commit" events would also count
+    commits that had nothing left to write.
+
+    Turns off automatic checkpoints on the writer connection so the log is
+    only appended to while measuring.
+    """
+
+    _HEADER = 32
+    _FRAME_HEADER = 24
+
+    def __init__(self, db_path: Path) -> None:
+        self._wal = Path(f"{db_path}-wal")
+        self._baseline = 0
+
+    async def start(self) -> None:
+        async with database.session_scope() as session:
+            await session.execute(text("PRAGMA wal_autocheckpoint=0"))
+        self.reset()
+
+    def _count(self) -> int:
+        try:
+            data = self._wal.read_bytes()
+        except FileNotFoundError:
+            return 0
+        if len(data) < self._HEADER:
+            return 0
+        page_size = int.from_bytes(data[8:12], "big")
+        salts = data[16:24]
+        commits = 0
+        offset = self._HEADER
+        while offset + self._FRAME_HEADER + page_size <= len(data):
+            frame = data[offset:offset + self._FRAME_HEADER]
+            if frame[8:16] != salts:  # left over from before the log was reset
+                break
+            if int.from_bytes(frame[4:8], "big"):  # database size: a commit frame
+                commits += 1
+            offset += self._FRAME_HEADER + page_size
+        return commits
+
+    def reset(self) -> None:
+        self._baseline = self._count()
+
+    @property
+    def commits(self) -> int:
+        return self._count() - self._baseline
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def write_server_config(workdir: Path, db_path: Path, port: int, workers: int = 1) -> None:
+    """
+    Config for a kernel process started with `workdir` as its working
+    directory: the current settings, pointed at `db_path` and `port`.
+    """
+    settings = get_settings().model_copy(deep=True)
+    settings.database.path = str(db_path)
+    settings.server.host, settings.server.port = "127.0.0.1", port
+    settings.server.workers = workers
+    (workdir / "config.yaml").write_text(yaml.safe_dump(settings.model_dump()), encoding="utf-8")
+
+
+def server_env() -> dict[str, str]:
+    """Environment for a kernel subprocess that can import `app` from this checkout."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(KERNEL_DIR), env.get("PYTHONPATH")]))
+    return env
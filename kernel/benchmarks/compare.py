@@ -0,0 +1,89 @@
+"""Compare two `benchmarks.load` result files and flag regressions.
+
+Prints p50/p95/p99 and throughput for every scenario present in both runs,
+with the relative change from BASELINE to CANDIDATE. A scenario regresses
+when its p95 grows by more than `--threshold` percent *and* by more than
+`--min-ms` (so sub-millisecond jitter is not reported), or when it starts
+returning errors. Exits with status 1 if anything regressed, so it can gate
+CI between two commits.
+
+Usage:
+    uv run python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 10] [--min-ms 1]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+_COMPARABLE = ("target", "size", "concurrency", "requests", "seed", "seed_version")
+
+
+def _delta(old: float | None, new: float | None) -> str:
+    if not old or new is None:
+        return ""
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def compare(baseline: dict, candidate: dict, threshold: float, min_ms: float) -> list[str]:
+    """Print the comparison table; return the names of regressed scenarios."""
+    for key in _COMPARABLE:
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(
+                f"warning: runs differ in {key} "
+                f"({baseline['meta'].get(key)} vs {candidate['meta'].get(key)})",
+                file=sys.stderr,
+            )
+
+    print(f"baseline   {baseline['meta'].get('commit')}  {baseline['meta'].get('timestamp')}")
+    print(f"candidate  {candidate['meta'].get('commit')}  {candidate['meta'].get('timestamp')}")
+    print(f"\n{'scenario':<20} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'req/s':>16}")
+
+    regressed = []
+    old_runs, new_runs = baseline["scenarios"], candidate["scenarios"]
+    for name in [n for n in new_runs if n in old_runs]:
+        old, new = old_runs[name], new_runs[name]
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            value = new.get(key)
+            shown = "—" if value is None else f"{value:.1f}" if key == "rps" else f"{value:.2f}"
+            cells.append(f"{shown:>8} {_delta(old.get(key), value):>7}")
+        flag = ""
+        old_p95, new_p95 = old.get("p95_ms"), new.get("p95_ms")
+        if (
+            old_p95 is not None and new_p95 is not None
+            and new_p95 > old_p95 * (1 + threshold / 100)
+            and new_p95 - old_p95 > min_ms
+        ):
+            flag = "  REGRESSED"
+        if new.get("errors", 0) > old.get("errors", 0):
+            flag = f"  ERRORS ({new.get('first_error', '')[:60]})"
+        if flag:
+            regressed.append(name)
+        print(f"{name:<20} {' '.join(cells)}{flag}")
+
+    only = sorted(set(old_runs) ^ set(new_runs))
+    if only:
+        print(f"\nnot in both runs: {', '.join(only)}")
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.compare", description=__doc__.split("\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 growth in percent")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="ignore p95 changes below this")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    candidate = json.loads(args.candidate.read_text(encoding="utf-8"))
+    regressed = compare(baseline, candidate, args.threshold, args.min_ms)
+    if regressed:
+        print(f"\n{len(regressed)} regressed: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
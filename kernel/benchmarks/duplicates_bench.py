@@ -0,0 +1,89 @@
+"""Benchmark: near-duplicate detection and URL canonicalization at scale.
+
+Generates N synthetic bookmark texts, plants near-duplicates (copies with a
+couple of words changed) among them, and runs `duplicates.find_duplicates`,
+reporting time, how many planted pairs (with a true similarity at or above
+the threshold) were recovered and how many groups were spurious. Also
+times `canonical.canonicalize` per URL.
+
+Usage:
+    uv run python -m benchmarks.duplicates_bench [BOOKMARKS] [PLANTED]
+"""
+
+import random
+import sys
+import time
+
+from app import canonical, duplicates
+from app.config import get_settings
+
+DEFAULT_BOOKMARKS = 100_000
+DEFAULT_PLANTED = 1_000
+
+_VOCABULARY = [f"w{i}" for i in range(5_000)]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choices(_VOCABULARY, k=rng.randint(12, 40)))
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(_VOCABULARY)
+    return " ".join(words)
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b)
+
+
+def main(n: int, planted: int) -> None:
+    rng = random.Random(0)
+    cfg = get_settings().duplicates
+    rows = [(i, f"https://site.example/{i}", _text(rng)) for i in range(1, n + 1)]
+    pairs = set()
+    for k in range(planted):
+        source = rows[rng.randrange(n - planted)]
+        copy_id = n - planted + k + 1
+        rows[copy_id - 1] = (copy_id, f"https://mirror.example/{copy_id}", _mutate(rng, source[2]))
+        pairs.add((source[0], copy_id))
+
+    start = time.perf_counter()
+    groups = duplicates.find_duplicates(rows, cfg)
+    elapsed = time.perf_counter() - start
+
+    grouped = {}
+    for _, ids, _ in groups:
+        for i in ids:
+            grouped[i] = ids[0]
+    texts = {i: t for i, _, t in rows}
+    # Pairs whose true shingle Jaccard reaches the threshold are the ones to find
+    eligible = [
+        (a, b) for a, b in pairs
+        if _jaccard(duplicates.shingles(texts[a]), duplicates.shingles(texts[b])) >= cfg.threshold
+    ]
+    found = sum(1 for a, b in eligible if a in grouped and grouped.get(a) == grouped.get(b))
+    planted_ids = {i for pair in pairs for i in pair}
+    spurious = sum(1 for _, ids, _ in groups if not set(ids) & planted_ids)
+
+    urls = [
+        f"http://www.Example{i % 100}.com/path/{i}/?utm_source=x&b={i}&a=1#frag"
+        for i in range(100_000)
+    ]
+    start = time.perf_counter()
+    for url in urls:
+        canonical.canonicalize(url)
+    per_url = (time.perf_counter() - start) / len(urls) * 1e6
+
+    print(f"bookmarks     {n} ({planted} planted near-duplicates)")
+    print(f"threshold     {cfg.threshold} (num_perm {cfg.num_perm}, bands {cfg.bands})")
+    print(f"elapsed       {elapsed:.2f} s")
+    print(f"recovered     {found}/{len(eligible)} planted pairs at or above the threshold")
+    print(f"spurious      {spurious} groups")
+    print(f"canonicalize  {per_url:.1f} µs/url")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BOOKMARKS
+    planted = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PLANTED
+    main(n, planted)
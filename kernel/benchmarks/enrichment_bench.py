@@ -0,0 +1,147 @@
+"""Benchmark: enrichment pipeline against a local stand-in HTTP server.
+
+Serves generated HTML pages (with artificial latency) on 127.0.0.1–127.0.0.N,
+so every loopback address counts as a separate host. Seeds bookmarks that
+point at them, runs them through `app.enrichment.Enricher`, and reports
+throughput, the highest per-host concurrency the server observed (must not
+exceed the configured limit), event-loop lag and `create` latency while the
+pipeline is busy, and how many bookmarks got their title filled in.
+
+Usage:
+    uv run python -m benchmarks.enrichment_bench [PAGES] [HOSTS] [LATENCY_MS]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+
+import sqlalchemy as sa
+
+from app import database
+from app.config import EnrichmentConfig
+from app.crud import bookmarks
+from app.enrichment import Enricher
+from benchmarks._common import temp_database
+
+DEFAULT_PAGES = 300
+DEFAULT_HOSTS = 6
+DEFAULT_LATENCY_MS = 50
+
+_PAGE = """<!doctype html><html><head><meta charset="utf-8">
+<title>Stand-in page {n}</title>
+<meta name="description" content="Description of page {n}">
+<meta property="og:site_name" content="Stand-in">
+<script>var ignored = 1;</script></head>
+<body><nav>menu</nav><article>{body}</article></body></html>"""
+
+
+class StandInServer:
+    """Minimal HTTP/1.1 server that records concurrent requests per host."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.active: Counter[str] = Counter()
+        self.peak: Counter[str] = Counter()
+        self.requests = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "0.0.0.0", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        host = writer.get_extra_info("sockname")[0]
+        try:
+            while request := await reader.readuntil(b"\r\n\r\n"):
+                path = request.split(b" ", 2)[1].decode()
+                self.requests += 1
+                self.active[host] += 1
+                self.peak[host] = max(self.peak[host], self.active[host])
+                await asyncio.sleep(self.latency)
+                self.active[host] -= 1
+                n = path.rsplit("/", 1)[-1]
+                body = _PAGE.format(n=n, body=f"<p>Paragraph {n}. </p>" * 200).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _loop_lag(stop: asyncio.Event, samples: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(0.005)
+        samples.append((loop.time() - start - 0.005) * 1000)
+
+
+async def main(pages: int, hosts: int, latency_ms: float) -> None:
+    server = StandInServer(latency_ms / 1000)
+    port = await server.start()
+    cfg = EnrichmentConfig(
+        enabled=True, concurrency=16, per_host_concurrency=2,
+        per_host_interval=0.0, parse_workers=2, batch_size=50,
+    )
+    async with temp_database():
+        urls = [f"http://127.0.0.{i % hosts + 1}:{port}/page/{i}" for i in range(pages)]
+        async with database.session_scope() as session:
+            await bookmarks.upsert_many(session, [{"url": u} for u in urls])
+            result = await session.execute(sa.text("SELECT id, url FROM bookmarks"))
+            targets = result.all()
+
+        enricher = Enricher(cfg)
+        enricher.start()
+        stop, lag = asyncio.Event(), []
+        lag_task = asyncio.create_task(_loop_lag(stop, lag))
+
+        start = time.perf_counter()
+        for bookmark_id, url in targets:
+            enricher.submit(bookmark_id, url)
+
+        # Saves must stay fast while the pipeline is busy; they are enriched too
+        save_ms = []
+        for i in range(pages, pages + 50):
+            t = time.perf_counter()
+            async with database.session_scope() as session:
+                await bookmarks.create(session, url=f"http://127.0.0.{i % hosts + 1}:{port}/page/{i}")
+            save_ms.append((time.perf_counter() - t) * 1000)
+
+        await enricher.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await lag_task
+        await enricher.stop()
+
+        async with database.session_scope() as session:
+            filled = (await session.execute(sa.text(
+                "SELECT count(*) FROM bookmarks WHERE title LIKE 'Stand-in page%'"
+            ))).scalar()
+
+    await server.stop()
+    print(f"pages        {pages} across {hosts} hosts, {latency_ms:.0f} ms server latency")
+    print(f"elapsed      {elapsed:.2f} s  ({pages / elapsed:.0f} pages/s)")
+    print(f"requests     {server.requests}")
+    print(f"per-host max {max(server.peak.values())} (limit {cfg.per_host_concurrency})")
+    print(f"loop lag     p50 {statistics.median(lag):.2f} ms  max {max(lag):.2f} ms")
+    print(f"create       p50 {statistics.median(save_ms):.2f} ms  max {max(save_ms):.2f} ms")
+    print(f"titles set   {filled}/{pages}")
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PAGES
+    hosts = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_HOSTS
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_LATENCY_MS
+    asyncio.run(main(pages, hosts, latency))
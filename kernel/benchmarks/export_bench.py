@@ -0,0 +1,74 @@
+"""Benchmark: streaming export throughput and memory.
+
+Seeds a throwaway database, then drains `exporter.stream_export` for each
+format while sampling the process RSS. Peak RSS should stay flat as the
+row count grows.
+
+Usage:
+    uv run python -m benchmarks.export_bench [ROWS]
+"""
+
+import asyncio
+import resource
+import sys
+import time
+from pathlib import Path
+
+from app import exporter
+from app.crud import bookmarks
+from app.database import session_scope
+from benchmarks._common import temp_database
+
+DEFAULT_ROWS = 1_000_000
+SEED_BATCH = 10_000
+
+
+def current_rss_mb() -> float:
+    """Current resident set size (Linux /proc), else the lifetime peak."""
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        pages = int(statm.read_text().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+async def seed(rows: int) -> None:
+    for start in range(0, rows, SEED_BATCH):
+        batch = [
+            {
+                "url": f"https://site{i % 5000}.example/page/{i}",
+                "title": f"Bookmark number {i}",
+                "description": "A moderately long description of the page " * 3,
+                "tags": [f"tag{i % 40}", f"topic{i % 7}"],
+            }
+            for i in range(start, min(start + SEED_BATCH, rows))
+        ]
+        async with session_scope() as session:
+            await bookmarks.upsert_many(session, batch)
+
+
+async def run(rows: int) -> None:
+    async with temp_database():
+        t = time.perf_counter()
+        await seed(rows)
+        print(f"seeded {rows} rows in {time.perf_counter() - t:.1f}s")
+
+        for fmt in ("ndjson", "csv", "html"):
+            baseline = peak = current_rss_mb()
+            size = chunks = 0
+            start = time.perf_counter()
+            async for chunk in exporter.stream_export(fmt):
+                size += len(chunk)
+                chunks += 1
+                if chunks % 50 == 0:
+                    peak = max(peak, current_rss_mb())
+            elapsed = time.perf_counter() - start
+            print(
+                f"{fmt:<7} {size / 2**20:>9.1f} MiB in {elapsed:>6.2f}s "
+                f"({rows / elapsed:>9.0f} rows/s)  RSS {baseline:.0f} -> peak {peak:.0f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS))
@@ -0,0 +1,554 @@
+"""Load test: every bookmark and API key route against a seeded library.
+
+Copies a synthetic library of the requested size (see `benchmarks.seed`),
+then drives the API either in-process through `httpx.ASGITransport`
+(`--target asgi`, no sockets or HTTP parsing) or over TCP against a real
+uvicorn process (`--target uvicorn`, configured through a generated
+config.yaml in a scratch directory; `--workers N` runs N worker processes). Scenarios cover every route in
+`routers/bookmarks.py` and `routers/api_keys.py`, plus the extension's
+check-on-tab-switch traffic: a working set of open tabs revalidated with
+`If-None-Match`, mostly for pages that are not bookmarked.
+
+Each scenario runs `--requests × share` requests from `--concurrency`
+workers and reports p50/p95/p99/mean latency, throughput, errors and the
+server's resident memory (current and peak, summed over its worker processes). Results are written as JSON
+under `benchmarks/results/`; diff two runs with `benchmarks.compare`.
+
+Usage:
+    uv run python -m benchmarks.load [--size 10k] [--target asgi|uvicorn] [--workers 1]
+                                     [--concurrency 8] [--requests 200]
+                                     [--scenario NAME ...] [--out FILE]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.config import get_settings
+from benchmarks import seed
+from benchmarks._common import KERNEL_DIR, free_port, server_env, write_server_config
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+API_KEY_HEADER = "X-Arvai-API-Key"
+SCHEMA_VERSION = 1
+
+_READY_TIMEOUT = 60.0
+_IMPORT_ROWS = 500
+_TABS = 40
+
+
+class _Skip(Exception):
+    """A scenario's input pool ran dry (e.g. nothing left to delete)."""
+
+
+# ---------------------------------------------------------------------------
+# Targets: where requests go and whose memory is measured
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Target:
+    client: httpx.AsyncClient
+    pid: int
+
+
+@asynccontextmanager
+async def asgi_target(db_path: Path, workdir: Path, concurrency: int) -> AsyncIterator[Target]:
+    from app.main import create_app
+
+    get_settings().database.path = str(db_path)
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://kernel") as client:
+            yield Target(client, os.getpid())
+
+
+@asynccontextmanager
+async def uvicorn_target(
+    db_path: Path, workdir: Path, concurrency: int, workers: int = 1
+) -> AsyncIterator[Target]:
+    port = free_port()
+    write_server_config(workdir, db_path, port, workers=workers)
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+        "--log-level", "warning", "--no-access-log",
+        cwd=workdir, env=server_env(),
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            deadline = time.monotonic() + _READY_TIMEOUT
+            while True:
+                if proc.returncode is not None:
+                    raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not become ready")
+                await asyncio.sleep(0.1)
+            yield Target(client, proc.pid)
+    finally:
+        if proc.returncode is None:
+            proc.terminate()
+            try:
+                await asyncio.wait_for(proc.wait(), 30)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+
+
+TARGETS = {"asgi": asgi_target, "uvicorn": uvicorn_target}
+
+
+def memory_mb(pid: int) -> tuple[Optional[float], Optional[float]]:
+    """
+    (current, peak) resident set size of `pid` and its child processes
+    (e.g. uvicorn workers) in MiB; Linux only.
+    """
+    try:
+        lines = Path(f"/proc/{pid}/status").read_text().splitlines()
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    except OSError:
+        return None, None
+    values = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in ("VmRSS", "VmHWM"):
+            values[key] = int(rest.split()[0]) / 1024
+    rss, peak = values.get("VmRSS"), values.get("VmHWM")
+    for child in children:
+        child_rss, child_peak = memory_mb(int(child))
+        if rss is not None and child_rss is not None:
+            rss += child_rss
+        if peak is not None and child_peak is not None:
+            peak += child_peak
+    return rss, peak
+
+
+# ---------------------------------------------------------------------------
+# Run state shared by scenarios
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Fixture:
+    """Existing rows sampled from the library before the server starts."""
+
+    ids: list[int]
+    urls: list[str]
+    revision: int
+    words: list[str]
+    tags: list[str]
+
+    @classmethod
+    def load(cls, db_path: Path, rng: random.Random, sample: int = 2000) -> "Fixture":
+        conn = sqlite3.connect(db_path)
+        try:
+            total = conn.execute("SELECT max(id) FROM bookmarks").fetchone()[0] or 0
+            picks = sorted(rng.sample(range(1, total + 1), min(sample, total)))
+            rows = conn.execute(
+                f"SELECT id, url FROM bookmarks WHERE id IN ({','.join('?' * len(picks))})", picks
+            ).fetchall()
+            revision = conn.execute(
+                "SELECT value FROM bookmark_counts WHERE name = 'revision'"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        generator = seed.LibraryGenerator()
+        return cls(
+            ids=[r[0] for r in rows],
+            urls=[r[1] for r in rows],
+            revision=revision,
+            words=generator.words,
+            tags=generator.tags,
+        )
+
+
+@dataclass
+class Run:
+    client: httpx.AsyncClient
+    fixture: Fixture
+    rng: random.Random
+    serial: itertools.count = field(default_factory=itertools.count)
+    etags: dict[str, str] = field(default_factory=dict)
+    tabs: list[str] = field(default_factory=list)
+    cursor: Optional[str] = None
+    created: list[int] = field(default_factory=list)
+    keys: list[int] = field(default_factory=list)
+    jobs: list[str] = field(default_factory=list)
+
+    def saved_url(self) -> str:
+        return self.rng.choice(self.fixture.urls)
+
+    def unsaved_url(self) -> str:
+        return f"https://unsaved{self.rng.randrange(500)}.example/read/{next(self.serial)}"
+
+    def new_bookmark(self) -> dict:
+        words = self.rng.choices(self.fixture.words[:500], k=6)
+        return {
+            "url": f"https://fresh.example/{'-'.join(words[:2])}/{next(self.serial)}",
+            "title": " ".join(words),
+            "tags": self.rng.sample(self.fixture.tags[:50], 2),
+        }
+
+    def common_word(self) -> str:
+        return self.rng.choice(self.fixture.words[:100])
+
+    def rare_word(self) -> str:
+        return self.rng.choice(self.fixture.words[1000:2000])
+
+    def popular_tag(self) -> str:
+        return self.rng.choice(self.fixture.tags[:20])
+
+    async def check(self, url: str) -> httpx.Response:
+        """GET /check the way the extension does, revalidating a cached answer."""
+        headers = {"If-None-Match": self.etags[url]} if url in self.etags else {}
+        response = await self.client.get("/api/bookmarks/check", params={"url": url}, headers=headers)
+        if etag := response.headers.get("etag"):
+            self.etags[url] = etag
+        return response
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+Call = Callable[[Run], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    route: str
+    call: Call
+    share: float = 1.0          # fraction of --requests this scenario runs
+    ok: tuple[int, ...] = (200,)
+
+
+async def _check_revalidate(run: Run) -> httpx.Response:
+    url = run.rng.choice(run.fixture.urls[:20])
+    return await run.check(url)
+
+
+async def _tab_switch(run: Run) -> httpx.Response:
+    # Mostly switching between already-open tabs; sometimes opening a new one
+    if len(run.tabs) < _TABS or run.rng.random() < 0.2:
+        url = run.saved_url() if run.rng.random() < 0.3 else run.unsaved_url()
+        if len(run.tabs) >= _TABS:
+            run.tabs[run.rng.randrange(_TABS)] = url
+        else:
+            run.tabs.append(url)
+    else:
+        url = run.rng.choice(run.tabs)
+    return await run.check(url)
+
+
+async def _check_batch(run: Run) -> httpx.Response:
+    urls = [run.saved_url() if i % 2 else run.unsaved_url() for i in range(100)]
+    return await run.client.post("/api/bookmarks/check/batch", json={"urls": urls})
+
+
+async def _list_cursor(run: Run) -> httpx.Response:
+    params = {"limit": 50, "with_total": False}
+    if run.cursor:
+        params["cursor"] = run.cursor
+    response = await run.client.get("/api/bookmarks", params=params)
+    if response.status_code == 200:
+        run.cursor = response.json().get("next_cursor")
+    return response
+
+
+async def _create(run: Run) -> httpx.Response:
+    response = await run.client.post("/api/bookmarks", json=run.new_bookmark())
+    if response.status_code == 201:
+        run.created.append(response.json()["id"])
+    return response
+
+
+async def _delete(run: Run) -> httpx.Response:
+    if not run.created:
+        raise _Skip
+    return await run.client.delete(f"/api/bookmarks/{run.created.pop()}")
+
+
+async def _import(run: Run) -> httpx.Response:
+    body = "\n".join(json.dumps(run.new_bookmark()) for _ in range(_IMPORT_ROWS)).encode()
+    response = await run.client.post(
+        "/api/bookmarks/import", params={"format": "ndjson"}, content=body
+    )
+    if response.status_code != 202:
+        return response
+    job_id = response.json()["id"]
+    run.jobs.append(job_id)
+    # Latency covers the whole job, not just the upload
+    while True:
+        status = await run.client.get(f"/api/bookmarks/import/{job_id}")
+        if status.status_code != 200 or status.json()["status"] != "running":
+            return status
+        await asyncio.sleep(0.01)
+
+
+async def _import_status(run: Run) -> httpx.Response:
+    if not run.jobs:
+        raise _Skip
+    return await run.client.get(f"/api/bookmarks/import/{run.rng.choice(run.jobs)}")
+
+
+async def _create_key(run: Run) -> httpx.Response:
+    response = await run.client.post("/api/keys", json={"name": "load-test"})
+    if response.status_code == 201:
+        run.keys.append(response.json()["id"])
+    return response
+
+
+async def _delete_key(run: Run) -> httpx.Response:
+    if not run.keys:
+        raise _Skip
+    return await run.client.delete(f"/api/keys/{run.keys.pop()}")
+
+
+def _get(path: str, params: Callable[[Run], dict]) -> Call:
+    async def call(run: Run) -> httpx.Response:
+        return await run.client.get(path, params=params(run))
+    return call
+
+
+B = "/api/bookmarks"
+SCENARIOS = [
+    # Extension traffic
+    Scenario("check_hit", "GET /check", lambda r: r.check(r.saved_url()), ok=(200, 304)),
+    Scenario("check_miss", "GET /check", lambda r: r.check(r.unsaved_url())),
+    Scenario("check_revalidate", "GET /check", _check_revalidate, ok=(200, 304)),
+    Scenario("tab_switch", "GET /check", _tab_switch, share=2.0, ok=(200, 304)),
+    Scenario("check_batch", "POST /check/batch", _check_batch, share=0.25),
+    # Listing and search
+    Scenario("list_recent", "GET /", _get(B, lambda r: {"limit": 50, "with_total": False})),
+    Scenario("list_total", "GET /", _get(B, lambda r: {"limit": 50})),
+    Scenario("list_offset", "GET /", _get(B, lambda r: {
+        "limit": 50, "offset": r.rng.randrange(min(10_000, len(r.fixture.ids) * 5))})),
+    Scenario("list_cursor", "GET /", _list_cursor),
+    Scenario("list_fields", "GET /", _get(B, lambda r: {
+        "limit": 200, "with_total": False, "fields": "id,title,url"})),
+    Scenario("search_common", "GET /?q", _get(B, lambda r: {"q": r.common_word()})),
+    Scenario("search_rare", "GET /?q", _get(B, lambda r: {"q": r.rare_word()})),
+    Scenario("search_highlight", "GET /?q", _get(B, lambda r: {
+        "q": f"{r.common_word()} {r.rare_word()}", "highlight": True, "tag_mode": "any"})),
+    Scenario("tag_one", "GET /?tag", _get(B, lambda r: {"tag": r.popular_tag()})),
+    Scenario("tag_all", "GET /?tag", _get(B, lambda r: {
+        "tag": f"{r.popular_tag()},{r.popular_tag()}"})),
+    Scenario("tag_any", "GET /?tag", _get(B, lambda r: {
+        "tag": f"{r.popular_tag()},{r.popular_tag()}", "tag_mode": "any"})),
+    Scenario("get", "GET /{id}", lambda r: r.client.get(f"{B}/{r.rng.choice(r.fixture.ids)}")),
+    Scenario("get_fields", "GET /{id}", lambda r: r.client.get(
+        f"{B}/{r.rng.choice(r.fixture.ids)}", params={"fields": "id,url,tags"})),
+    Scenario("changes", "GET /changes", _get(f"{B}/changes", lambda r: {
+        "since": max(0, r.fixture.revision - r.rng.randrange(5_000))})),
+    Scenario("semantic", "GET /semantic", _get(f"{B}/semantic", lambda r: {
+        "q": " ".join(r.rng.choices(r.fixture.words[:300], k=3))})),
+    Scenario("duplicates", "GET /duplicates", _get(f"{B}/duplicates", lambda r: {
+        "limit": 50}), share=0.02),
+    Scenario("export_ndjson", "GET /export", _get(f"{B}/export", lambda r: {
+        "format": "ndjson"}), share=0.02),
+    Scenario("export_csv_fields", "GET /export", _get(f"{B}/export", lambda r: {
+        "format": "csv", "fields": "id,url,title"}), share=0.02),
+    # Writes
+    Scenario("create", "POST /", _create, share=0.5, ok=(201,)),
+    Scenario("create_existing", "POST /", lambda r: r.client.post(B, json={
+        "url": r.saved_url(), "title": "re-saved"}), share=0.25, ok=(201,)),
+    Scenario("update", "PATCH /{id}", lambda r: r.client.patch(
+        f"{B}/{r.rng.choice(r.fixture.ids)}", json={"title": f"edited {next(r.serial)}"}),
+        share=0.5),
+    Scenario("bulk_retag", "POST /bulk", lambda r: r.client.post(f"{B}/bulk", json={
+        "ids": r.rng.sample(r.fixture.ids, min(100, len(r.fixture.ids))),
+        "add_tags": [r.popular_tag()], "remove_tags": [r.popular_tag()]}), share=0.1),
+    Scenario("import", "POST /import", _import, share=0.05),
+    Scenario("import_status", "GET /import/{id}", _import_status, share=0.25),
+    Scenario("delete", "DELETE /{id}", _delete, share=0.5),
+    # API keys
+    Scenario("keys_create", "POST /api/keys", _create_key, share=0.1, ok=(201,)),
+    Scenario("keys_list", "GET /api/keys", lambda r: r.client.get("/api/keys"), share=0.25),
+    Scenario("keys_delete", "DELETE /api/keys/{id}", _delete_key, share=0.1),
+]
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _percentile(ordered: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def run_scenario(
+    run: Run, target: Target, scenario: Scenario, requests: int, concurrency: int
+) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    skipped = 0
+    counter = itertools.count()
+
+    async def worker() -> None:
+        nonlocal skipped
+        while next(counter) < requests:
+            start = time.perf_counter()
+            try:
+                response = await scenario.call(run)
+            except _Skip:
+                skipped += 1
+                continue
+            except httpx.HTTPError as e:
+                errors.append(repr(e))
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code not in scenario.ok:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+
+    rss, peak = memory_mb(target.pid)
+    result = {
+        "route": scenario.route,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "rss_mb": rss and round(rss, 1),
+        "peak_rss_mb": peak and round(peak, 1),
+    }
+    if latencies:
+        latencies.sort()
+        result.update({
+            "p50_ms": round(_percentile(latencies, 50), 3),
+            "p95_ms": round(_percentile(latencies, 95), 3),
+            "p99_ms": round(_percentile(latencies, 99), 3),
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "max_ms": round(latencies[-1], 3),
+        })
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=KERNEL_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(args: argparse.Namespace, size: int) -> dict:
+    return {
+        "schema": SCHEMA_VERSION,
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.target,
+        "workers": args.workers,
+        "size": size,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seed": seed.RNG_SEED,
+        "seed_version": seed.SEED_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+async def main(args: argparse.Namespace, size: int) -> dict:
+    wanted = set(args.scenario or [s.name for s in SCENARIOS])
+    rng = random.Random(seed.RNG_SEED)
+    with tempfile.TemporaryDirectory(prefix="arvai-load-") as tmp:
+        workdir = Path(tmp)
+        db_path = seed.copy_library(size, workdir / "library")
+        fixture = Fixture.load(db_path, rng)
+        results = {}
+        options = {"workers": args.workers} if args.target == "uvicorn" else {}
+        async with TARGETS[args.target](db_path, workdir, args.concurrency, **options) as target:
+            response = await target.client.post("/api/keys", json={"name": "load-test"})
+            response.raise_for_status()
+            target.client.headers[API_KEY_HEADER] = response.json()["key"]
+            run = Run(target.client, fixture, rng)
+            # Let background startup work (semantic index catch-up) settle
+            await target.client.get(f"{B}/semantic", params={"q": "warm up"})
+            for scenario in SCENARIOS:
+                if scenario.name not in wanted:
+                    continue
+                requests = max(1, round(args.requests * scenario.share))
+                result = await run_scenario(run, target, scenario, requests, args.concurrency)
+                results[scenario.name] = result
+                _print_row(scenario.name, result)
+    return {"meta": _meta(args, size), "scenarios": results}
+
+
+def _print_row(name: str, r: dict) -> None:
+    if "p50_ms" not in r:
+        print(f"{name:<20} {'—':>9}  ({r['skipped']} skipped)")
+        return
+    print(
+        f"{name:<20} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+        f"{r['rps']:>9.1f} {r['errors']:>6} {r['peak_rss_mb'] or 0:>9.1f}"
+    )
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="benchmarks.load", description=__doc__.split("\n")[0])
+    parser.add_argument("--size", default="10k", help="library size: 1k, 10k, 100k, 1m or a number")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client workers")
+    parser.add_argument("--requests", type=int, default=200, help="base requests per scenario")
+    parser.add_argument(
+        "--scenario", action="append", choices=[s.name for s in SCENARIOS],
+        help="run only this scenario (repeatable)",
+    )
+    parser.add_argument("--out", type=Path, help="result file (default: benchmarks/results/…)")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and args.target != "uvicorn":
+        parser.error("--workers needs --target uvicorn")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    size = seed.parse_size(args.size)
+    seed.library(size)  # seed (once) before the measured event loop starts
+    workers = f" × {args.workers} workers" if args.workers > 1 else ""
+    print(f"{args.target}{workers}, {size} bookmarks, concurrency {args.concurrency}")
+    print(f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>6} {'peak MiB':>9}")
+    report = asyncio.run(main(args, size))
+    target = f"{args.target}-w{args.workers}" if args.workers > 1 else args.target
+    out = args.out or RESULTS_DIR / (
+        f"{report['meta']['timestamp'][:19].replace(':', '')}-{report['meta']['commit'] or 'nogit'}"
+        f"-{target}-{args.size}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nwrote {out}")
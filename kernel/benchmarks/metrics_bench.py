@@ -0,0 +1,72 @@
+"""Benchmark: request overhead of the metrics middleware and SQL hooks.
+
+Serves the same mix of cheap requests (`/check` hits and misses, a
+bookmark fetch) through `create_app()` in-process, once with metrics
+disabled and once enabled, and reports the per-request difference plus
+the cost of rendering `/metrics`.
+
+Usage:
+    uv run python -m benchmarks.metrics_bench [REQUESTS]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from app.config import get_settings
+from app.main import create_app
+from benchmarks._common import temp_database
+
+DEFAULT_REQUESTS = 3_000
+_ROUNDS = 3
+
+
+async def _serve(n: int, enabled: bool) -> tuple[float, float]:
+    """Mean µs per request, and ms per /metrics render."""
+    get_settings().metrics.enabled = enabled
+    async with temp_database():
+        app = create_app()
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://kernel") as client:
+                key = (await client.post("/api/keys", json={"name": "bench"})).json()["key"]
+                client.headers["X-Arvai-API-Key"] = key
+                created = await client.post("/api/bookmarks", json={"url": "https://a.example/"})
+                paths = [
+                    ("/api/bookmarks/check", {"url": "https://a.example/"}),
+                    ("/api/bookmarks/check", {"url": "https://b.example/"}),
+                    (f"/api/bookmarks/{created.json()['id']}", None),
+                ]
+                start = time.perf_counter()
+                for i in range(n):
+                    path, params = paths[i % len(paths)]
+                    await client.get(path, params=params)
+                per_request = (time.perf_counter() - start) / n * 1e6
+
+                render = 0.0
+                if enabled:
+                    start = time.perf_counter()
+                    await client.get("/metrics")
+                    render = (time.perf_counter() - start) * 1000
+    return per_request, render
+
+
+async def main(n: int) -> None:
+    off, on, render = [], [], 0.0
+    for _ in range(_ROUNDS):
+        off.append((await _serve(n, False))[0])
+        per_request, render = await _serve(n, True)
+        on.append(per_request)
+    base, instrumented = statistics.median(off), statistics.median(on)
+    print(f"requests      {n} × {_ROUNDS} rounds")
+    print(f"metrics off   {base:.1f} µs/request")
+    print(f"metrics on    {instrumented:.1f} µs/request")
+    print(f"overhead      {instrumented - base:+.1f} µs/request ({(instrumented / base - 1) * 100:+.1f}%)")
+    print(f"render        {render:.2f} ms per /metrics scrape")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS))
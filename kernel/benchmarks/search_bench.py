@@ -0,0 +1,140 @@
+"""Benchmark: FTS5 search vs. the legacy LIKE scan.
+
+Seeds throwaway SQLite databases with synthetic bookmarks and times the
+count + first-page queries that `crud.bookmarks.list_all` issues for a
+keyword search, once through LIKE and once through the FTS5 index.
+
+Usage:
+    uv run python -m benchmarks.search_bench [ROWS ...]
+"""
+
+import random
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app import search
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+REPEAT = 5
+VOCABULARY_SIZE = 5_000
+
+# Zipf-like vocabulary: word i is drawn with weight 1 / (i + 1), so queries
+# below span common, medium and rare terms.
+_rng = random.Random(7)
+_WORDS = [
+    "".join(_rng.choices(string.ascii_lowercase, k=_rng.randint(4, 9)))
+    for _ in range(VOCABULARY_SIZE)
+]
+_WEIGHTS = [1 / (i + 1) for i in range(VOCABULARY_SIZE)]
+
+QUERIES = {
+    "common": _WORDS[0],
+    "medium": _WORDS[100],
+    "rare": _WORDS[3000],
+    "two terms": f"{_WORDS[10]} {_WORDS[50]}",
+    "no match": "zzzzqqqq",
+}
+
+_TABLE_DDL = """
+CREATE TABLE bookmarks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    favicon TEXT NOT NULL DEFAULT '',
+    domain TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT 'extension',
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL
+)
+"""
+
+_LIKE_WHERE = (
+    "(title LIKE :p OR url LIKE :p OR description LIKE :p OR domain LIKE :p)"
+)
+_LIKE_COUNT = f"SELECT count(id) FROM bookmarks WHERE {_LIKE_WHERE}"
+_LIKE_PAGE = (
+    f"SELECT * FROM bookmarks WHERE {_LIKE_WHERE} "
+    "ORDER BY created_at DESC LIMIT 50"
+)
+_FTS_COUNT = (
+    f"SELECT count(b.id) FROM bookmarks b JOIN {search.FTS_TABLE} f "
+    f"ON f.rowid = b.id WHERE f.{search.FTS_TABLE} MATCH :m"
+)
+_FTS_PAGE = (
+    f"SELECT b.* FROM bookmarks b JOIN {search.FTS_TABLE} f "
+    f"ON f.rowid = b.id WHERE f.{search.FTS_TABLE} MATCH :m "
+    f"ORDER BY bm25({search.FTS_TABLE}, {', '.join(map(str, search.BM25_WEIGHTS))}), "
+    "b.created_at DESC LIMIT 50"
+)
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(_WORDS, weights=_WEIGHTS, k=n))
+
+
+def seed(conn: sqlite3.Connection, rows: int) -> None:
+    rng = random.Random(42)
+    conn.execute(_TABLE_DDL)
+    conn.execute("CREATE INDEX ix_bookmarks_created_at ON bookmarks (created_at)")
+    for ddl in search.SCHEMA_DDL:
+        conn.execute(ddl)
+
+    def gen():
+        for i in range(rows):
+            domain = "".join(rng.choices(string.ascii_lowercase, k=6)) + ".com"
+            ts = f"2024-01-01 00:00:{i:012d}"
+            yield (
+                f"https://{domain}/{i}",
+                _sentence(rng, 6),
+                _sentence(rng, 20),
+                domain,
+                ts,
+                ts,
+            )
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO bookmarks (url, title, description, domain, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            gen(),
+        )
+
+
+def _time(conn: sqlite3.Connection, sqls: list[str], params: dict) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for sql in sqls:
+            conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(sizes: list[int]) -> None:
+    print(f"{'rows':>10}  {'query':<10} {'LIKE ms':>10} {'FTS ms':>10} {'speedup':>8}")
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = sqlite3.connect(Path(tmp) / "bench.db")
+            seed(conn, rows)
+            for label, q in QUERIES.items():
+                terms, _ = search.split_terms(q)
+                # The legacy path matches the whole query string as one substring
+                like_ms = _time(conn, [_LIKE_COUNT, _LIKE_PAGE], {"p": f"%{q}%"})
+                fts_ms = _time(
+                    conn, [_FTS_COUNT, _FTS_PAGE], {"m": search.build_match_expression(terms)}
+                )
+                print(
+                    f"{rows:>10}  {label:<10} {like_ms:>10.2f} {fts_ms:>10.2f} "
+                    f"{like_ms / fts_ms:>7.1f}x"
+                )
+            conn.close()
+
+
+if __name__ == "__main__":
+    run([int(a) for a in sys.argv[1:]] or DEFAULT_SIZES)
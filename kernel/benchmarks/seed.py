@@ -0,0 +1,154 @@
+"""Reproducible synthetic bookmark libraries for load tests.
+
+`seed_library(directory, n)` fills a fresh kernel database with N bookmarks
+drawn from a fixed RNG: domains and tags follow a Zipf distribution (a few
+sites and tags dominate, with a long tail), titles and descriptions come
+from a Zipf-weighted vocabulary, `created_at` spans several years and most
+rows are saved from the extension. The semantic index is built as part of
+seeding so a benchmark run does not measure the initial embedding pass.
+
+Seeding 1M bookmarks takes minutes, so `library(n)` keeps one template per
+size under `benchmarks/.data/` and every run works on a copy of it.
+
+Usage:
+    uv run python -m benchmarks.seed [SIZE ...]   # e.g. 1k 10k 100k 1m
+"""
+
+import asyncio
+import random
+import shutil
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app import database
+from app.config import get_settings
+from app.crud import bookmarks
+from app.semantic import SemanticIndex
+
+# Bump when the generator changes so stale templates are rebuilt
+SEED_VERSION = 1
+RNG_SEED = 20_240_601
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+DB_NAME = "kernel.db"
+
+_CHUNK = 10_000
+_DOMAINS = 5_000
+_TAGS = 400
+_VOCABULARY = 3_000
+_TLDS = ["com", "org", "io", "dev", "net", "cn", "co.uk", "de"]
+_SYLLABLES = (
+    "ka ri to mo na se lu vi de pa xo ren tal mir gor bex sun quo lin fa "
+    "zu ho ter nex dra pol cam yu shi an"
+).split()
+# Fixed epoch so the same seed yields the same rows on any day
+_NEWEST = datetime(2024, 6, 1, tzinfo=timezone.utc)
+_SPAN = timedelta(days=4 * 365)
+
+
+def parse_size(text: str) -> int:
+    """'10k' → 10000, '1m' → 1000000, '2500' → 2500."""
+    text = text.strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def _zipf(n: int, s: float = 1.1) -> list[float]:
+    """Cumulative Zipf weights for `random.choices(cum_weights=...)`."""
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank**s
+        cumulative.append(total)
+    return cumulative
+
+
+class LibraryGenerator:
+    """Deterministic stream of bookmark rows for `bookmarks.upsert_many`."""
+
+    def __init__(self, seed: int = RNG_SEED) -> None:
+        self.rng = random.Random(seed)
+        words = set()
+        while len(words) < _VOCABULARY:
+            words.add("".join(self.rng.choices(_SYLLABLES, k=self.rng.randint(1, 3))))
+        self.words = sorted(words)
+        self.rng.shuffle(self.words)
+        self.domains = [
+            f"{self.words[i % _VOCABULARY]}{i}.{self.rng.choice(_TLDS)}" for i in range(_DOMAINS)
+        ]
+        self.tags = self.words[-_TAGS:]
+        self._word_weights = _zipf(len(self.words))
+        self._domain_weights = _zipf(_DOMAINS)
+        self._tag_weights = _zipf(_TAGS)
+
+    def _phrase(self, lo: int, hi: int) -> str:
+        k = self.rng.randint(lo, hi)
+        return " ".join(self.rng.choices(self.words, cum_weights=self._word_weights, k=k))
+
+    def row(self, i: int) -> dict:
+        rng = self.rng
+        domain = rng.choices(self.domains, cum_weights=self._domain_weights)[0]
+        host = f"www.{domain}" if rng.random() < 0.3 else domain
+        slug = "-".join(rng.choices(self.words, k=rng.randint(1, 4)))
+        url = f"https://{host}/{slug}/{i}"
+        if rng.random() < 0.1:
+            url += f"?page={rng.randint(1, 9)}"
+        n_tags = rng.choices((0, 1, 2, 3, 4), weights=(30, 30, 25, 10, 5))[0]
+        return {
+            "url": url,
+            "title": self._phrase(3, 12),
+            "description": self._phrase(8, 30) if rng.random() < 0.5 else "",
+            "tags": rng.choices(self.tags, cum_weights=self._tag_weights, k=n_tags),
+            "source": "extension" if rng.random() < 0.7 else "import",
+            "created_at": _NEWEST - _SPAN * rng.random(),
+        }
+
+    def rows(self, start: int, count: int) -> list[dict]:
+        return [self.row(i) for i in range(start, start + count)]
+
+
+async def seed_library(directory: Path, n: int) -> None:
+    """Create `directory/kernel.db` (and its semantic index) with N bookmarks."""
+    settings = get_settings()
+    original = settings.database.path
+    settings.database.path = str(directory / DB_NAME)
+    generator = LibraryGenerator()
+    try:
+        await database.init_db()
+        for start in range(0, n, _CHUNK):
+            async with database.session_scope() as session:
+                await bookmarks.upsert_many(session, generator.rows(start, min(_CHUNK, n - start)))
+        if settings.semantic.enabled:
+            index = SemanticIndex(settings.semantic, directory / "semantic")
+            await index.load()
+            await index.stop()
+    finally:
+        await database.close_db()
+        settings.database.path = original
+
+
+def library(n: int) -> Path:
+    """Template directory for N bookmarks, seeding it on first use."""
+    target = DATA_DIR / f"library-v{SEED_VERSION}-{n}"
+    if (target / DB_NAME).exists():
+        return target
+    building = target.with_name(target.name + ".partial")
+    shutil.rmtree(building, ignore_errors=True)
+    building.mkdir(parents=True)
+    start = time.perf_counter()
+    asyncio.run(seed_library(building, n))
+    building.rename(target)
+    print(f"seeded {n} bookmarks in {time.perf_counter() - start:.1f} s → {target}", file=sys.stderr)
+    return target
+
+
+def copy_library(n: int, destination: Path) -> Path:
+    """Fresh working copy of the N-bookmark template; returns the database path."""
+    shutil.copytree(library(n), destination, dirs_exist_ok=True)
+    return destination / DB_NAME
+
+
+if __name__ == "__main__":
+    for size in sys.argv[1:] or ["10k"]:
+        print(library(parse_size(size)))
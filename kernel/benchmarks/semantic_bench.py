@@ -0,0 +1,105 @@
+"""Benchmark: semantic index build, reopen, incremental sync and top-k search.
+
+Seeds N synthetic bookmarks, builds the embedding index from scratch,
+reopens it the way a restart would (which must embed nothing), applies a
+small batch of edits and deletes as an incremental sync, and times
+`SemanticIndex.search` at that library size.
+
+Usage:
+    uv run python -m benchmarks.semantic_bench [BOOKMARKS] [QUERIES]
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from app import database
+from app.config import get_settings
+from app.crud import bookmarks
+from app.semantic import SemanticIndex
+from benchmarks._common import temp_database
+
+DEFAULT_BOOKMARKS = 50_000
+DEFAULT_QUERIES = 200
+
+_WORDS = (
+    "rust async runtime executor tokio python asyncio event loop garden tomato "
+    "soil cooking pasta sauce recipe database sqlite index vector search kernel "
+    "browser extension privacy security compiler parser typescript design layout "
+    "camera lens travel japan kyoto train budget finance invest market climate"
+).split()
+
+
+def _phrase(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+async def main(n: int, queries: int) -> None:
+    rng = random.Random(0)
+    cfg = get_settings().semantic
+    async with temp_database() as db_path:
+        rows = [
+            {
+                "url": f"https://site{i % 300}.example/{_phrase(rng, 2).replace(' ', '-')}/{i}",
+                "title": _phrase(rng, 7),
+                "description": _phrase(rng, 20),
+                "tags": [rng.choice(_WORDS)],
+            }
+            for i in range(n)
+        ]
+        async with database.session_scope() as session:
+            await bookmarks.upsert_many(session, rows)
+
+        directory = Path(tempfile.mkdtemp(dir=db_path.parent))
+        index = SemanticIndex(cfg, directory)
+
+        start = time.perf_counter()
+        await index.load()
+        build = time.perf_counter() - start
+
+        reopened = SemanticIndex(cfg, directory)
+        start = time.perf_counter()
+        await asyncio.to_thread(reopened.store.open)
+        touched = await reopened.sync()
+        reopen = time.perf_counter() - start
+        await reopened.stop()
+
+        async with database.session_scope() as session:
+            await session.execute(sa.text(
+                "UPDATE bookmarks SET title = title || ' edited' WHERE id % 500 = 0"
+            ))
+            await session.execute(sa.text("DELETE FROM bookmarks WHERE id % 500 = 1"))
+            await session.commit()
+        start = time.perf_counter()
+        changed = await index.sync()
+        incremental = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(queries):
+            q = _phrase(rng, 4)
+            start = time.perf_counter()
+            await index.search(q, 20)
+            latencies.append((time.perf_counter() - start) * 1000)
+        await index.stop()
+
+    latencies.sort()
+    print(f"bookmarks     {n} ({cfg.embedder}, dim {cfg.dim})")
+    print(f"build         {build:.2f} s  ({n / build:.0f} bookmarks/s)")
+    print(f"reopen        {reopen * 1000:.1f} ms, {touched} re-embedded")
+    print(f"incremental   {changed} changes in {incremental * 1000:.1f} ms")
+    print(
+        f"search top-20 p50 {statistics.median(latencies):.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BOOKMARKS
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_QUERIES
+    asyncio.run(main(n, queries))
@@ -0,0 +1,116 @@
+"""Benchmark: list-page materialization and serialization, before and after.
+
+"before" is the previous path: ORM entities, a validated `BookmarkOut` per
+row, then FastAPI's `response_model` validation and `JSONResponse` encoding.
+"after" is the fast path: plain column rows turned into dicts and encoded
+by the precompiled `TypeAdapter` in `app.serialization`. Both phases are
+timed separately, together with a check that the two produce identical JSON.
+
+Usage:
+    uv run python -m benchmarks.serialize_bench [PAGE_SIZE] [ROUNDS]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlmodel import select
+
+from app import database, serialization
+from app.crud import bookmarks
+from app.models import Bookmark
+from app.schemas import BookmarkListOut, BookmarkOut
+from benchmarks._common import temp_database
+
+DEFAULT_PAGE = 200
+DEFAULT_ROUNDS = 200
+
+_response_field = create_model_field("Response", BookmarkListOut, mode="serialization")
+
+
+def legacy_to_response(bookmark: Bookmark) -> BookmarkOut:
+    """The previous `_to_response`: a validated model per row."""
+    return BookmarkOut(
+        id=bookmark.id,  # type: ignore
+        url=bookmark.url,
+        title=bookmark.title,
+        description=bookmark.description,
+        favicon=bookmark.favicon,
+        domain=bookmark.domain,
+        tags=bookmark.tag_list,
+        source=bookmark.source,
+        created_at=bookmark.created_at,
+        updated_at=bookmark.updated_at,
+    )
+
+
+async def _seed(n: int) -> None:
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "url": f"https://site{i % 50}.example/articles/{i}",
+            "title": f"An article title number {i}",
+            "description": "A moderately long description of the page " * 3,
+            "tags": [f"tag{i % 7}", f"topic{i % 13}", "reading"],
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+    async with database.session_scope() as session:
+        await bookmarks.upsert_many(session, rows)
+
+
+async def _before(session, limit: int) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    stmt = select(Bookmark).order_by(Bookmark.created_at.desc()).limit(limit)
+    items = [legacy_to_response(b) for b in (await session.execute(stmt)).scalars().all()]
+    mid = time.perf_counter()
+    content = await serialize_response(
+        field=_response_field,
+        response_content=BookmarkListOut(total=limit, items=items),
+    )
+    body = JSONResponse(content).body
+    return body, mid - start
+
+
+async def _after(session, limit: int) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    items, _, _ = await bookmarks.list_all(session, limit=limit, with_total=False)
+    mid = time.perf_counter()
+    body = serialization.dump_page(items, limit, None)
+    return body, mid - start
+
+
+async def main(page: int, rounds: int) -> None:
+    async with temp_database():
+        await _seed(page)
+        factory = database._get_read_session_factory()
+        results = {}
+        for label, run in (("before", _before), ("after", _after)):
+            fetch_total = 0.0
+            start = time.perf_counter()
+            for _ in range(rounds):
+                async with factory() as session:
+                    body, fetch = await run(session, page)
+                fetch_total += fetch
+            elapsed = time.perf_counter() - start
+            results[label] = json.loads(body)
+            print(
+                f"{label:<7} {elapsed / rounds * 1000:>8.3f} ms/page  "
+                f"(rows→models {fetch_total / rounds * 1000:.3f} ms, "
+                f"serialize {(elapsed - fetch_total) / rounds * 1000:.3f} ms)"
+            )
+        # next_cursor is only produced by the new path
+        results["after"].pop("next_cursor"), results["before"].pop("next_cursor")
+        print("identical JSON:", results["before"] == results["after"])
+
+
+if __name__ == "__main__":
+    page = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PAGE
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROUNDS
+    asyncio.run(main(page, rounds))
@@ -0,0 +1,116 @@
+"""Benchmark: cold start, from process launch to the first served `/health`.
+
+Launches the kernel the way the desktop sidecar does (the `arvai-kernel
+serve` entry point, `app.main:run`) in a scratch directory whose
+config.yaml points at a copy of a seeded library, and polls `/health` until
+it answers. Each run gets a fresh copy of the library, so every start is a
+restart of an existing database. The first start of a fresh, empty
+database is reported separately. Also times `import app.main` in a fresh
+interpreter, and with --importtime lists the slowest imports.
+
+Usage:
+    uv run python -m benchmarks.startup_bench [--size 100k] [--runs 5] [--importtime]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks import seed
+from benchmarks._common import free_port, server_env, write_server_config
+
+_TIMEOUT = 120.0
+_SERVE = "from app.main import run; run(['serve'])"
+
+
+def time_to_health(db_path: Path, workdir: Path) -> float:
+    """Seconds from spawning the server to its first 200 on /health."""
+    port = free_port()
+    write_server_config(workdir, db_path, port)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", _SERVE], cwd=workdir, env=server_env(),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - start < _TIMEOUT:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"kernel exited with code {proc.returncode}")
+                try:
+                    if client.get("/health").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    time.sleep(0.002)
+        raise RuntimeError("kernel did not answer /health")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def time_import() -> float:
+    """Seconds for a fresh interpreter to start and `import app.main`."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], env=server_env(), check=True)
+    return time.perf_counter() - start
+
+
+def slowest_imports(n: int = 20) -> list[tuple[int, str]]:
+    """(cumulative µs, module) of the slowest imports under `app.main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=server_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main(size: int, runs: int, importtime: bool) -> None:
+    imports = statistics.median(time_import() for _ in range(runs))
+
+    with tempfile.TemporaryDirectory(prefix="arvai-startup-") as tmp:
+        fresh = time_to_health(Path(tmp) / "fresh" / "kernel.db", Path(tmp))
+
+    restarts = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(prefix="arvai-startup-") as tmp:
+            workdir = Path(tmp)
+            db_path = seed.copy_library(size, workdir / "library") if size else workdir / "kernel.db"
+            if not size:
+                time_to_health(db_path, workdir)  # create the empty database first
+            restarts.append(time_to_health(db_path, workdir))
+
+    print(f"library       {size} bookmarks, {runs} runs")
+    print(f"import        {imports * 1000:.0f} ms  (python -c 'import app.main')")
+    print(f"first start   {fresh * 1000:.0f} ms  (new, empty database)")
+    print(
+        f"restart       {statistics.median(restarts) * 1000:.0f} ms median, "
+        f"{min(restarts) * 1000:.0f}–{max(restarts) * 1000:.0f} ms  (launch → first /health)"
+    )
+    if importtime:
+        print("\nslowest imports (cumulative):")
+        for micros, name in slowest_imports():
+            print(f"  {micros / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="benchmarks.startup_bench")
+    parser.add_argument("--size", default="10k", help="library size: 0, 1k, 10k, 100k, 1m")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports")
+    args = parser.parse_args()
+    size = seed.parse_size(args.size)
+    if size:
+        seed.library(size)
+    main(size, args.runs, args.importtime)
@@ -0,0 +1,86 @@
+"""Benchmark: single-statement upsert vs. the legacy SELECT + write + refresh.
+
+Reports SQL statements, commits and latency per `create` call, for new URLs
+and for re-saves of existing URLs, and runs a race check that saves the
+same URL from many concurrent sessions.
+
+Usage:
+    uv run python -m benchmarks.upsert_bench [CALLS]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from app import database
+from app.crud import bookmarks
+from app.models import Bookmark
+from benchmarks._common import StatementCounter, temp_database
+
+DEFAULT_CALLS = 2000
+RACE_WRITERS = 50
+
+
+async def legacy_create(session, *, url: str, title: str = "", **_) -> Bookmark:
+    """The pre-upsert create path: SELECT, INSERT or UPDATE, commit, refresh."""
+    result = await session.execute(select(Bookmark).where(Bookmark.url == url))
+    existing = result.scalar_one_or_none()
+    if existing:
+        if title:
+            existing.title = title
+        existing.updated_at = datetime.now(timezone.utc)
+        await session.commit()
+        await session.refresh(existing)
+        return existing
+    bookmark = Bookmark(url=url, title=title, domain="bench.example")
+    session.add(bookmark)
+    await session.commit()
+    await session.refresh(bookmark)
+    return bookmark
+
+
+async def _measure(label: str, create, calls: int, counter: StatementCounter) -> None:
+    factory = database._get_session_factory()
+    for phase in ("insert", "update"):
+        counter.reset()
+        start = time.perf_counter()
+        for i in range(calls):
+            async with factory() as session:
+                await create(session, url=f"https://bench.example/{label}/{i}", title=f"t{i}")
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:<8} {phase:<7} {counter.statements / calls:>6.2f} stmts "
+            f"{counter.commits / calls:>5.2f} commits {elapsed / calls * 1000:>8.3f} ms/call"
+        )
+
+
+async def _race(label: str, create) -> None:
+    factory = database._get_session_factory()
+
+    async def one(i: int) -> bool:
+        async with factory() as session:
+            try:
+                await create(session, url=f"https://race.example/{label}", title=f"w{i}")
+                return True
+            except IntegrityError:
+                return False
+
+    results = await asyncio.gather(*(one(i) for i in range(RACE_WRITERS)))
+    print(f"{label:<8} race    {results.count(False)} of {RACE_WRITERS} concurrent saves failed")
+
+
+async def run(calls: int) -> None:
+    async with temp_database():
+        counter = StatementCounter()
+        await _measure("legacy", legacy_create, calls, counter)
+        await _measure("upsert", bookmarks.create, calls, counter)
+        await _race("legacy", legacy_create)
+        await _race("upsert", bookmarks.create)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS))
@@ -0,0 +1,68 @@
+"""Benchmark: group-commit write queue vs. per-request commits.
+
+Runs CLIENTS concurrent writers, each saving OPS bookmarks through
+`write_queue.execute`, first with the queue disabled (every save commits)
+and then with it enabled. Transactions are counted from the commit frames
+in the WAL, so only commits that reached the disk are reported.
+
+Usage:
+    uv run python -m benchmarks.write_queue_bench [CLIENTS] [OPS]
+"""
+
+import asyncio
+import sys
+import time
+from functools import partial
+
+from app import write_queue
+from app.config import get_settings
+from app.crud import bookmarks
+from app.database import session_scope
+from benchmarks._common import WalCommitCounter, temp_database
+
+DEFAULT_CLIENTS = 32
+DEFAULT_OPS = 100
+
+
+async def _client(label: str, client: int, ops: int) -> None:
+    for i in range(ops):
+        async with session_scope() as session:
+            await write_queue.execute(session, partial(
+                bookmarks.create,
+                url=f"https://bench.example/{label}/{client}/{i}",
+                title=f"bookmark {i}",
+                tags=["bench"],
+            ))
+
+
+async def _measure(label: str, clients: int, ops: int, counter: WalCommitCounter) -> None:
+    counter.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(label, c, ops) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = clients * ops
+    print(
+        f"{label:<10} {total / elapsed:>9.0f} writes/s  "
+        f"{counter.commits:>6} transactions  {elapsed:>6.2f}s"
+    )
+
+
+async def run(clients: int, ops: int) -> None:
+    cfg = get_settings().write_queue
+    async with temp_database() as db_path:
+        counter = WalCommitCounter(db_path)
+        await counter.start()
+        await _measure("per-write", clients, ops, counter)
+
+        cfg.enabled = True
+        write_queue.start()
+        try:
+            await _measure("grouped", clients, ops, counter)
+        finally:
+            await write_queue.stop()
+            cfg.enabled = False
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(run(*(args + [DEFAULT_CLIENTS, DEFAULT_OPS][len(args):])))
@@ -0,0 +1,15 @@
+"""Shared fixtures: every test runs against its own throwaway database."""
+
+from pathlib import Path
+
+import pytest
+
+from app.config import get_settings
+
+
+@pytest.fixture
+def database_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the kernel at a fresh SQLite file; call `database.init_db()` to create it."""
+    path = tmp_path / "kernel.db"
+    monkeypatch.setattr(get_settings().database, "path", str(path))
+    return path
@@ -0,0 +1,55 @@
+"""API key verification: pooled readers and the verification cache."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from app import auth, database
+from app.auth import invalidate_all_api_keys, verify_api_key
+from app.crud import api_keys
+
+
+async def _verify_many(count: int) -> list[int]:
+    await database.init_db()
+    try:
+        async with database.session_scope() as session:
+            keys = [(await api_keys.create(session, name=f"k{i}")).key for i in range(count)]
+        invalidate_all_api_keys()
+        verified = [(await verify_api_key(key)).id for key in keys]
+        assert database._get_read_engine().sync_engine.pool.checkedout() == 0
+        return verified
+    finally:
+        await database.close_db()
+
+
+def test_cache_misses_return_their_connection(database_path):
+    # More distinct (uncached) keys than there are readers in the pool
+    verified = asyncio.run(asyncio.wait_for(_verify_many(8), timeout=20))
+    assert len(set(verified)) == 8
+
+
+async def _verify_while_revoking(monkeypatch) -> bool:
+    await database.init_db()
+    try:
+        async with database.session_scope() as session:
+            created = await api_keys.create(session, name="revoked")
+        invalidate_all_api_keys()
+        lookup = auth.session_scope
+
+        @asynccontextmanager
+        async def revoke_during_lookup(**kwargs):
+            async with lookup(**kwargs) as session:
+                yield session
+            # After the key was read as active, before it is cached
+            async with database.session_scope() as writer:
+                await api_keys.revoke(writer, created.id)
+
+        monkeypatch.setattr(auth, "session_scope", revoke_during_lookup)
+        await verify_api_key(created.key)
+        return auth._key_cache.get(auth.hash_api_key(created.key)) is not None
+    finally:
+        await database.close_db()
+
+
+def test_key_revoked_during_lookup_is_not_cached(database_path, monkeypatch):
+    cached = asyncio.run(asyncio.wait_for(_verify_while_revoking(monkeypatch), timeout=20))
+    assert not cached, "a key revoked during its lookup was cached as valid"
@@ -0,0 +1,27 @@
+"""`POST /api/bookmarks/bulk` filters take the same shapes as `GET /api/bookmarks`."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import BookmarkBulkIn
+
+
+@pytest.mark.parametrize("tag, expected", [
+    ("rust", ["rust"]),
+    ("rust, async", ["rust", "async"]),
+    (["rust", "async,tokio"], ["rust", "async", "tokio"]),
+])
+def test_tag_accepts_string_or_list(tag, expected):
+    assert BookmarkBulkIn(tag=tag, add_tags=["x"]).tag == expected
+
+
+@pytest.mark.parametrize("selection", [
+    {},
+    {"tag": ""},
+    {"tag": [" , "]},
+    {"q": "   "},
+    {"domain": " "},
+])
+def test_blank_selection_is_rejected(selection):
+    with pytest.raises(ValidationError):
+        BookmarkBulkIn(**selection, delete=True)
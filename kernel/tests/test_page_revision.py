@@ -0,0 +1,50 @@
+"""Stored page content is a change of its bookmark."""
+
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app import changes, database
+from app.crud import bookmarks
+from app.models import Bookmark
+
+
+def _page(bookmark_id: int, text: str) -> dict:
+    return {
+        "bookmark_id": bookmark_id,
+        "status": "ok",
+        "http_status": 200,
+        "title": "Fetched title",
+        "description": "",
+        "image": "",
+        "site_name": "",
+        "text": text,
+        "fetched_at": datetime.now(timezone.utc),
+    }
+
+
+async def _revisions_after_fetches(texts: list[str]) -> list[int]:
+    await database.init_db()
+    try:
+        async with database.session_scope() as session:
+            bookmark = await bookmarks.create(session, url="https://page.example", title="Mine")
+            seen = [await changes.current_revision(session)]
+            for text in texts:
+                filled = await bookmarks.apply_metadata(session, [_page(bookmark.id, text)])
+                assert filled == 0  # the user's title is kept
+                seen.append((await session.execute(
+                    select(Bookmark.revision).where(Bookmark.id == bookmark.id)
+                )).scalar_one())
+            return seen
+    finally:
+        await database.close_db()
+
+
+def test_page_content_advances_revision(database_path):
+    created, first, same, changed = asyncio.run(
+        _revisions_after_fetches(["page body", "page body", "new page body"])
+    )
+    assert first > created
+    assert same == first  # refetching unchanged content is not a change
+    assert changed > first
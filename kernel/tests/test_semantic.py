@@ -0,0 +1,32 @@
+"""Semantic search answers at once while its index is unavailable."""
+
+import asyncio
+
+import pytest
+
+from app import database, semantic
+from app.config import get_settings
+
+
+async def _search_before_ready(tmp_path, fail: bool) -> str:
+    await database.init_db()
+    index = semantic.SemanticIndex(get_settings().semantic, tmp_path / "semantic")
+    if fail:
+        async def broken_load() -> None:
+            raise OSError("vector files unreadable")
+        index.load = broken_load  # type: ignore[method-assign]
+        index.start()
+        await asyncio.sleep(0)
+    try:
+        with pytest.raises(semantic.IndexNotReady) as excinfo:
+            await asyncio.wait_for(index.search("async rust", 10), timeout=1)
+        return str(excinfo.value)
+    finally:
+        await index.stop()
+        await database.close_db()
+
+
+@pytest.mark.parametrize("fail", [False, True], ids=["loading", "load-failed"])
+def test_search_does_not_wait_for_the_index(database_path, tmp_path, fail):
+    message = asyncio.run(_search_before_ready(tmp_path, fail))
+    assert ("failed" in message) == fail
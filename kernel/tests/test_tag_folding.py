@@ -0,0 +1,28 @@
+"""Tag names are equal under Unicode casefolding, not just ASCII case."""
+
+import asyncio
+
+from app import database
+from app.crud import bookmarks, tags
+
+
+async def _tag_beyond_ascii() -> tuple[list, list[str]]:
+    await database.init_db()
+    try:
+        async with database.session_scope() as session:
+            await bookmarks.create(session, url="https://a.example", tags=["Éte"])
+            await bookmarks.create(session, url="https://b.example", tags=["éte"])
+            await bookmarks.create(session, url="https://c.example", tags=["STRASSE"])
+            await bookmarks.create(session, url="https://d.example", tags=["straße"])
+        async with database.session_scope(readonly=True) as session:
+            facets = await tags.list_all(session)
+            items, _, _ = await bookmarks.list_all(session, tags=["ÉTE"])
+        return facets, sorted(item["url"] for item in items)
+    finally:
+        await database.close_db()
+
+
+def test_names_differing_in_non_ascii_case_are_one_tag(database_path):
+    facets, urls = asyncio.run(_tag_beyond_ascii())
+    assert sorted((f.name, f.count) for f in facets) == [("STRASSE", 2), ("Éte", 2)]
+    assert urls == ["https://a.example", "https://b.example"]
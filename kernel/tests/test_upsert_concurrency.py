@@ -0,0 +1,106 @@
+"""Concurrent saves of one page must converge on a single, merged bookmark."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app import database, write_queue
+from app.config import get_settings
+from app.crud import bookmarks
+from app.membership import url_index
+from app.models import Bookmark, BookmarkTag
+
+URL = "https://race.example/page"
+WRITERS = 30
+
+# Spellings of one page that differ only in what `app.canonical` normalizes
+VARIANTS = [
+    "http://race.example/variant",
+    "https://www.race.example/variant/",
+    "https://race.example/variant?utm_source=feed",
+    "https://RACE.example/variant#top",
+]
+
+
+def _fields(i: int) -> dict:
+    """Each writer sends only one of the fields, so merging is observable."""
+    return [
+        {"title": "Title"},
+        {"description": "Description"},
+        {"tags": ["shared"]},
+    ][i % 3]
+
+
+async def _save_concurrently(grouped: bool) -> tuple[set[int], list[Bookmark], int]:
+    await database.init_db()
+    if grouped:
+        write_queue.start()
+    try:
+        factory = database._get_session_factory()
+
+        async def save(i: int) -> int:
+            async with factory() as session:
+                op = lambda s: bookmarks.create(s, url=URL, **_fields(i))  # noqa: E731
+                return (await write_queue.execute(session, op)).id
+
+        ids = set(await asyncio.gather(*(save(i) for i in range(WRITERS))))
+        async with database.session_scope(readonly=True) as session:
+            rows = list((await session.execute(
+                select(Bookmark).where(Bookmark.url == URL)
+            )).scalars())
+            links = (await session.execute(
+                select(func.count()).select_from(BookmarkTag)
+            )).scalar_one()
+        return ids, rows, links
+    finally:
+        await write_queue.stop()
+        await database.close_db()
+
+
+@pytest.mark.parametrize("grouped", [False, True], ids=["direct", "write-queue"])
+def test_concurrent_saves_make_one_merged_row(database_path, monkeypatch, grouped):
+    monkeypatch.setattr(get_settings().write_queue, "enabled", grouped)
+
+    ids, rows, links = asyncio.run(_save_concurrently(grouped))
+
+    assert len(rows) == 1, "concurrent saves created duplicate rows"
+    assert ids == {rows[0].id}
+    bookmark = rows[0]
+    assert bookmark.title == "Title"
+    assert bookmark.description == "Description"
+    assert bookmark.tags == "shared"
+    assert links == 1
+
+
+async def _save_variants_concurrently(grouped: bool) -> list[Bookmark]:
+    await database.init_db()
+    await url_index.load()
+    if grouped:
+        write_queue.start()
+    try:
+        factory = database._get_session_factory()
+
+        async def save(i: int) -> None:
+            url = VARIANTS[i % len(VARIANTS)]
+            async with factory() as session:
+                await write_queue.execute(session, lambda s: bookmarks.create(s, url=url))
+
+        await asyncio.gather(*(save(i) for i in range(WRITERS)))
+        async with database.session_scope(readonly=True) as session:
+            return list((await session.execute(select(Bookmark))).scalars())
+    finally:
+        await write_queue.stop()
+        url_index.reset()
+        await database.close_db()
+
+
+@pytest.mark.parametrize("grouped", [False, True], ids=["direct", "write-queue"])
+def test_concurrent_saves_of_url_variants_make_one_row(database_path, monkeypatch, grouped):
+    monkeypatch.setattr(get_settings().write_queue, "enabled", grouped)
+
+    rows = asyncio.run(_save_variants_concurrently(grouped))
+
+    assert len(rows) == 1, "concurrent saves of URL variants created duplicate rows"
+    assert rows[0].url in VARIANTS
+    assert rows[0].canonical_url == "https://race.example/variant"
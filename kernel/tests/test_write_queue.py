@@ -0,0 +1,38 @@
+"""A group-commit batch is one SQLite transaction."""
+
+import asyncio
+import sqlite3
+from contextlib import closing
+
+from app import database, write_queue
+from app.crud import bookmarks
+
+
+def _count_committed(path) -> int:
+    with closing(sqlite3.connect(path)) as conn:
+        return conn.execute("SELECT count(*) FROM bookmarks").fetchone()[0]
+
+
+async def _run_batch(path) -> tuple[list[int], int]:
+    await database.init_db()
+    queue = write_queue.WriteQueue(window=0.05, max_batch=10)
+    queue.start()
+    seen: list[int] = []
+
+    async def save(session, i: int):
+        seen.append(_count_committed(path))  # from another connection
+        return await bookmarks.create(session, url=f"https://batch.example/{i}")
+
+    try:
+        await asyncio.gather(*(queue.submit(lambda s, i=i: save(s, i)) for i in range(5)))
+    finally:
+        await queue.stop()
+        await database.close_db()
+    return seen, _count_committed(path)
+
+
+def test_batch_is_not_visible_until_it_commits(database_path):
+    seen, committed = asyncio.run(_run_batch(database_path))
+
+    assert seen == [0] * 5, "operations of a batch were committed one by one"
+    assert committed == 5